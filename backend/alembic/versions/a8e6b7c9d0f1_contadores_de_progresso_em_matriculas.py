@@ -0,0 +1,44 @@
+"""contadores de progresso desnormalizados em matriculas
+
+Revision ID: a8e6b7c9d0f1
+Revises: f7d5a6b8c9e0
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e6b7c9d0f1'
+down_revision: Union[str, None] = 'f7d5a6b8c9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('matriculas', sa.Column('aulas_concluidas', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('matriculas', sa.Column('total_aulas', sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche os contadores com o progresso já existente
+    op.execute(
+        """
+        UPDATE matriculas m SET
+            aulas_concluidas = (
+                SELECT count(*) FROM progresso_aulas p
+                WHERE p.matricula_id = m.id AND p.concluido
+            ),
+            total_aulas = (
+                SELECT count(a.id) FROM aulas a
+                JOIN modulos mo ON mo.id = a.modulo_id
+                WHERE mo.curso_id = m.curso_id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('matriculas', 'total_aulas')
+    op.drop_column('matriculas', 'aulas_concluidas')
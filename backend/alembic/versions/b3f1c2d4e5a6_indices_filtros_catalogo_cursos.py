@@ -0,0 +1,32 @@
+"""indices para filtros e paginacao do catalogo de cursos
+
+Revision ID: b3f1c2d4e5a6
+Revises: 7266d8577765
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, None] = '7266d8577765'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_cursos_categoria_id'), 'cursos', ['categoria_id'], unique=False)
+    op.create_index(op.f('ix_cursos_nivel_id'), 'cursos', ['nivel_id'], unique=False)
+    op.create_index('ix_cursos_preco_id', 'cursos', ['preco', 'id'], unique=False)
+    op.create_index(op.f('ix_avaliacao_curso_curso_id'), 'avaliacao_curso', ['curso_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_avaliacao_curso_curso_id'), table_name='avaliacao_curso')
+    op.drop_index('ix_cursos_preco_id', table_name='cursos')
+    op.drop_index(op.f('ix_cursos_nivel_id'), table_name='cursos')
+    op.drop_index(op.f('ix_cursos_categoria_id'), table_name='cursos')
@@ -0,0 +1,40 @@
+"""versoes de tabelas para ETag/Last-Modified das rotas publicas
+
+Revision ID: b9f7c8d0e1a2
+Revises: a8e6b7c9d0f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9f7c8d0e1a2'
+down_revision: Union[str, None] = 'a8e6b7c9d0f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'versoes_tabelas',
+        sa.Column('tabela', sa.String(length=50), nullable=False),
+        sa.Column('versao', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('tabela'),
+    )
+
+    # Linha inicial para cada tabela versionada
+    op.execute(
+        """
+        INSERT INTO versoes_tabelas (tabela, versao)
+        VALUES ('cursos', 1), ('categorias', 1), ('niveis', 1)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('versoes_tabelas')
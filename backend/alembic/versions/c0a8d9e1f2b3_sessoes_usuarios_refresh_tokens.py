@@ -0,0 +1,41 @@
+"""sessoes de usuarios (refresh tokens e revogacao)
+
+Revision ID: c0a8d9e1f2b3
+Revises: b9f7c8d0e1a2
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0a8d9e1f2b3'
+down_revision: Union[str, None] = 'b9f7c8d0e1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sessoes_usuarios',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('refresh_hash', sa.String(length=64), nullable=False),
+        sa.Column('criado_em', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expira_em', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revogada_em', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_sessoes_usuarios_usuario_id', 'sessoes_usuarios', ['usuario_id'], unique=False)
+    op.create_index('ix_sessoes_usuarios_revogada_em', 'sessoes_usuarios', ['revogada_em'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessoes_usuarios_revogada_em', table_name='sessoes_usuarios')
+    op.drop_index('ix_sessoes_usuarios_usuario_id', table_name='sessoes_usuarios')
+    op.drop_table('sessoes_usuarios')
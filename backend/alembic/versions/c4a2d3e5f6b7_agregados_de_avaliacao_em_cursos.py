@@ -0,0 +1,67 @@
+"""agregados de avaliacao desnormalizados em cursos
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a2d3e5f6b7'
+down_revision: Union[str, None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUNAS_HISTOGRAMA = [f'qtd_nota_{nota}' for nota in range(1, 6)]
+
+
+def upgrade() -> None:
+    op.add_column('cursos', sa.Column('soma_avaliacoes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('cursos', sa.Column('quantidade_avaliacoes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('cursos', sa.Column('media_avaliacoes', sa.Float(), server_default='0', nullable=False))
+    for coluna in COLUNAS_HISTOGRAMA:
+        op.add_column('cursos', sa.Column(coluna, sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche os agregados com as avaliações já existentes
+    op.execute(
+        """
+        UPDATE cursos c SET
+            soma_avaliacoes = a.soma,
+            quantidade_avaliacoes = a.quantidade,
+            media_avaliacoes = a.soma::float / a.quantidade,
+            qtd_nota_1 = a.n1,
+            qtd_nota_2 = a.n2,
+            qtd_nota_3 = a.n3,
+            qtd_nota_4 = a.n4,
+            qtd_nota_5 = a.n5
+        FROM (
+            SELECT curso_id,
+                   sum(nota) AS soma,
+                   count(id) AS quantidade,
+                   count(*) FILTER (WHERE nota = 1) AS n1,
+                   count(*) FILTER (WHERE nota = 2) AS n2,
+                   count(*) FILTER (WHERE nota = 3) AS n3,
+                   count(*) FILTER (WHERE nota = 4) AS n4,
+                   count(*) FILTER (WHERE nota = 5) AS n5
+            FROM avaliacao_curso
+            GROUP BY curso_id
+        ) a
+        WHERE a.curso_id = c.id
+        """
+    )
+
+    op.create_index('ix_cursos_media_avaliacoes_id', 'cursos', ['media_avaliacoes', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cursos_media_avaliacoes_id', table_name='cursos')
+    for coluna in reversed(COLUNAS_HISTOGRAMA):
+        op.drop_column('cursos', coluna)
+    op.drop_column('cursos', 'media_avaliacoes')
+    op.drop_column('cursos', 'quantidade_avaliacoes')
+    op.drop_column('cursos', 'soma_avaliacoes')
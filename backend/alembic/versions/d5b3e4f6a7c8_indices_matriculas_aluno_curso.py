@@ -0,0 +1,28 @@
+"""indices em matriculas para escopo por aluno e por curso
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b3e4f6a7c8'
+down_revision: Union[str, None] = 'c4a2d3e5f6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_matriculas_aluno_id'), 'matriculas', ['aluno_id'], unique=False)
+    op.create_index(op.f('ix_matriculas_curso_id'), 'matriculas', ['curso_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_matriculas_curso_id'), table_name='matriculas')
+    op.drop_index(op.f('ix_matriculas_aluno_id'), table_name='matriculas')
@@ -0,0 +1,28 @@
+"""indices para montar a arvore modulos -> aulas do curso
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c4f5a7b8d9'
+down_revision: Union[str, None] = 'd5b3e4f6a7c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_modulos_curso_id'), 'modulos', ['curso_id'], unique=False)
+    op.create_index(op.f('ix_aulas_modulo_id'), 'aulas', ['modulo_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_aulas_modulo_id'), table_name='aulas')
+    op.drop_index(op.f('ix_modulos_curso_id'), table_name='modulos')
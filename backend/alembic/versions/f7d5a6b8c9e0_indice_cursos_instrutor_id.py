@@ -0,0 +1,26 @@
+"""indice em cursos.instrutor_id para estatisticas por instrutor
+
+Revision ID: f7d5a6b8c9e0
+Revises: e6c4f5a7b8d9
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d5a6b8c9e0'
+down_revision: Union[str, None] = 'e6c4f5a7b8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_cursos_instrutor_id'), 'cursos', ['instrutor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cursos_instrutor_id'), table_name='cursos')
@@ -0,0 +1,256 @@
+"""
+Cache de respostas em memória (por processo) para as rotas públicas de leitura.
+
+- Chave: nome da rota + parâmetros da chamada (path e query) + versões das tabelas, quando
+  a rota também usa @conditional_get (ver `versoes_requisicao`)
+- Limites: TTL, número máximo de entradas e total de bytes; ao estourar, sai a menos usada (LRU)
+- Invalidação explícita por tags: cada entrada recebe tags (ex.: "courses", "course:10")
+  e as rotas de escrita chamam `response_cache.invalidate(...)` depois do commit
+- Contadores de hit/miss/evicção em `response_cache.stats()` (rota GET /cache/stats)
+- Leitura de réplica (ver app.core.replicas) logo depois de uma invalidação não é guardada:
+  a réplica pode ainda não ter a escrita, e o corpo antigo ficaria no cache compartilhado
+  (servido até para quem escreveu) pelo TTL inteiro
+
+Como é por processo, cada worker tem o seu cache; o TTL limita o tempo que um worker
+pode servir dado antigo depois de uma escrita feita em outro worker.
+"""
+
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterable
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    READ_YOUR_WRITES_SECONDS,
+)
+
+# Headers que não fazem sentido guardar (são recalculados na nova Response)
+_HEADERS_IGNORADOS = {"content-length", "content-type"}
+
+# Versões das tabelas lidas pelo @conditional_get da requisição atual (ver app.core.http_cache).
+# Entram na chave: depois de uma escrita (nova versão) nenhum worker devolve um corpo antigo
+# sob o ETag novo, mesmo que ele tenha guardado a resposta antes da escrita.
+versoes_requisicao: ContextVar[tuple | None] = ContextVar("versoes_requisicao", default=None)
+
+
+class _Entrada:
+    __slots__ = ("body", "status_code", "headers", "media_type", "tags", "expira_em")
+
+    def __init__(self, body, status_code, headers, media_type, tags, expira_em):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers
+        self.media_type = media_type
+        self.tags = tags
+        self.expira_em = expira_em
+
+
+class ResponseCache:
+    """Cache LRU com TTL e invalidação por tags. Thread-safe (rotas sync rodam no threadpool)."""
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entradas: OrderedDict = OrderedDict()
+        self._por_tag: dict[str, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.replica_skips = 0
+        # Instante (monotonic) da última invalidação
+        self.invalidado_em = float("-inf")
+        # Incrementada a cada invalidação: uma leitura que começou antes de uma escrita
+        # não pode gravar no cache o resultado (possivelmente antigo) depois da invalidação
+        self.generation = 0
+
+    def get(self, key) -> _Entrada | None:
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+            if entrada.expira_em <= time.monotonic():
+                self._remover(key)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(key)
+            self.hits += 1
+            return entrada
+
+    def set(self, key, response: Response, tags: Iterable[str], generation: int | None = None) -> None:
+        body = bytes(response.body)
+        if len(body) > self.max_bytes:
+            return
+
+        headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in _HEADERS_IGNORADOS
+        }
+        entrada = _Entrada(
+            body=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type,
+            tags=frozenset(tags),
+            expira_em=time.monotonic() + self.ttl,
+        )
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entradas:
+                self._remover(key)
+            self._entradas[key] = entrada
+            self._bytes += len(body)
+            for tag in entrada.tags:
+                self._por_tag.setdefault(tag, set()).add(key)
+
+            # Remove as menos usadas até voltar para dentro dos limites
+            while self._entradas and (
+                len(self._entradas) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                antiga = next(iter(self._entradas))
+                self._remover(antiga)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> int:
+        """Remove todas as entradas que possuem alguma das tags. Retorna quantas saíram."""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._por_tag.get(tag, set())
+            for key in keys:
+                self._remover(key)
+            self.invalidations += len(keys)
+            self.generation += 1
+            self.invalidado_em = time.monotonic()
+            return len(keys)
+
+    def invalidado_ha_menos_de(self, segundos: float) -> bool:
+        """Se houve invalidação nos últimos `segundos` (conta como leitura de réplica não guardada)"""
+        with self._lock:
+            recente = time.monotonic() - self.invalidado_em < segundos
+            if recente:
+                self.replica_skips += 1
+            return recente
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidado_em = time.monotonic()
+            self._entradas.clear()
+            self._por_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entradas),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "replica_skips": self.replica_skips,
+            }
+
+    def _remover(self, key) -> None:
+        entrada = self._entradas.pop(key, None)
+        if entrada is None:
+            return
+        self._bytes -= len(entrada.body)
+        for tag in entrada.tags:
+            keys = self._por_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._por_tag[tag]
+
+
+response_cache = ResponseCache(
+    ttl=RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def cached_response(namespace: str, tags: Callable[[dict], Iterable[str]] | None = None):
+    """
+    Decorador para rotas GET públicas que retornam uma Response (ex.: success_response).
+
+    A chave é `namespace` + parâmetros da rota (a sessão do banco é ignorada).
+    Toda entrada recebe a tag `namespace`, mais as devolvidas por `tags(params)`.
+    Sozinho, no hit o banco não é consultado (a sessão do get_db nem chega a abrir conexão).
+    Abaixo de @conditional_get, a chave inclui também as versões das tabelas que ele leu:
+    o hit custa essa leitura por chave primária (nenhuma linha é consultada nem serializada).
+
+    Exemplo:
+        @cached_response("course", tags=lambda p: [f"course:{p['id_curso']}"])
+    """
+    def decorator(func):
+        def buscar(kwargs):
+            params = {k: v for k, v in kwargs.items() if not isinstance(v, (Session, AsyncSession))}
+            db = next((v for v in kwargs.values() if isinstance(v, (Session, AsyncSession))), None)
+            key = (namespace, tuple(sorted(params.items())), versoes_requisicao.get())
+
+            entrada = response_cache.get(key)
+            if entrada is None:
+                return params, key, db, None
+            return params, key, db, Response(
+                content=entrada.body,
+                status_code=entrada.status_code,
+                headers=entrada.headers,
+                media_type=entrada.media_type,
+            )
+
+        def guardar(params, key, db, response, generation):
+            # Sessão de get_read_db/get_async_read_db numa réplica (db.info["replica"]): dentro
+            # da janela do read-your-writes após uma invalidação ela pode estar atrasada
+            if db is not None and db.info.get("replica") and response_cache.invalidado_ha_menos_de(READ_YOUR_WRITES_SECONDS):
+                return response
+            if isinstance(response, Response) and 200 <= response.status_code < 300:
+                entrada_tags = {namespace}
+                if tags is not None:
+                    entrada_tags.update(tags(params))
+                response_cache.set(key, response, entrada_tags, generation)
+            return response
+
+        # Rotas `async def` (sessão do get_async_db) precisam de um wrapper assíncrono
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                params, key, db, cacheada = buscar(kwargs)
+                if cacheada is not None:
+                    return cacheada
+                generation = response_cache.generation
+                return guardar(params, key, db, await func(*args, **kwargs), generation)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                params, key, db, cacheada = buscar(kwargs)
+                if cacheada is not None:
+                    return cacheada
+                generation = response_cache.generation
+                return guardar(params, key, db, func(*args, **kwargs), generation)
+
+        return wrapper
+
+    return decorator
@@ -3,7 +3,100 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Modo do pooler na frente do Postgres: "session" (conexão direta ou pooler em modo sessão)
+# ou "transaction" (pooler em modo transação do Supabase/PgBouncer, porta 6543): sem
+# parâmetros de sessão no startup e sem prepared statements no servidor (ver app.core.db_pool)
+DB_POOLER_MODE = os.getenv("DB_POOLER_MODE", "session")
+
+if DB_POOLER_MODE not in ("session", "transaction"):
+    raise RuntimeError("DB_POOLER_MODE deve ser 'session' ou 'transaction'.")
+
+# Pool de conexões com o banco (cada engine, sync e async, de cada worker tem o seu)
+# Conexões por worker no pior caso: 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+# DB_POOL_SIZE=0 usa NullPool (abre/fecha a conexão a cada uso; comum com o pooler em modo transaction)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Recria conexões mais velhas que isso (o pooler do Supabase derruba conexões antigas/paradas); -1 desliga
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+# Estratégia de pre-ping: "always", "idle" (só conexões paradas há DB_POOL_PING_IDLE_SECONDS) ou "never"
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle")
+DB_POOL_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "30"))
+# Conexões abertas no startup em cada engine (0 desliga o aquecimento)
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", str(DB_POOL_SIZE)))
+
+if DB_POOL_PRE_PING not in ("always", "idle", "never"):
+    raise RuntimeError("DB_POOL_PRE_PING deve ser 'always', 'idle' ou 'never'.")
+
+# Réplicas de leitura (URLs em DATABASE_REPLICA_URLS, ver app.core.replicas)
+# Réplica com erro de conexão sai da rotação por REPLICA_EJECT_SECONDS; a verificação em
+# segundo plano (a cada REPLICA_HEALTH_CHECK_SECONDS) tira também as atrasadas demais
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", "30"))
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+# Depois de uma escrita, as leituras do mesmo usuário vão para o primário por esse tempo
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+READ_YOUR_WRITES_MAX_ENTRIES = int(os.getenv("READ_YOUR_WRITES_MAX_ENTRIES", "100000"))
+
+# Instrumentação das consultas SQL por requisição (ver app.core.sql_metrics)
+# Mesma forma de consulta repetida SQL_N_PLUS_ONE_THRESHOLD vezes ou mais na requisição = N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Header Server-Timing com as consultas de cada resposta; por padrão só em desenvolvimento
+SQL_SERVER_TIMING = os.getenv(
+    "SQL_SERVER_TIMING", "1" if os.getenv("ENV", "development") == "development" else "0"
+) == "1"
+# Formas de consulta N+1 guardadas por rota nas métricas agregadas (GET /db/queries/stats)
+SQL_METRICS_MAX_SHAPES = int(os.getenv("SQL_METRICS_MAX_SHAPES", "20"))
+
 # Configurações de segurnaça token
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 360
+# Access token curto; a sessão continua via refresh token (POST /auth/refresh)
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Denylist de sessões revogadas (logout): capacidade/taxa de erro do filtro de Bloom e
+# intervalo da sincronização incremental com a tabela 'sessoes_usuarios'
+DENYLIST_BLOOM_CAPACITY = int(os.getenv("DENYLIST_BLOOM_CAPACITY", "100000"))
+DENYLIST_BLOOM_ERROR_RATE = float(os.getenv("DENYLIST_BLOOM_ERROR_RATE", "0.01"))
+DENYLIST_SYNC_SECONDS = float(os.getenv("DENYLIST_SYNC_SECONDS", "5"))
+
+# Esquema e custo do hash de senha (passlib). Hashes com esquema/custo antigos
+# continuam válidos e são refeitos com a configuração atual no próximo login.
+# Sem dependência extra: pbkdf2_sha256 / pbkdf2_sha512 (bcrypt/argon2 exigem a lib correspondente).
+# Use `python -m benchmarks.password_hash` para escolher o custo para o hardware.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "pbkdf2_sha256")
+# Custo na unidade do esquema (pbkdf2: iterações; bcrypt: log2 das iterações, ex.: 12).
+# Sem valor, vale o padrão do passlib para o esquema (pbkdf2_sha256: 29000).
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS")) if os.getenv("PASSWORD_HASH_ROUNDS") else None
+
+# Pool dedicado para hash/verificação de senha (PBKDF2)
+# Acima de PASSWORD_HASH_MAX_PENDING operações na fila/rodando, login/cadastro respondem 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "16"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+# Limite de tentativas de login (janela deslizante); 0 desliga o respectivo limite
+LOGIN_LIMIT_PER_IP = int(os.getenv("LOGIN_LIMIT_PER_IP", "20"))
+LOGIN_LIMIT_PER_EMAIL = int(os.getenv("LOGIN_LIMIT_PER_EMAIL", "5"))
+LOGIN_LIMIT_WINDOW_SECONDS = float(os.getenv("LOGIN_LIMIT_WINDOW_SECONDS", "60"))
+LOGIN_LIMIT_MAX_KEYS = int(os.getenv("LOGIN_LIMIT_MAX_KEYS", "100000"))
+
+# Cache do perfil do usuário autenticado (GET /auth/me), invalidado quando o usuário muda
+PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+# Tempo em que um perfil em cache é servido sem conferir o `ultima_atualizacao` no banco
+# (atraso máximo para ver mudanças feitas por outro worker ou por UPDATE em massa)
+PROFILE_CACHE_REVALIDATE_SECONDS = float(os.getenv("PROFILE_CACHE_REVALIDATE_SECONDS", "5"))
+
+# Cache dos tokens já verificados (claims guardadas até o exp do token); 0 desliga
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Cache de respostas em memória (rotas públicas de catálogo)
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Cache HTTP (ETag/Last-Modified + Cache-Control) das rotas públicas de catálogo
+# max-age=0 faz o navegador revalidar sempre (resposta 304 barata); s-maxage deixa a CDN segurar a resposta
+PUBLIC_CACHE_CONTROL = os.getenv("PUBLIC_CACHE_CONTROL", "public, max-age=0, s-maxage=60")
@@ -0,0 +1,244 @@
+"""
+Pool de conexões com o banco: configuração por ambiente, pre-ping, métricas e aquecimento.
+
+- Tamanho, overflow, timeout, recycle e estratégia de pre-ping vêm de DB_POOL_* (app.core.config)
+  e valem para cada engine (sync e async) de cada worker
+- Pre-ping (DB_POOL_PRE_PING):
+    "always": SELECT 1 a cada checkout (pool_pre_ping do SQLAlchemy; uma ida e volta a mais
+              por requisição, cara com TLS até o Supabase)
+    "idle":   só testa a conexão que ficou parada mais de DB_POOL_PING_IDLE_SECONDS
+              (as que acabaram de ser usadas quase nunca estão mortas)
+    "never":  não testa; conta com o recycle e com a invalidação automática do SQLAlchemy
+              quando uma consulta falha por desconexão
+- Métricas por engine (`PoolMetrics`): conexões em uso/overflow, checkouts que esperaram
+  pelo pool cheio, timeouts e histograma da latência de checkout (rota GET /db/pool/stats)
+- `aquecer_pool` / `aquecer_pool_async`: abrem as conexões no startup (TLS + autenticação
+  fora do caminho da primeira requisição)
+- `connect_args_pooler`: ajusta a conexão ao modo do pooler (DB_POOLER_MODE). No modo
+  "transaction" cada transação pode cair em um backend diferente do Postgres, então nada
+  pode depender de estado de sessão
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT_SECONDS,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_POOL_PING_IDLE_SECONDS,
+    DB_POOLER_MODE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Limites (ms) dos baldes do histograma de latência de checkout; o último balde é "acima de"
+_BALDES_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Chave, no connection_record.info, do instante em que a conexão voltou para o pool
+_DEVOLVIDA_EM = "devolvida_em"
+
+
+class PoolMetrics:
+    """Contadores e histograma de checkout de um pool. Thread-safe."""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.invalidated = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self._baldes = [0] * (len(_BALDES_MS) + 1)
+        self._total_checkout = 0.0
+        self._max_checkout = 0.0
+
+    def registrar_checkout(self, duracao: float, esperou: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._total_checkout += duracao
+            self._max_checkout = max(self._max_checkout, duracao)
+            self._baldes[bisect.bisect_left(_BALDES_MS, duracao * 1000)] += 1
+            if esperou:
+                self.waits += 1
+                self.wait_seconds += duracao
+
+    def registrar(self, contador: str) -> None:
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def stats(self) -> dict:
+        # NullPool não guarda conexões: não há tamanho/uso para mostrar
+        pool = self.pool if isinstance(self.pool, QueuePool) else None
+        with self._lock:
+            histograma = {f"<={limite}ms": n for limite, n in zip(_BALDES_MS, self._baldes)}
+            histograma[f">{_BALDES_MS[-1]}ms"] = self._baldes[-1]
+            return {
+                "pool_size": pool.size() if pool is not None else 0,
+                "checked_out": pool.checkedout() if pool is not None else 0,
+                "checked_in": pool.checkedin() if pool is not None else 0,
+                # O QueuePool conta o overflow a partir de -pool_size enquanto o pool não enche
+                "overflow": max(pool.overflow(), 0) if pool is not None else 0,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_ms_total": round(self.wait_seconds * 1000, 2),
+                "timeouts": self.timeouts,
+                "connections_created": self.connections_created,
+                "invalidated": self.invalidated,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "checkout_ms": {
+                    "avg": round(self._total_checkout / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                    "max": round(self._max_checkout * 1000, 3),
+                    "histogram": histograma,
+                },
+            }
+
+
+class _PoolComMetricas:
+    """Mede o tempo de obter uma conexão do pool (espera pela fila + conexão nova, se houver)"""
+
+    metricas: PoolMetrics
+
+    def _do_get(self):
+        esgotado = self.checkedout() >= self.size() + max(self._max_overflow, 0)
+        inicio = time.perf_counter()
+        try:
+            registro = super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.registrar("timeouts")
+            raise
+        self.metricas.registrar_checkout(time.perf_counter() - inicio, esgotado)
+        return registro
+
+
+def opcoes_pool(metricas: PoolMetrics, assincrono: bool = False) -> dict:
+    """Argumentos de create_engine/create_async_engine com o pool configurado por ambiente"""
+    if DB_POOL_SIZE == 0:
+        return {"poolclass": NullPool, "pool_pre_ping": DB_POOL_PRE_PING == "always"}
+    base = AsyncAdaptedQueuePool if assincrono else QueuePool
+    # Subclasse por engine: o pool recriado (engine.dispose) continua com as mesmas métricas
+    poolclass = type(f"{base.__name__}ComMetricas", (_PoolComMetricas, base), {"metricas": metricas})
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+    }
+
+
+def _nome_prepared() -> str:
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def connect_args_pooler(connect_args: dict, assincrono: bool = False, modo: str = DB_POOLER_MODE) -> dict:
+    """
+    Ajusta os connect_args ao modo do pooler. No modo "transaction":
+    - remove `options` (parâmetros de sessão no startup; o PgBouncer recusa a conexão)
+    - asyncpg sem cache de prepared statements (o do asyncpg e o do SQLAlchemy): o statement
+      só existe no backend onde foi preparado, e a próxima transação pode cair em outro
+    - nomes únicos para os statements que o asyncpg ainda prepara dentro de uma transação,
+      para dois clientes no mesmo backend não colidirem
+    """
+    if modo != "transaction":
+        return connect_args
+    connect_args = {k: v for k, v in connect_args.items() if k != "options"}
+    if assincrono:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_nome_prepared,
+        )
+    return connect_args
+
+
+def instrumentar_pool(engine, metricas: PoolMetrics) -> None:
+    """Registra os eventos de métricas e, na estratégia "idle", o ping das conexões paradas"""
+    metricas.pool = engine.pool
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "engine_disposed")
+    def _recriado(engine_):
+        metricas.pool = engine.pool
+
+    @event.listens_for(engine, "connect")
+    def _conectou(dbapi_connection, connection_record):
+        metricas.registrar("connections_created")
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidada(dbapi_connection, connection_record, exception):
+        metricas.registrar("invalidated")
+
+    @event.listens_for(engine, "checkin")
+    def _devolvida(dbapi_connection, connection_record):
+        connection_record.info[_DEVOLVIDA_EM] = time.monotonic()
+
+    if DB_POOL_PRE_PING != "idle":
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _ping_se_parada(dbapi_connection, connection_record, connection_proxy):
+        devolvida_em = connection_record.info.get(_DEVOLVIDA_EM)
+        if devolvida_em is None or time.monotonic() - devolvida_em < DB_POOL_PING_IDLE_SECONDS:
+            return
+        metricas.registrar("pings")
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception:
+            metricas.registrar("ping_failures")
+            # O pool descarta esta conexão e tenta outra
+            raise exc.DisconnectionError("Conexão parada não respondeu ao ping")
+
+
+def aquecer_pool(engine, quantidade: int) -> int:
+    """Abre `quantidade` conexões ao mesmo tempo e devolve todas ao pool. Retorna quantas abriram."""
+    conexoes = []
+    try:
+        for _ in range(quantidade):
+            conexao = engine.connect()
+            conexoes.append(conexao)
+            conexao.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("Falha ao aquecer o pool de conexões (%d de %d abertas)", len(conexoes), quantidade)
+    finally:
+        for conexao in conexoes:
+            conexao.close()
+    return len(conexoes)
+
+
+async def aquecer_pool_async(async_engine, quantidade: int) -> int:
+    """Versão para o engine assíncrono; as conexões são abertas em paralelo"""
+
+    async def abrir():
+        conexao = await async_engine.connect()
+        try:
+            await conexao.execute(text("SELECT 1"))
+        except Exception:
+            await conexao.close()
+            raise
+        return conexao
+
+    resultados = await asyncio.gather(*(abrir() for _ in range(quantidade)), return_exceptions=True)
+    conexoes = [r for r in resultados if not isinstance(r, BaseException)]
+    if len(conexoes) < quantidade:
+        erro = next(r for r in resultados if isinstance(r, BaseException))
+        logger.error("Falha ao aquecer o pool assíncrono (%d de %d abertas): %r", len(conexoes), quantidade, erro)
+    for conexao in conexoes:
+        await conexao.close()
+    return len(conexoes)
@@ -0,0 +1,113 @@
+"""
+Denylist em memória das sessões revogadas (logout), consultada a cada requisição autenticada.
+
+- Entradas: id da sessão (claim `sid`) → instante até quando ela precisa ficar na lista
+  (revogação + duração do access token; depois disso todo access token da sessão já expirou)
+- Na frente do dicionário fica um filtro de Bloom: o caso comum (token não revogado)
+  é respondido só com alguns bits, sem hash de dicionário nem lock
+- Alimentada localmente no logout e, para as revogações feitas em outros workers/nós,
+  por uma sincronização incremental com a tabela 'sessoes_usuarios' em segundo plano
+  (ver app.services.session_service.sincronizar_denylist); nada disso roda na requisição
+
+Como o filtro de Bloom não permite remover itens, ele é reconstruído quando entradas expiram.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from app.core.config import DENYLIST_BLOOM_CAPACITY, DENYLIST_BLOOM_ERROR_RATE
+
+
+class BloomFilter:
+    """Filtro de Bloom simples (bits em um bytearray, k posições derivadas de um SHA-256)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _posicoes(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        # Double hashing (Kirsch-Mitzenmacher): h1 + i*h2
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.bits
+
+    def add(self, item: str) -> None:
+        for posicao in self._posicoes(item):
+            self._array[posicao >> 3] |= 1 << (posicao & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._array[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(item))
+
+
+class Denylist:
+    """Conjunto de ids revogados com TTL, com filtro de Bloom na frente. Thread-safe."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._expira_em: dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self.bloom_positives = 0
+
+    def add(self, item: str, expira_em: float) -> None:
+        """Adiciona (ou estende) um id revogado até o timestamp `expira_em`"""
+        if expira_em <= time.time():
+            return
+        with self._lock:
+            if expira_em > self._expira_em.get(item, 0):
+                self._expira_em[item] = expira_em
+            self._bloom.add(item)
+            # Filtro lotado demais: a taxa de falso positivo subiria; reconstrói maior
+            if len(self._expira_em) > self.capacity:
+                self.capacity *= 2
+                self._reconstruir()
+
+    def __contains__(self, item: str) -> bool:
+        # Caminho comum: o filtro garante que o id nunca foi revogado
+        if item not in self._bloom:
+            return False
+        with self._lock:
+            self.bloom_positives += 1
+            expira_em = self._expira_em.get(item)
+        return expira_em is not None and expira_em > time.time()
+
+    def purge_expired(self) -> int:
+        """Remove as entradas vencidas e reconstrói o filtro. Retorna quantas saíram."""
+        agora = time.time()
+        with self._lock:
+            vencidas = [item for item, expira_em in self._expira_em.items() if expira_em <= agora]
+            for item in vencidas:
+                del self._expira_em[item]
+            if vencidas:
+                self._reconstruir()
+            return len(vencidas)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._expira_em),
+                "bloom_bits": self._bloom.bits,
+                "bloom_hashes": self._bloom.hashes,
+                "bloom_positives": self.bloom_positives,
+            }
+
+    def _reconstruir(self) -> None:
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for item in self._expira_em:
+            bloom.add(item)
+        # Troca de referência atômica: leituras concorrentes veem o filtro antigo ou o novo
+        self._bloom = bloom
+
+
+# Sessões revogadas (claim `sid` dos access tokens)
+revoked_sessions = Denylist(
+    capacity=DENYLIST_BLOOM_CAPACITY,
+    error_rate=DENYLIST_BLOOM_ERROR_RATE,
+)
@@ -25,7 +25,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         data=None,
         message=str(exc.detail) if exc.detail else "Erro na requisição.",
     )
-    return JSONResponse(status_code=exc.status_code, content=payload.model_dump())
+    # Mantém headers como Retry-After (503) e WWW-Authenticate
+    return JSONResponse(status_code=exc.status_code, content=payload.model_dump(), headers=exc.headers)
 
 async def unhandled_exception_handler(request: Request, exc: Exception):
     payload = ErrorResponse(
@@ -0,0 +1,129 @@
+"""
+Pool dedicado (e limitado) para o hash/verificação de senha (PBKDF2).
+
+O PBKDF2 é CPU pesado de propósito. Rodando direto nas rotas sync, ele ocupa as threads
+do threadpool compartilhado do anyio, e um pico de logins (início de semestre, ataque de
+credential stuffing) deixa as outras rotas sync sem thread.
+
+- As operações rodam em um ThreadPoolExecutor próprio (o hashlib.pbkdf2_hmac libera o GIL)
+- `run` é async: login/cadastro são rotas `async def` e esperam o hash no event loop, sem
+  prender uma thread do threadpool do anyio durante o hash
+- No máximo PASSWORD_HASH_MAX_PENDING operações ficam na fila/rodando; acima disso a
+  requisição recebe 503 (com Retry-After) na hora, em vez de esperar
+- Métricas em `password_hash_pool.stats()` (rota GET /password-hash/stats)
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.core.config import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+
+# Quantidade de latências recentes guardadas para a média/p95
+_AMOSTRAS_LATENCIA = 1000
+
+
+def _servidor_ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, tente novamente em instantes.",
+        headers={"Retry-After": "1"},
+    )
+
+
+class PasswordHashPool:
+    """Executor limitado: rejeita (503) quando a fila está cheia. Thread-safe."""
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._espera = deque(maxlen=_AMOSTRAS_LATENCIA)
+        self._execucao = deque(maxlen=_AMOSTRAS_LATENCIA)
+
+    async def run(self, func, *args):
+        """
+        Executa `func(*args)` no pool e espera o resultado sem bloquear o event loop.
+        Levanta HTTPException 503 se a fila estiver cheia ou se a espera passar do timeout.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise _servidor_ocupado()
+            self.pending += 1
+
+        # `pending` só diminui quando a tarefa termina (ou é cancelada antes de rodar),
+        # então uma espera que estourou o timeout continua contando enquanto ocupa o pool
+        future = self._executor.submit(self._executar, time.perf_counter(), func, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+                # Cancelada antes de rodar: o _executar não vai descontar o pending
+                if future.cancel():
+                    self.pending -= 1
+            raise _servidor_ocupado()
+
+    def _executar(self, enfileirado_em: float, func, *args):
+        inicio = time.perf_counter()
+        with self._lock:
+            self.running += 1
+            self._espera.append(inicio - enfileirado_em)
+        try:
+            return func(*args)
+        finally:
+            fim = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.pending -= 1
+                self.completed += 1
+                self._execucao.append(fim - inicio)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queued": self.pending - self.running,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "queue_wait_ms": _resumo(self._espera),
+                "hash_ms": _resumo(self._execucao),
+            }
+
+
+def _resumo(amostras) -> dict:
+    if not amostras:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordenadas = sorted(amostras)
+    return {
+        "avg": round(sum(ordenadas) / len(ordenadas) * 1000, 2),
+        "p95": round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.95))] * 1000, 2),
+        "max": round(ordenadas[-1] * 1000, 2),
+    }
+
+
+password_hash_pool = PasswordHashPool(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+    timeout=PASSWORD_HASH_TIMEOUT_SECONDS,
+)
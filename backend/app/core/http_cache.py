@@ -0,0 +1,148 @@
+"""
+GET condicional (ETag / Last-Modified) para rotas públicas de catálogo.
+
+O ETag é forte e derivado da rota, dos parâmetros e da versão das tabelas de que a
+resposta depende (tabela 'versoes_tabelas'). Se o cliente mandar If-None-Match (ou
+If-Modified-Since) ainda válido, a rota responde 304 só com a leitura das versões:
+as linhas não são consultadas nem serializadas.
+
+As versões lidas aqui também entram na chave do @cached_response logo abaixo
+(app.core.cache.versoes_requisicao): o corpo em cache é sempre o da mesma versão do ETag.
+
+Uso (sempre como decorador mais externo, acima de @cached_response):
+
+    @router.get("/")
+    @conditional_get("courses", tabelas=[CURSOS, NIVEIS, INSTRUTORES])
+    @cached_response("courses")
+    def listar_cursos(..., db: Session = Depends(get_db)):
+"""
+
+import hashlib
+import inspect
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import wraps
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import versoes_requisicao
+from app.core.config import PUBLIC_CACHE_CONTROL
+from app.services.table_version_service import buscar_versoes
+
+
+def _calcular_etag(namespace: str, params: dict, versoes: dict) -> str:
+    base = repr((namespace, sorted(params.items()), sorted(versoes.items())))
+    return '"' + hashlib.sha1(base.encode()).hexdigest() + '"'
+
+
+def _etag_confere(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def _nao_modificado_desde(if_modified_since: str, ultima_modificacao: datetime) -> bool:
+    try:
+        data = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if data is None:
+        return False
+    # Last-Modified tem precisão de segundos
+    return ultima_modificacao.replace(microsecond=0) <= data
+
+
+def _avaliar(namespace: str, tabelas: list[str], cache_control: str, request: Request, params: dict, registros):
+    """Monta os headers de cache a partir das versões e diz se o cliente já tem a versão atual"""
+    versoes = {tabela: 0 for tabela in tabelas}
+    ultima_modificacao = None
+    for registro in registros:
+        versoes[registro.tabela] = registro.versao
+        if ultima_modificacao is None or registro.atualizado_em > ultima_modificacao:
+            ultima_modificacao = registro.atualizado_em
+
+    headers = {
+        "ETag": _calcular_etag(namespace, params, versoes),
+        "Cache-Control": cache_control,
+    }
+    if ultima_modificacao is not None:
+        if ultima_modificacao.tzinfo is None:
+            ultima_modificacao = ultima_modificacao.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(ultima_modificacao.astimezone(timezone.utc), usegmt=True)
+
+    # If-None-Match tem prioridade; If-Modified-Since só vale sem ele (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        nao_modificado = _etag_confere(if_none_match, headers["ETag"])
+    elif if_modified_since is not None and ultima_modificacao is not None:
+        nao_modificado = _nao_modificado_desde(if_modified_since, ultima_modificacao)
+    else:
+        nao_modificado = False
+
+    return headers, nao_modificado, tuple(sorted(versoes.items()))
+
+
+def conditional_get(namespace: str, tabelas: list[str], cache_control: str = PUBLIC_CACHE_CONTROL):
+    """
+    Decorador que adiciona ETag, Last-Modified e Cache-Control à resposta da rota
+    e responde 304 quando If-None-Match / If-Modified-Since ainda forem válidos.
+
+    A rota decorada precisa receber a sessão do banco (Depends(get_db) ou, em rotas
+    `async def`, Depends(get_async_db)).
+    O `request` é injetado pelo decorador, a rota não precisa declará-lo.
+    """
+    def decorator(func):
+        assinatura = inspect.signature(func)
+        recebe_request = "request" in assinatura.parameters
+
+        def preparar(kwargs):
+            request: Request = kwargs["request"] if recebe_request else kwargs.pop("request")
+            db = next(v for v in kwargs.values() if isinstance(v, (Session, AsyncSession)))
+            params = {k: v for k, v in kwargs.items() if not isinstance(v, (Session, AsyncSession, Request))}
+            return request, db, params
+
+        def finalizar(response, headers):
+            if isinstance(response, Response) and response.status_code == 200:
+                response.headers.update(headers)
+            return response
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                request, db, params = preparar(kwargs)
+                registros = await db.run_sync(buscar_versoes, tabelas)
+                headers, nao_modificado, versoes = _avaliar(namespace, tabelas, cache_control, request, params, registros)
+                if nao_modificado:
+                    return Response(status_code=304, headers=headers)
+                token = versoes_requisicao.set(versoes)
+                try:
+                    return finalizar(await func(*args, **kwargs), headers)
+                finally:
+                    versoes_requisicao.reset(token)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                request, db, params = preparar(kwargs)
+                registros = buscar_versoes(db, tabelas)
+                headers, nao_modificado, versoes = _avaliar(namespace, tabelas, cache_control, request, params, registros)
+                if nao_modificado:
+                    return Response(status_code=304, headers=headers)
+                token = versoes_requisicao.set(versoes)
+                try:
+                    return finalizar(func(*args, **kwargs), headers)
+                finally:
+                    versoes_requisicao.reset(token)
+
+        if not recebe_request:
+            parametros = list(assinatura.parameters.values())
+            parametros.append(
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            )
+            wrapper.__signature__ = assinatura.replace(parameters=parametros)
+
+        return wrapper
+
+    return decorator
@@ -1,12 +1,15 @@
 # backend/app/core/middleware.py
-from fastapi import Request, HTTPException, status
+import os
+import re
+
+from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
 from app.core.security import verify_token
-import os
 
 PUBLIC_PATHS = {
 	"/auth/login",
 	"/auth/register",
+	"/auth/refresh",
 	"/courses",
 	"/docs",
 	"/openapi.json"
@@ -20,37 +23,56 @@ if os.getenv("ENV", "development") == "development":
         "/",
     })
 
+# Rotas públicas dinâmicas (só GET), comparadas com o path já sem "/" no final
+PUBLIC_GET_PATTERNS = [
+    r"/courses/\d+",            # /courses/{id}
+    r"/courses/\d+/modules",    # /courses/{id}/modules (se público)
+    r"(?=/courses/).*/reviews",  # /courses/{id}/reviews
+]
 
-def register_jwt_middleware(app):
-    """Middleware global de validação JWT"""
-    @app.middleware("http")
-    async def jwt_middleware(request: Request, call_next):
+
+class PublicRoutes:
+    """
+    Tabela de rotas públicas montada uma única vez:
+    - caminhos fixos em um frozenset (qualquer método)
+    - padrões dinâmicos de GET unidos em uma única regex compilada
+    """
+
+    def __init__(self, paths=PUBLIC_PATHS, get_patterns=PUBLIC_GET_PATTERNS):
+        self.paths = frozenset(paths)
+        self.get_regex = re.compile("|".join(f"(?:{p})" for p in get_patterns))
+
+    def is_public(self, method: str, path: str) -> bool:
+        normalized_path = path.rstrip("/") or "/"
+        if normalized_path in self.paths:
+            return True
+        return method == "GET" and self.get_regex.fullmatch(normalized_path) is not None
+
+
+class JWTAuthMiddleware:
+    """
+    Middleware ASGI puro de validação JWT.
+
+    Diferente do @app.middleware("http") (BaseHTTPMiddleware), não cria tarefas nem
+    streams extras por requisição: rotas públicas vão direto para a aplicação e, nas
+    protegidas, o usuário do token é gravado em scope["state"] (request.state.user).
+    """
+
+    def __init__(self, app, public_routes: PublicRoutes | None = None):
+        self.app = app
+        self.public_routes = public_routes or PublicRoutes()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # 🔓 Rotas públicas (fixas e dinâmicas)
+        if self.public_routes.is_public(scope["method"], scope["path"]):
+            return await self.app(scope, receive, send)
+
+        # 🔐 Rotas protegidas
         try:
-            path = request.url.path
-            normalized_path = path.rstrip("/") or "/"
-
-            # 🔓 Rotas públicas fixas
-            if normalized_path in PUBLIC_PATHS:
-                return await call_next(request)
-
-            # 🔓 Rotas públicas dinâmicas (GET)
-            if request.method == "GET":
-                # /courses/{id}
-                if normalized_path.startswith("/courses/"):
-                    parts = normalized_path.split("/")
-                    if len(parts) == 3 and parts[2].isdigit():
-                        return await call_next(request)
-
-                    # /courses/{id}/modules (se público)
-                    if len(parts) == 4 and parts[2].isdigit() and parts[3] == "modules":
-                        return await call_next(request)
-
-                # /courses/{id}/reviews
-                if normalized_path.startswith("/courses/") and normalized_path.endswith("/reviews"):
-                    return await call_next(request)
-
-            # 🔐 Rotas protegidas
-            auth_header = request.headers.get("Authorization")
+            auth_header = _header(scope, b"authorization")
             if not auth_header or not auth_header.startswith("Bearer "):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,18 +81,24 @@ def register_jwt_middleware(app):
 
             token = auth_header.split(" ")[1]
             user_data = verify_token(token)
-            request.state.user = user_data
-
-            return await call_next(request)
-
         except HTTPException as e:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=e.status_code,
                 content={"detail": e.detail}
             )
+            return await response(scope, receive, send)
+
+        scope.setdefault("state", {})["user"] = user_data
+        return await self.app(scope, receive, send)
 
-#		except Exception as e:
-#			return JSONResponse(
-#				status_code=500,
-#				content={"detail": "Erro interno no servidor."}
-#			)
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def register_jwt_middleware(app):
+    """Middleware global de validação JWT"""
+    app.add_middleware(JWTAuthMiddleware)
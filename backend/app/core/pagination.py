@@ -0,0 +1,56 @@
+import base64
+import json
+import math
+from typing import Any
+
+from fastapi import HTTPException, status
+
+# Header usado para devolver o cursor da próxima página (o envelope {data, message} não muda)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Faixa das colunas Integer (int4) do Postgres: fora dela o bind falharia no banco (500)
+_INT4_MIN, _INT4_MAX = -(2 ** 31), 2 ** 31 - 1
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Gera o token opaco de paginação keyset a partir dos valores da última linha
+    da página (ex.: (preco, id)). O front só precisa devolver o token como veio.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _converter(value: Any, tipo: type) -> Any:
+    """Valor do cursor no tipo da coluna de ordenação (ValueError se não bater)"""
+    # bool é subclasse de int no Python, mas nunca é um valor de ordenação válido
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if tipo is int and isinstance(value, int) and _INT4_MIN <= value <= _INT4_MAX:
+        return value
+    # O json aceita NaN/Infinity (e números enormes viram inf): nada disso é uma posição válida
+    if tipo is float and isinstance(value, (int, float)) and math.isfinite(value):
+        return float(value)
+    raise ValueError(value)
+
+
+def decode_cursor(token: str, size: int, tipos: tuple[type, ...] | None = None) -> list:
+    """
+    Decodifica o token gerado por `encode_cursor`.
+    `tipos` (int ou float), um por valor, são os tipos das colunas de ordenação.
+    Lança 400 se o token estiver malformado, não tiver `size` valores ou algum valor
+    não for do tipo esperado (o erro não chega ao banco como 500).
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(values)
+        if tipos is not None:
+            values = [_converter(value, tipo) for value, tipo in zip(values, tipos)]
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido."
+        )
+    return values
@@ -0,0 +1,143 @@
+"""
+Limite de tentativas de login (por IP e por e-mail) com janela deslizante.
+
+Algoritmo "sliding window counter": por chave guarda só o contador da janela atual e o
+da anterior; a estimativa é `anterior * (fração da janela anterior ainda visível) + atual`.
+Cada tentativa é O(1) e a memória é limitada (no máximo `max_keys` chaves, LRU).
+
+O backend é plugável (`RateLimitBackend`): o padrão é em memória, por processo; um
+backend compartilhado (ex.: Redis) só precisa implementar `hit` e `reset`.
+
+A checagem roda como dependência da rota, antes de qualquer consulta ao banco ou hash de senha.
+"""
+
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import (
+    LOGIN_LIMIT_PER_IP,
+    LOGIN_LIMIT_PER_EMAIL,
+    LOGIN_LIMIT_WINDOW_SECONDS,
+    LOGIN_LIMIT_MAX_KEYS,
+)
+from app.schemas.user import UsuarioLogin
+
+
+class RateLimitBackend(ABC):
+    """Interface dos backends de limite"""
+
+    @abstractmethod
+    def hit(self, key: str, limit: int, window: float) -> float:
+        """
+        Registra uma tentativa para `key` se ela ainda couber no limite.
+        Retorna 0 se foi permitida, ou quantos segundos faltam para a próxima ser aceita.
+        """
+
+    @abstractmethod
+    def reset(self, key: str) -> None:
+        """Esquece as tentativas de `key`"""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Backend em memória (por processo), thread-safe e com número máximo de chaves"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        # chave -> [índice da janela atual, contador atual, contador anterior]
+        self._janelas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> float:
+        agora = time.time()
+        indice = int(agora // window)
+        decorrido = agora - indice * window
+
+        with self._lock:
+            janela = self._janelas.get(key)
+            if janela is None:
+                janela = [indice, 0, 0]
+            elif janela[0] != indice:
+                # Avançou uma janela: a atual vira a anterior; avançou mais de uma: zera
+                janela = [indice, 0, janela[1] if janela[0] == indice - 1 else 0]
+
+            _, atual, anterior = janela
+            peso = 1 - decorrido / window
+            if anterior * peso + atual >= limit:
+                self._guardar(key, janela)
+                return self._espera(atual, anterior, limit, window, decorrido)
+
+            janela[1] += 1
+            self._guardar(key, janela)
+            return 0
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._janelas.pop(key, None)
+
+    def _guardar(self, key: str, janela: list) -> None:
+        self._janelas[key] = janela
+        self._janelas.move_to_end(key)
+        while len(self._janelas) > self.max_keys:
+            self._janelas.popitem(last=False)
+
+    @staticmethod
+    def _espera(atual: int, anterior: int, limit: int, window: float, decorrido: float) -> float:
+        # Momento t (dentro da janela) em que anterior * (1 - t/window) + atual < limit
+        # (em t exatamente a estimativa ainda é `limit`: a espera é positiva, nunca 0 = permitida)
+        if anterior and atual < limit:
+            t = window * (1 - (limit - atual) / anterior)
+            if t >= decorrido:
+                return max(t - decorrido, 1e-3)
+        # Só a próxima janela libera
+        return window - decorrido
+
+
+class LoginRateLimiter:
+    """Aplica os limites de login por IP e por e-mail usando o backend configurado"""
+
+    def __init__(self, backend: RateLimitBackend, per_ip: int, per_email: int, window: float):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.window = window
+        self.rejected = 0
+
+    def check(self, ip: str, email: str) -> None:
+        """Levanta 429 (com Retry-After) se o IP ou o e-mail passaram do limite"""
+        espera = 0
+        if self.per_ip > 0:
+            espera = self.backend.hit(f"login:ip:{ip}", self.per_ip, self.window)
+        if not espera and self.per_email > 0:
+            espera = self.backend.hit(f"login:email:{email.strip().lower()}", self.per_email, self.window)
+
+        if espera:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Muitas tentativas de login. Tente novamente mais tarde.",
+                headers={"Retry-After": str(max(1, math.ceil(espera)))},
+            )
+
+
+login_rate_limiter = LoginRateLimiter(
+    backend=MemoryRateLimitBackend(max_keys=LOGIN_LIMIT_MAX_KEYS),
+    per_ip=LOGIN_LIMIT_PER_IP,
+    per_email=LOGIN_LIMIT_PER_EMAIL,
+    window=LOGIN_LIMIT_WINDOW_SECONDS,
+)
+
+
+def limitar_login(data: UsuarioLogin, request: Request) -> None:
+    """
+    Dependência da rota de login: conta a tentativa e barra (429) quem passou do limite.
+    Roda antes do corpo da rota, então tentativas barradas não tocam no banco nem no hash.
+    """
+    # Atrás do load balancer, o uvicorn (--proxy-headers + FORWARDED_ALLOW_IPS) já troca o
+    # request.client pelo IP do X-Forwarded-For; sem isso todos teriam o IP do balanceador
+    ip = request.client.host if request.client else "desconhecido"
+    login_rate_limiter.check(ip, data.email)
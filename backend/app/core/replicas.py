@@ -0,0 +1,309 @@
+"""
+Réplicas de leitura: rotas GET mandam as consultas para uma réplica em vez do primário.
+
+- URLs em DATABASE_REPLICA_URLS (separadas por vírgula); sem nenhuma, tudo continua no primário
+- `get_read_db` / `get_async_read_db`: versões de get_db / get_async_db para rotas só de leitura
+- Escolha em round-robin entre as réplicas saudáveis; sem nenhuma saudável, vai para o primário
+- Saúde:
+    passiva: erro de conexão em uma réplica a tira da rotação por REPLICA_EJECT_SECONDS
+    ativa:   uma thread em segundo plano mede o atraso de replicação de cada réplica e tira
+             as que passarem de REPLICA_MAX_LAG_SECONDS (ou não responderem); as que voltarem
+             ao normal entram de novo na rotação
+- Read-your-writes: o commit de uma sessão de get_db/get_async_db marca o usuário da
+  requisição, e por READ_YOUR_WRITES_SECONDS as leituras dele vão para o primário
+  (ex.: depois do toggle_class ele vê o próprio progresso, depois do criar_avaliacao a
+  própria avaliação)
+- Sessões em réplica levam `db.info["replica"]`: o @cached_response não guarda o que elas
+  leram logo depois de uma invalidação (ver app.core.cache), senão o cache compartilhado
+  ficaria com o dado antigo da réplica, servido também para quem escreveu
+
+Como os demais caches, a marcação de read-your-writes é por processo: uma leitura logo
+depois da escrita, mas atendida por outro worker, ainda pode vir da réplica.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import (
+    REPLICA_EJECT_SECONDS,
+    REPLICA_HEALTH_CHECK_SECONDS,
+    REPLICA_MAX_LAG_SECONDS,
+    READ_YOUR_WRITES_SECONDS,
+    READ_YOUR_WRITES_MAX_ENTRIES,
+)
+from app.core.db_pool import PoolMetrics
+from app.core.security import verify_token
+from app.database import (
+    SessionLocal,
+    AsyncSessionLocal,
+    criar_engine,
+    criar_async_engine,
+    async_url_e_ssl,
+)
+
+logger = logging.getLogger(__name__)
+
+# Atraso de replicação em segundos (0 se a réplica já aplicou tudo o que recebeu;
+# NULL/0 se o banco não for uma réplica, ex.: em desenvolvimento)
+_SQL_ATRASO = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class Replica:
+    """Uma réplica: engines sync/async, fábricas de sessão e estado de saúde"""
+
+    def __init__(self, nome: str, url: str):
+        self.nome = nome
+        self.pool_metrics = PoolMetrics(nome)
+        self.async_pool_metrics = PoolMetrics(f"{nome}-async")
+        self.engine = criar_engine(url, self.pool_metrics)
+        async_url, async_connect_args = async_url_e_ssl(url)
+        self.async_engine = criar_async_engine(async_url, async_connect_args, self.async_pool_metrics)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.AsyncSessionLocal = async_sessionmaker(
+            bind=self.async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.ejetada_ate = 0.0
+        self.motivo = None
+        self.atraso = None
+        self.ejecoes = 0
+        self.leituras = 0
+
+    @property
+    def saudavel(self) -> bool:
+        return self.ejetada_ate <= time.monotonic()
+
+
+class ReplicaSet:
+    """Round-robin entre as réplicas saudáveis, com ejeção por erro/atraso. Thread-safe."""
+
+    def __init__(self, replicas: list[Replica], eject_seconds: float, max_lag: float):
+        self.replicas = replicas
+        self.eject_seconds = eject_seconds
+        self.max_lag = max_lag
+        self._proxima = itertools.count()
+        self._lock = threading.Lock()
+        self.leituras_primario = 0
+
+        for replica in replicas:
+            self._ejetar_em_erro(replica, replica.engine)
+            self._ejetar_em_erro(replica, replica.async_engine.sync_engine)
+
+    def _ejetar_em_erro(self, replica: Replica, engine) -> None:
+        @event.listens_for(engine, "handle_error")
+        def _erro(contexto):
+            # Só falha de conexão tira a réplica; erro de SQL é problema da consulta
+            if contexto.is_disconnect or contexto.connection is None:
+                self.ejetar(replica, f"erro de conexão: {contexto.original_exception!r}")
+
+    def escolher(self) -> Replica | None:
+        """Próxima réplica saudável no round-robin (None se não houver nenhuma)"""
+        if not self.replicas:
+            return None
+        inicio = next(self._proxima)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(inicio + i) % len(self.replicas)]
+            if replica.saudavel:
+                with self._lock:
+                    replica.leituras += 1
+                return replica
+        return None
+
+    def ejetar(self, replica: Replica, motivo: str, segundos: float | None = None) -> None:
+        with self._lock:
+            if replica.saudavel:
+                replica.ejecoes += 1
+                logger.warning("Réplica %s fora da rotação: %s", replica.nome, motivo)
+            replica.ejetada_ate = time.monotonic() + (self.eject_seconds if segundos is None else segundos)
+            replica.motivo = motivo
+
+    def readmitir(self, replica: Replica) -> None:
+        with self._lock:
+            replica.ejetada_ate = 0.0
+            replica.motivo = None
+
+    def contar_primario(self) -> None:
+        with self._lock:
+            self.leituras_primario += 1
+
+    def verificar(self) -> None:
+        """Mede o atraso de cada réplica e tira/readmite conforme REPLICA_MAX_LAG_SECONDS"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conexao:
+                    atraso = conexao.execute(_SQL_ATRASO).scalar() or 0.0
+            except Exception as e:
+                replica.atraso = None
+                self.ejetar(replica, f"verificação falhou: {e!r}")
+                continue
+            replica.atraso = float(atraso)
+            if replica.atraso > self.max_lag:
+                # Continua fora até a próxima verificação mostrar que alcançou o primário
+                self.ejetar(replica, f"atraso de {replica.atraso:.1f}s", segundos=float("inf"))
+            else:
+                self.readmitir(replica)
+
+    def stats(self) -> dict:
+        agora = time.monotonic()
+        with self._lock:
+            return {
+                "primary_reads": self.leituras_primario,
+                "replicas": [
+                    {
+                        "name": replica.nome,
+                        "healthy": replica.ejetada_ate <= agora,
+                        "reason": replica.motivo,
+                        "lag_seconds": replica.atraso,
+                        "ejections": replica.ejecoes,
+                        "reads": replica.leituras,
+                        "pool": replica.pool_metrics.stats(),
+                        "async_pool": replica.async_pool_metrics.stats(),
+                    }
+                    for replica in self.replicas
+                ],
+            }
+
+
+class ReadYourWrites:
+    """Usuários que escreveram há pouco (id → até quando lê do primário). LRU, thread-safe."""
+
+    def __init__(self, window: float, max_entries: int):
+        self.window = window
+        self.max_entries = max_entries
+        self._ate: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def marcar(self, user_id) -> None:
+        with self._lock:
+            self._ate[user_id] = time.monotonic() + self.window
+            self._ate.move_to_end(user_id)
+            while len(self._ate) > self.max_entries:
+                self._ate.popitem(last=False)
+
+    def recente(self, user_id) -> bool:
+        with self._lock:
+            ate = self._ate.get(user_id)
+            if ate is None:
+                return False
+            if ate <= time.monotonic():
+                del self._ate[user_id]
+                return False
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._ate), "window_seconds": self.window}
+
+
+def _urls_replicas() -> list[str]:
+    return [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+
+replica_set = ReplicaSet(
+    [Replica(f"replica-{i}", url) for i, url in enumerate(_urls_replicas(), start=1)],
+    eject_seconds=REPLICA_EJECT_SECONDS,
+    max_lag=REPLICA_MAX_LAG_SECONDS,
+)
+
+read_your_writes = ReadYourWrites(window=READ_YOUR_WRITES_SECONDS, max_entries=READ_YOUR_WRITES_MAX_ENTRIES)
+
+
+@event.listens_for(Session, "after_commit")
+def _apos_commit(sessao):
+    # Sessões de get_db/get_async_db levam o id do usuário da requisição (ver app.database)
+    user_id = sessao.info.get("usuario_id")
+    if user_id is not None:
+        read_your_writes.marcar(user_id)
+
+
+def _usuario_id(request: Request):
+    """Id do usuário da requisição; em rotas públicas o middleware não decodifica o token"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return None
+        try:
+            user = verify_token(auth_header.split(" ", 1)[1])
+        except HTTPException:
+            return None
+    return user.get("id")
+
+
+def _replica_para(request: Request) -> Replica | None:
+    """Réplica para esta leitura, ou None para ler do primário"""
+    if not replica_set.replicas:
+        return None
+    user_id = _usuario_id(request)
+    replica = None
+    if user_id is None or not read_your_writes.recente(user_id):
+        replica = replica_set.escolher()
+    if replica is None:
+        replica_set.contar_primario()
+    return replica
+
+
+def _ejetar_se_conexao(replica: Replica | None, erro: Exception) -> None:
+    # Erros de conexão do asyncpg (ex.: ConnectionRefusedError) não passam pelo handle_error
+    if replica is not None and isinstance(erro, OSError):
+        replica_set.ejetar(replica, f"erro de conexão: {erro!r}")
+
+
+def _marcar_replica(db, replica: Replica | None) -> None:
+    if replica is not None:
+        db.info["replica"] = replica.nome
+
+
+def get_read_db(request: Request):
+    """get_db para rotas só de leitura: sessão em uma réplica (ou no primário, ver acima)"""
+    replica = _replica_para(request)
+    db = (replica.SessionLocal if replica else SessionLocal)()
+    _marcar_replica(db, replica)
+    try:
+        yield db
+    except Exception as e:
+        _ejetar_se_conexao(replica, e)
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """get_async_db para rotas `async def` só de leitura"""
+    replica = _replica_para(request)
+    async with (replica.AsyncSessionLocal if replica else AsyncSessionLocal)() as db:
+        _marcar_replica(db, replica)
+        try:
+            yield db
+        except Exception as e:
+            _ejetar_se_conexao(replica, e)
+            raise
+
+
+def iniciar_verificacao_replicas(intervalo: float = REPLICA_HEALTH_CHECK_SECONDS) -> threading.Thread | None:
+    """Sobe uma thread daemon que chama `replica_set.verificar` a cada `intervalo` segundos"""
+    if not replica_set.replicas:
+        return None
+
+    def loop():
+        while True:
+            try:
+                replica_set.verificar()
+            except Exception:
+                logger.exception("Falha ao verificar as réplicas de leitura")
+            time.sleep(intervalo)
+
+    thread = threading.Thread(target=loop, name="replica-health", daemon=True)
+    thread.start()
+    return thread
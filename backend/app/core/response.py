@@ -1,21 +1,32 @@
 from typing import Any
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
 
 
-from app.schemas.success import SuccessResponse
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada em uma única passada pelo pydantic-core (Rust).
+
+    Models pydantic, datetime/date, UUID, enums, dicts e listas são convertidos direto
+    para bytes, sem o `jsonable_encoder` (que percorre o conteúdo recursivamente em Python
+    e gera uma cópia antes do `json.dumps`). Tipos desconhecidos caem no `jsonable_encoder`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, fallback=jsonable_encoder)
+
 
 def success_response(
     *,
     data: Any,
     message: str,
     status_code: int = 200,
+    headers: dict | None = None,
 ):
-    payload = SuccessResponse(
-        data=data,
-        message=message,
-    )
-    return JSONResponse(
+    # Mesmo formato de app.schemas.success.SuccessResponse ({data, message})
+    return FastJSONResponse(
         status_code=status_code,
-        content=jsonable_encoder(payload),
+        content={"data": data, "message": message},
+        headers=headers,
     )
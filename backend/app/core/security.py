@@ -1,15 +1,19 @@
 # app/core/security.py
 from datetime import datetime, timedelta
+from uuid import uuid4
 from fastapi import HTTPException, status, Depends, Request
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import Usuario
 from app.core.config import JWT_SECRET_KEY, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.token_cache import token_cache
+from app.core.denylist import revoked_sessions
 
 
 # Função na qual gera o token JWT e retorna o mesmo
-def create_access_token(user_id: int, email: str , role: str):
+# `sid` = id da sessão (refresh token) à qual o access token pertence, usado na revogação
+def create_access_token(user_id: int, email: str , role: str, sid: str | None = None):
 
 	expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
@@ -17,8 +21,11 @@ def create_access_token(user_id: int, email: str , role: str):
 		"sub": str(user_id),
 		"email": email,
 		"role" : role,
-		"exp": expire
+		"exp": expire,
+		"jti": uuid4().hex,
 	}
+	if sid is not None:
+		payload["sid"] = sid
 
 	# jwt.encode = cria a string JWT segura e assinada
 	token = jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
@@ -27,6 +34,22 @@ def create_access_token(user_id: int, email: str , role: str):
 
 # Função para verificar se o token é valido
 def verify_token(token: str):
+	# Token já verificado antes e ainda dentro do exp: não decodifica de novo
+	user = token_cache.get(token)
+	if user is None:
+		user = _decode_token(token)
+		token_cache.set(token, user)
+
+	# Sessão revogada (logout): checagem só em memória, sem ida ao banco
+	if user.get("sid") and user["sid"] in revoked_sessions:
+		token_cache.invalidate(token)
+		raise HTTPException(
+			status_code=status.HTTP_401_UNAUTHORIZED,
+			detail="Token revogado.")
+
+	return user
+
+def _decode_token(token: str) -> dict:
 	try:
 		'''
 		Decode decodifica o payload e header do token cria um novo a partir da secret key e verifica se os 2 batem.
@@ -39,7 +62,14 @@ def verify_token(token: str):
 		email = payload.get("email")
 		role = payload.get("role")
 		exp = payload.get("exp")
-		return {"id": int(user_id), "email": email, "role": role, "exp": exp}
+		return {
+			"id": int(user_id),
+			"email": email,
+			"role": role,
+			"exp": exp,
+			"jti": payload.get("jti"),
+			"sid": payload.get("sid"),
+		}
 
 	except JWTError:
 		raise HTTPException(
@@ -57,11 +87,12 @@ def allowed_roles(*list_roles: str):
     Todas as roles passadas nos argumentos serão autorizadas.
     Se não passar nada, qualquer role autenticada tem acesso.
     """
-    def dependency(request: Request) -> dict:
+    async def dependency(request: Request) -> dict:
         """
         Função dependência que retorna um dicionário com os dados do payload do usuário.
         Primeiro tenta usar o que o middleware colocou em request.state.user.
         Se não houver, faz o parse do header Authorization aqui mesmo.
+        É `async` porque só faz CPU (sem IO): roda direto no event loop, sem passar pelo threadpool.
         """
 
         # 1) Tenta pegar o usuário setado pelo middleware
@@ -80,7 +111,6 @@ def allowed_roles(*list_roles: str):
             user = verify_token(token)
 
         role = user.get("role")
-        print(role)
 
         # 3) Se foi passada uma lista de roles, validamos se a role do usuário é permitida
         if list_roles and role not in list_roles:
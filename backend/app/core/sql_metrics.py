@@ -0,0 +1,227 @@
+"""
+Instrumentação das consultas SQL por requisição: quantas, quanto tempo no banco e N+1.
+
+- Eventos do SQLAlchemy em todos os engines (primário, async, réplicas) contam cada statement
+  e somam o tempo de execução na requisição atual (ContextVar; vale também para as rotas sync,
+  que rodam no threadpool com uma cópia do contexto, e para o `run_sync` das rotas async)
+- "Forma" da consulta: o SQL com parâmetros, números, strings e listas do IN trocados por `?`.
+  A mesma forma repetida SQL_N_PLUS_ONE_THRESHOLD vezes ou mais na requisição é marcada
+  como N+1 (ex.: uma consulta por matrícula dentro de um loop)
+- `SqlMetricsMiddleware`:
+    desenvolvimento (SQL_SERVER_TIMING): header `Server-Timing` em cada resposta (aparece na
+    aba Network do navegador) e log das formas N+1
+    sempre: métricas agregadas por rota (template, ex.: "GET /courses/{curso_id}") em
+    `sql_metrics.stats()` (rota GET /db/queries/stats)
+
+Consultas fora de uma requisição (threads de fundo, startup) não são contadas.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import SQL_N_PLUS_ONE_THRESHOLD, SQL_SERVER_TIMING, SQL_METRICS_MAX_SHAPES
+
+logger = logging.getLogger(__name__)
+
+# Chave, no connection.info, da pilha de inícios dos statements em execução
+_INICIOS = "sql_metrics_inicios"
+
+# Normalização do SQL para a forma da consulta
+_PARAMETROS = re.compile(r"%\(\w+\)s|\$\d+|%s|(?<!:):\w+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+def forma_consulta(statement: str) -> str:
+    """SQL sem valores: consultas que só diferem nos parâmetros têm a mesma forma"""
+    forma = _PARAMETROS.sub("?", statement)
+    forma = _LISTAS.sub("(?)", forma)
+    return _ESPACOS.sub(" ", forma).strip()
+
+
+class ConsultasRequisicao:
+    """Statements de uma requisição: total, tempo no banco e contagem por forma"""
+
+    __slots__ = ("total", "segundos", "formas")
+
+    def __init__(self):
+        self.total = 0
+        self.segundos = 0.0
+        self.formas: Counter = Counter()
+
+    def registrar(self, statement: str, duracao: float) -> None:
+        self.total += 1
+        self.segundos += duracao
+        self.formas[forma_consulta(statement)] += 1
+
+    def n_plus_one(self, limite: int = SQL_N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """Formas repetidas `limite` vezes ou mais, da mais repetida para a menos"""
+        return [(forma, n) for forma, n in self.formas.most_common() if n >= limite]
+
+
+_consultas_atuais: ContextVar[ConsultasRequisicao | None] = ContextVar("consultas_atuais", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _consultas_atuais.get() is not None:
+        conn.info.setdefault(_INICIOS, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    consultas = _consultas_atuais.get()
+    inicios = conn.info.get(_INICIOS)
+    if consultas is not None and inicios:
+        consultas.registrar(statement, time.perf_counter() - inicios.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _erro(contexto):
+    # Statement que falhou não chega no after_cursor_execute: descarta o início dele
+    conexao = contexto.connection
+    if conexao is not None and not conexao.closed:
+        inicios = conexao.info.get(_INICIOS)
+        if inicios:
+            inicios.pop()
+
+
+class _RotaStats:
+    __slots__ = ("requisicoes", "statements", "segundos", "max_statements", "max_segundos", "n_plus_one", "formas")
+
+    def __init__(self):
+        self.requisicoes = 0
+        self.statements = 0
+        self.segundos = 0.0
+        self.max_statements = 0
+        self.max_segundos = 0.0
+        self.n_plus_one = 0
+        # forma N+1 -> [requisições em que apareceu, maior repetição numa requisição]
+        self.formas: dict[str, list[int]] = {}
+
+
+class SqlMetrics:
+    """Métricas agregadas por rota. Thread-safe."""
+
+    def __init__(self, limite_n_plus_one: int, max_formas: int):
+        self.limite_n_plus_one = limite_n_plus_one
+        self.max_formas = max_formas
+        self._rotas: dict[str, _RotaStats] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, rota: str, consultas: ConsultasRequisicao) -> list[tuple[str, int]]:
+        """Soma a requisição nas métricas da rota e devolve as formas N+1 dela"""
+        repetidas = consultas.n_plus_one(self.limite_n_plus_one)
+        with self._lock:
+            stats = self._rotas.get(rota)
+            if stats is None:
+                stats = self._rotas[rota] = _RotaStats()
+            stats.requisicoes += 1
+            stats.statements += consultas.total
+            stats.segundos += consultas.segundos
+            stats.max_statements = max(stats.max_statements, consultas.total)
+            stats.max_segundos = max(stats.max_segundos, consultas.segundos)
+            if repetidas:
+                stats.n_plus_one += 1
+            for forma, n in repetidas:
+                contagem = stats.formas.get(forma)
+                if contagem is None:
+                    if len(stats.formas) >= self.max_formas:
+                        continue
+                    contagem = stats.formas[forma] = [0, 0]
+                contagem[0] += 1
+                contagem[1] = max(contagem[1], n)
+        return repetidas
+
+    def stats(self) -> dict:
+        with self._lock:
+            rotas = sorted(self._rotas.items(), key=lambda item: item[1].segundos, reverse=True)
+            return {
+                "n_plus_one_threshold": self.limite_n_plus_one,
+                "routes": {
+                    rota: {
+                        "requests": stats.requisicoes,
+                        "statements": stats.statements,
+                        "statements_avg": round(stats.statements / stats.requisicoes, 2),
+                        "statements_max": stats.max_statements,
+                        "db_ms_total": round(stats.segundos * 1000, 2),
+                        "db_ms_avg": round(stats.segundos / stats.requisicoes * 1000, 3),
+                        "db_ms_max": round(stats.max_segundos * 1000, 3),
+                        "n_plus_one_requests": stats.n_plus_one,
+                        "n_plus_one": [
+                            {"statement": forma, "requests": contagem[0], "max_repeats": contagem[1]}
+                            for forma, contagem in stats.formas.items()
+                        ],
+                    }
+                    for rota, stats in rotas
+                },
+            }
+
+
+sql_metrics = SqlMetrics(limite_n_plus_one=SQL_N_PLUS_ONE_THRESHOLD, max_formas=SQL_METRICS_MAX_SHAPES)
+
+
+def _descricao(texto: str, limite: int = 80) -> str:
+    """Texto seguro para o desc="..." do Server-Timing (ASCII, sem aspas/barras)"""
+    texto = texto.encode("ascii", "replace").decode().replace("\\", "/").replace('"', "'")
+    return texto if len(texto) <= limite else texto[: limite - 3] + "..."
+
+
+def server_timing(consultas: ConsultasRequisicao, repetidas: list[tuple[str, int]]) -> str:
+    """Valor do header Server-Timing: tempo total no banco e uma entrada por forma N+1"""
+    plural = "" if consultas.total == 1 else "s"
+    partes = [f'db;dur={consultas.segundos * 1000:.2f};desc="{consultas.total} consulta{plural}"']
+    for forma, n in repetidas[:3]:
+        partes.append(f'db-n1;desc="{n}x {_descricao(forma)}"')
+    return ", ".join(partes)
+
+
+class SqlMetricsMiddleware:
+    """
+    Middleware ASGI puro: abre o contador de consultas da requisição e, no fim, registra
+    as métricas pela rota (template do path, disponível em scope["route"] depois do roteamento).
+    Com `server_timing`, acrescenta o header Server-Timing no início da resposta.
+    """
+
+    def __init__(self, app, metricas: SqlMetrics | None = None, server_timing: bool = SQL_SERVER_TIMING):
+        self.app = app
+        self.metricas = metricas or sql_metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        consultas = ConsultasRequisicao()
+        token = _consultas_atuais.set(consultas)
+
+        async def send_com_timing(message):
+            if message["type"] == "http.response.start":
+                repetidas = consultas.n_plus_one(self.metricas.limite_n_plus_one)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(consultas, repetidas).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_com_timing if self.server_timing else send)
+        finally:
+            _consultas_atuais.reset(token)
+            route = scope.get("route")
+            rota = f"{scope['method']} {route.path if route is not None else '(sem rota)'}"
+            repetidas = self.metricas.registrar(rota, consultas)
+            if repetidas and self.server_timing:
+                for forma, n in repetidas:
+                    logger.warning("Possível N+1 em %s: %dx %s", rota, n, forma)
+
+
+def register_sql_metrics_middleware(app):
+    """Instrumentação SQL por requisição (ver SqlMetricsMiddleware)"""
+    app.add_middleware(SqlMetricsMiddleware)
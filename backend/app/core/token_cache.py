@@ -0,0 +1,133 @@
+"""
+Cache em memória (por processo) dos tokens JWT já verificados.
+
+O front manda o mesmo bearer token em todas as requisições da sessão; em vez de
+decodificar e conferir a assinatura HS256 toda vez, `verify_token` guarda as claims
+decodificadas aqui até o `exp` do token.
+
+- Chave: SHA-256 do token (o token em si não fica em memória)
+- Limite de entradas; ao estourar, sai o token usado há mais tempo (LRU)
+- Remoção explícita para revogação: `invalidate(token)`, `invalidate_user(user_id, sid)` e
+  `clear()`. O `revogar_sessao` (logout, reuso de refresh token) e a sincronização da
+  denylist tiram do cache os tokens da sessão revogada; a denylist continua sendo conferida
+  pelo `verify_token` a cada uso, que também descarta o token revogado que ainda estava aqui
+- Contadores de hit/miss/evicção em `token_cache.stats()`
+
+Usado tanto pelo middleware JWT quanto pelo `allowed_roles` (ambos chamam `verify_token`).
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import TOKEN_CACHE_MAX_ENTRIES
+
+
+def _chave(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """Cache LRU de claims por token, válido até o `exp`. Thread-safe."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # chave -> (claims, exp em timestamp unix)
+        self._entradas: OrderedDict = OrderedDict()
+        # user_id -> chaves dos tokens do usuário (para revogar todos de uma vez)
+        self._por_usuario: dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> dict | None:
+        key = _chave(token)
+        with self._lock:
+            entrada = self._entradas.get(key)
+            if entrada is None:
+                self.misses += 1
+                return None
+            claims, exp = entrada
+            if exp <= time.time():
+                self._remover(key)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(key)
+            self.hits += 1
+            # Cópia: quem recebe pode alterar o dict sem afetar o cache
+            return dict(claims)
+
+    def set(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if not exp or exp <= time.time() or self.max_entries <= 0:
+            return
+
+        key = _chave(token)
+        with self._lock:
+            if key in self._entradas:
+                self._remover(key)
+            self._entradas[key] = (dict(claims), exp)
+            self._por_usuario.setdefault(claims.get("id"), set()).add(key)
+
+            while len(self._entradas) > self.max_entries:
+                antiga = next(iter(self._entradas))
+                self._remover(antiga)
+                self.evictions += 1
+
+    def invalidate(self, token: str) -> bool:
+        """Remove um token (ex.: logout). Retorna se ele estava no cache."""
+        with self._lock:
+            removido = self._remover(_chave(token))
+            self.invalidations += removido
+            return removido
+
+    def invalidate_user(self, user_id: int, sid: str | None = None) -> int:
+        """
+        Remove os tokens do usuário (ex.: troca de senha/role); com `sid`, só os daquela
+        sessão (ex.: logout). Retorna quantos saíram.
+        """
+        with self._lock:
+            keys = [
+                key for key in self._por_usuario.get(user_id, ())
+                if sid is None or self._entradas[key][0].get("sid") == sid
+            ]
+            for key in keys:
+                self._remover(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_usuario.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entradas),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remover(self, key) -> bool:
+        entrada = self._entradas.pop(key, None)
+        if entrada is None:
+            return False
+        user_id = entrada[0].get("id")
+        keys = self._por_usuario.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._por_usuario[user_id]
+        return True
+
+
+token_cache = TokenCache(max_entries=TOKEN_CACHE_MAX_ENTRIES)
@@ -3,7 +3,8 @@ Configuração central de conexão com o banco de dados usando SQLAlchemy.
 
 Este arquivo é responsável por:
 - Ler a variável de ambiente `DATABASE_URL` (vinda do .env ou do docker-compose)
-- Criar o `engine`, que é a conexão principal com o banco (no nosso caso, Supabase/PostgreSQL)
+- Criar o `engine`, que é a conexão principal com o banco (no nosso caso, Supabase/PostgreSQL),
+  com o pool configurado por ambiente e instrumentado (ver app.core.db_pool)
 - Criar a fábrica de sessões (`SessionLocal`), utilizada pelas rotas e serviços. Não cria a conexão diretamente, mas sim sessões "sob demanda" a partir de um modelo de sessão.
 - Definir a `Base` para todos os modelos ORM do projeto, ou sejo, o modelo "mãe" de todas as tabelas.
 - Disponibilizar uma função de teste (`test_connection`) para validar a comunicação com o banco
@@ -13,9 +14,14 @@ Toda parte do backend que precisa acessar o banco utilizará estes componentes.
 
 import os
 
+from fastapi import Request
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app.core.db_pool import PoolMetrics, opcoes_pool, instrumentar_pool, connect_args_pooler
+
 # Lê a URL do banco de dados da variável de ambiente
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -23,18 +29,68 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não foi definida. Verifique seu .env e docker-compose.")
 
+# Argumentos de conexão do psycopg2 (primário e réplicas)
+# `options` é parâmetro de sessão: sai no modo transaction do pooler (ver connect_args_pooler)
+SYNC_CONNECT_ARGS = {
+    "sslmode": "require",
+    "options": "-c inet_server_family=4"} # reforça o SSL (além do ?sslmode=require na URL)
+
+
+def async_url_e_ssl(url: str):
+    """
+    Converte a DATABASE_URL (psycopg2) para o driver assíncrono (asyncpg).
+    O asyncpg não aceita `sslmode` na URL: ele vira o argumento `ssl` da conexão.
+    """
+    url = make_url(url)
+    if not url.drivername.startswith("postgresql"):
+        return url, {}
+    query = dict(url.query)
+    sslmode = query.pop("sslmode", "require")
+    return url.set(drivername="postgresql+asyncpg", query=query), {"ssl": sslmode}
+
+
+def criar_engine(url: str, metricas: PoolMetrics):
+    """Engine sync com o pool configurado por ambiente e instrumentado (primário ou réplica)"""
+    engine_ = create_engine(url, **opcoes_pool(metricas), connect_args=connect_args_pooler(SYNC_CONNECT_ARGS))
+    instrumentar_pool(engine_, metricas)
+    return engine_
+
+
+def criar_async_engine(url, connect_args: dict, metricas: PoolMetrics):
+    """Engine assíncrono (asyncpg) com o pool configurado por ambiente e instrumentado"""
+    engine_ = create_async_engine(
+        url,
+        **opcoes_pool(metricas, assincrono=True),
+        connect_args=connect_args_pooler(connect_args, assincrono=True),
+    )
+    instrumentar_pool(engine_.sync_engine, metricas)
+    return engine_
+
+
+# Métricas dos pools (rota GET /db/pool/stats)
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
 # Cria o engine do SQLAlchemy apontado para o Supabase
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    connect_args={
-        "sslmode": "require",
-        "options": "-c inet_server_family=4"}, # reforça o SSL (além do ?sslmode=require na URL)
-)
+engine = criar_engine(DATABASE_URL, pool_metrics)
 
 # Fábrica de sessões (para serem utilizadas nos serviços/repos)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine assíncrono (asyncpg), usado pelas rotas `async def` de leitura/escrita mais acessadas.
+# Pode apontar para outra URL com ASYNC_DATABASE_URL (ex.: driver/host diferentes).
+ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS = async_url_e_ssl(os.getenv("ASYNC_DATABASE_URL") or DATABASE_URL)
+
+async_engine = criar_async_engine(ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS, async_pool_metrics)
+
+# Fábrica de sessões assíncronas; expire_on_commit=False evita lazy load (IO implícito) depois do commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base para os modelos ORM
 Base = declarative_base()
 
@@ -46,13 +102,30 @@ def test_connection():
     with engine.connect() as conn:
         conn.execute(text("SELECT 1"))
 
-def get_db():
+def _marcar_usuario(db, request: Request) -> None:
+    """Guarda na sessão quem fez a requisição (usado pelo read-your-writes, ver app.core.replicas)"""
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        db.info["usuario_id"] = user.get("id")
+
+def get_db(request: Request):
     """
     Função que cria uma sessão com o banco de dados, mantendo a garantia que será fechada.
     Usado como dependencia do FastAPI
     """
     db = SessionLocal()
+    _marcar_usuario(db, request)
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db(request: Request):
+    """
+    Versão assíncrona do get_db, para rotas `async def`.
+    Não ocupa thread do threadpool enquanto espera o banco.
+    Código sync existente pode ser reaproveitado com `await db.run_sync(funcao, ...)`.
+    """
+    async with AsyncSessionLocal() as db:
+        _marcar_usuario(db, request)
+        yield db
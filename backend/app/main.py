@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,12 +11,31 @@ from app.core.error_handlers import (
 )
 from app.core import middleware
 from app.core.cors import setup_cors
+from app.core.cache import response_cache
+from app.core.token_cache import token_cache
+from app.core.hash_pool import password_hash_pool
+from app.core.denylist import revoked_sessions
+from app.services.session_service import iniciar_sincronizacao_denylist
+from app.services.profile_service import profile_cache
+# Registra os eventos do ORM que invalidam os caches em memória
+import app.services.cache_invalidation_service  # noqa: F401
+from app.core.security import allowed_roles
+from app.core.response import success_response
 from app.routers import auth, category, level, course, instructor
 from app.routers import evaluation
 import os
 
 # importando a função de teste de conexão com Supabse
-from .database import test_connection, Base, engine
+from .database import (
+    test_connection, Base, engine, SessionLocal, async_engine, pool_metrics, async_pool_metrics
+)
+from app.core.db_pool import aquecer_pool, aquecer_pool_async
+from app.core.replicas import replica_set, read_your_writes, iniciar_verificacao_replicas
+from app.core.sql_metrics import sql_metrics, register_sql_metrics_middleware
+from app.core.config import (
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING, DB_POOL_PING_IDLE_SECONDS, DB_POOL_WARMUP, DB_POOLER_MODE,
+)
 
 Base.metadata.create_all(bind=engine)
 
@@ -29,6 +48,29 @@ app = FastAPI(
 
 middleware.register_jwt_middleware(app)
 
+# Consultas SQL por requisição (Server-Timing em desenvolvimento, métricas por rota sempre)
+register_sql_metrics_middleware(app)
+
+# Mantém a denylist de sessões revogadas (logout) sincronizada com o banco em segundo plano
+@app.on_event("startup")
+def iniciar_denylist():
+    iniciar_sincronizacao_denylist(SessionLocal)
+
+# Verificação de saúde/atraso das réplicas de leitura (se houver DATABASE_REPLICA_URLS)
+@app.on_event("startup")
+def iniciar_replicas():
+    iniciar_verificacao_replicas()
+
+# Abre as conexões dos pools antes da primeira requisição (TLS + autenticação com o Supabase)
+@app.on_event("startup")
+async def aquecer_conexoes():
+    if DB_POOL_WARMUP > 0:
+        aquecer_pool(engine, DB_POOL_WARMUP)
+        await aquecer_pool_async(async_engine, DB_POOL_WARMUP)
+        for replica in replica_set.replicas:
+            aquecer_pool(replica.engine, DB_POOL_WARMUP)
+            await aquecer_pool_async(replica.async_engine, DB_POOL_WARMUP)
+
 origins = [
     "http://localhost:5173",  # Localhost (Vite)
     "http://localhost:3000",  # Localhost (Alternativo)
@@ -41,6 +83,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # cursor da paginação keyset
 )
 
 app.include_router(auth.router)
@@ -70,6 +113,62 @@ def root():
 def status():
     return {"status": "ok", "docker": True, "backend": "online"}
 
+# Contadores do cache de respostas (hit/miss/evicções), para ajustar TTL e tamanho
+@app.get("/cache/stats")
+def cache_stats(usuario = Depends(allowed_roles("admin"))):
+    return success_response(
+        data={
+            **response_cache.stats(),
+            "tokens": token_cache.stats(),
+            "revoked_sessions": revoked_sessions.stats(),
+            "profiles": profile_cache.stats(),
+        },
+        message="Estatísticas do cache retornadas com sucesso."
+    )
+
+# Fila/latência do pool de hash de senha (login/cadastro)
+@app.get("/password-hash/stats")
+def password_hash_stats(usuario = Depends(allowed_roles("admin"))):
+    return success_response(
+        data=password_hash_pool.stats(),
+        message="Estatísticas do pool de hash retornadas com sucesso."
+    )
+
+# Uso dos pools de conexão (em uso, overflow, esperas, latência de checkout), para
+# dimensionar workers x limite de conexões do banco
+@app.get("/db/pool/stats")
+def db_pool_stats(usuario = Depends(allowed_roles("admin"))):
+    return success_response(
+        data={
+            "config": {
+                "pooler_mode": DB_POOLER_MODE,
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout_seconds": DB_POOL_TIMEOUT_SECONDS,
+                "pool_recycle_seconds": DB_POOL_RECYCLE_SECONDS,
+                "pre_ping": DB_POOL_PRE_PING,
+                "ping_idle_seconds": DB_POOL_PING_IDLE_SECONDS,
+                "warmup": DB_POOL_WARMUP,
+                # sync + async, em cada banco (primário e cada réplica)
+                "max_connections_per_worker": 2 * (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+            },
+            "sync": pool_metrics.stats(),
+            "async": async_pool_metrics.stats(),
+            "read_replicas": replica_set.stats(),
+            "read_your_writes": read_your_writes.stats(),
+        },
+        message="Estatísticas do pool de conexões retornadas com sucesso."
+    )
+
+# Consultas SQL por rota (quantidade, tempo no banco, requisições com N+1), para achar
+# as rotas que mais consultam o banco
+@app.get("/db/queries/stats")
+def db_queries_stats(usuario = Depends(allowed_roles("admin"))):
+    return success_response(
+        data=sql_metrics.stats(),
+        message="Estatísticas das consultas SQL retornadas com sucesso."
+    )
+
 # Rota para testar variáveis de ambiente de DB
 import os
 @app.get("/env")
@@ -12,3 +12,5 @@ from .evaluation import AvaliacaoCurso
 from .progress import ProgressoAulas
 from .certificate import Certificado
 from .level import Nivel
+from .table_version import VersaoTabela
+from .session import SessaoUsuario
@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, Text, Float, DateTime, ForeignKey
+    Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,14 @@ class Curso(Base):
     # NOME DA TABELA
     __tablename__ = "cursos"
 
+    # ÍNDICES
+    __table_args__ = (
+        # Ordenação/paginação do catálogo por preço (keyset: preco, id)
+        Index("ix_cursos_preco_id", "preco", "id"),
+        # Ordenação/paginação do catálogo por avaliação (keyset: media_avaliacoes, id)
+        Index("ix_cursos_media_avaliacoes_id", "media_avaliacoes", "id"),
+    )
+
     # COLUNAS
     id = Column(Integer, primary_key=True, index=True)
     url_image = Column(String(200), nullable=True)
@@ -26,22 +34,38 @@ class Curso(Base):
     preco = Column(Float, nullable=False)
     carga_horaria = Column(Integer, nullable=False)  # em horas
 
+    # AGREGADOS DE AVALIAÇÃO (desnormalizados)
+    # Mantidos por app.services.rating_service na mesma transação que cria a avaliação,
+    # para que catálogo/detalhe não precisem agregar a tabela 'avaliacao_curso'.
+    soma_avaliacoes = Column(Integer, nullable=False, default=0, server_default="0")
+    quantidade_avaliacoes = Column(Integer, nullable=False, default=0, server_default="0")
+    media_avaliacoes = Column(Float, nullable=False, default=0.0, server_default="0")
+    # Histograma: quantidade de avaliações por nota (1 a 5 estrelas)
+    qtd_nota_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    qtd_nota_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    qtd_nota_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    qtd_nota_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    qtd_nota_5 = Column(Integer, nullable=False, default=0, server_default="0")
+
     # CHAVES ESTRANGEIRAS
     nivel_id = Column(
         Integer,
         ForeignKey("niveis.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
     categoria_id = Column(
         Integer,
         ForeignKey("categorias.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     instrutor_id = Column(
         Integer,
         ForeignKey("instrutores.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     # CONTROLE DE DATA/HISTÓRIOC
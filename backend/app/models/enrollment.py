@@ -24,12 +24,14 @@ class Matricula(Base):
     aluno_id = Column(
         Integer,
         ForeignKey("usuarios.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
     curso_id = Column(
         Integer,
         ForeignKey("cursos.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     # CONTROLE DE DATA/HISTÓRICO
@@ -45,6 +47,12 @@ class Matricula(Base):
         nullable=True,
     )
 
+    # CONTADORES DE PROGRESSO (desnormalizados)
+    # Mantidos por app.services.progress_service a cada toggle de aula,
+    # para o percentual de conclusão ser lido direto da matrícula.
+    aulas_concluidas = Column(Integer, nullable=False, default=0, server_default="0")
+    total_aulas = Column(Integer, nullable=False, default=0, server_default="0")
+
     # RELACIONAMENTOS
     # Aluno 1:N → Um aluno pode ter muitas matrículas
     aluno = relationship(
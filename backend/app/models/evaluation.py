@@ -32,7 +32,8 @@ class AvaliacaoCurso(Base):
     curso_id = Column(
         Integer,
         ForeignKey("cursos.id"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     usuario_id = Column(
@@ -36,6 +36,7 @@ class Aula(Base):
         Integer,
         ForeignKey("modulos.id"),
         nullable=False,
+        index=True,
     )
 
     # CONTROLE DE DATA/HISTÓRICO
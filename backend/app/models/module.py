@@ -31,6 +31,7 @@ class Modulo(Base):
         Integer,
         ForeignKey('cursos.id'),
         nullable=False,
+        index=True,
     )
 
     # CONTROLE DE DATA/HISTÓRICO
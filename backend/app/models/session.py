@@ -0,0 +1,61 @@
+from uuid import uuid4
+from sqlalchemy import (
+    Column, Integer, String, DateTime, ForeignKey, Index
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+class SessaoUsuario(Base):
+    """
+    Modelo SessaoUsuario
+    --------------------
+    Representa a tabela 'sessoes_usuarios' no banco de dados.
+    Cada login cria uma sessão com um refresh token (guardado só como hash SHA-256).
+    Os access tokens da sessão carregam o id dela na claim `sid`; revogar a sessão
+    (logout) invalida o refresh token e, via denylist em memória, os access tokens já emitidos.
+    """
+
+    # NOME DA TABELA
+    __tablename__ = "sessoes_usuarios"
+
+    __table_args__ = (
+        # Sincronização incremental da denylist (sessões revogadas depois da última leitura)
+        Index("ix_sessoes_usuarios_revogada_em", "revogada_em"),
+    )
+
+    # COLUNAS
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid4,
+    )
+
+    # CHAVE ESTRANGEIRA
+    usuario_id = Column(
+        Integer,
+        ForeignKey("usuarios.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Hash SHA-256 (hex) do segredo do refresh token atual; muda a cada renovação
+    refresh_hash = Column(String(64), nullable=False)
+
+    # CONTROLE DE DATA/HISTÓRICO
+    criado_em = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    # Expiração do refresh token atual
+    expira_em = Column(DateTime(timezone=True), nullable=False)
+
+    # Preenchida no logout (ou ao detectar reuso de refresh token); nula = sessão ativa
+    revogada_em = Column(DateTime(timezone=True), nullable=True)
+
+    # RELACIONAMENTOS
+    usuario = relationship("Usuario")
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+class VersaoTabela(Base):
+    """
+    Modelo VersaoTabela
+    -------------------
+    Representa a tabela 'versoes_tabelas' no banco de dados.
+    Guarda um contador de versão por tabela, incrementado na mesma transação de cada escrita.
+    É usado para gerar ETag/Last-Modified das rotas públicas sem consultar as linhas em si.
+    """
+
+    # NOME DA TABELA
+    __tablename__ = "versoes_tabelas"
+
+    # COLUNAS
+    # Nome da tabela versionada (ex.: "cursos", "categorias", "niveis")
+    tabela = Column(String(50), primary_key=True)
+
+    # Versão atual, incrementada a cada escrita
+    versao = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+    # CONTROLE DE DATA/HISTÓRICO
+    atualizado_em = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends, status, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.auth_service import create_salt, verify_password, get_password_hash
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
+from app.services.auth_service import create_salt, verify_and_update_password, get_password_hash
 from app.core.security import allowed_roles
 
 from app.models.user import Usuario
-from app.schemas.user import UsuarioCriar, UsuarioResponse, TokenResponse, UsuarioLogin
+from app.schemas.user import UsuarioCriar, UsuarioResponse, TokenResponse, UsuarioLogin, RefreshTokenRequest
+from app.schemas.mapping import de_linhas
 from app.schemas.user import UsuarioLogin
 from typing import List
-from app.core.security import create_access_token
+from app.services.session_service import criar_sessao, renovar_sessao, revogar_sessao
+from app.services.profile_service import buscar_perfil
+from app.core.rate_limit import limitar_login
 from app.core.response import success_response
 
 router = APIRouter(
@@ -16,16 +20,21 @@ router = APIRouter(
 	tags=["Auth"]
 )
 
+def _buscar_por_email(db: Session, email: str) -> Usuario | None:
+	"""Usuário pelo e-mail (corpo síncrono, executado via AsyncSession.run_sync)"""
+	return db.query(Usuario).filter(Usuario.email == email).first()
+
 @router.post("/register", response_model=UsuarioResponse, status_code=status.HTTP_201_CREATED)
-def registra_usuario(
-	usuario: UsuarioCriar, db: Session = Depends(get_db)
+async def registra_usuario(
+	usuario: UsuarioCriar, db: AsyncSession = Depends(get_async_db)
 ):
 
-	"""Função que registra o usuario no banco"""
+	"""
+	Função que registra o usuario no banco.
+	`async def`: o hash da senha roda no pool dedicado sem prender thread do threadpool.
+	"""
 
-	ja_existe = db.query(Usuario).filter(
-		Usuario.email == usuario.email
-	).first()
+	ja_existe = await db.run_sync(_buscar_por_email, usuario.email)
 
 	if ja_existe:
 		raise HTTPException(
@@ -36,14 +45,14 @@ def registra_usuario(
 		nome = usuario.nome,
 		sobrenome = usuario.sobrenome,
 		email = usuario.email,
-		senha_hash = get_password_hash(create_salt(usuario.senha_hash, usuario.email)),
+		senha_hash = await get_password_hash(create_salt(usuario.senha_hash, usuario.email)),
 		tipo_usuario = usuario.tipo_usuario,
 		data_nascimento = usuario.data_nascimento
 	)
 
 	db.add(db_usuario)
-	db.commit()
-	db.refresh(db_usuario)
+	await db.commit()
+	await db.refresh(db_usuario)
 
 	return success_response(
 		data=UsuarioResponse.model_validate(db_usuario),
@@ -58,18 +67,20 @@ def listar_usuarios(db: Session = Depends(get_db) , require = Depends(allowed_ro
 	print(query)
 
 	return success_response(
-		data=[UsuarioResponse.model_validate(u) for u in query],
+		data=de_linhas(UsuarioResponse, query),
 		message="Usuários listados com sucesso."
 	)
 
 # Rota de login
 
-@router.post("/login", response_model=TokenResponse)
-def login(data: UsuarioLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limitar_login)])
+async def login(data: UsuarioLogin, db: AsyncSession = Depends(get_async_db)):
 	"""
 	Login do usuario, recebe email e senha adiciona o salt e verifica se existe e é real.
+	Tentativas acima do limite por IP/e-mail recebem 429 antes de consultar o banco (ver app.core.rate_limit).
+	`async def`: a verificação da senha roda no pool dedicado sem prender thread do threadpool.
 	"""
-	user = db.query(Usuario).filter(Usuario.email == data.email).first()
+	user = await db.run_sync(_buscar_por_email, data.email)
 	if not user:
 		raise HTTPException(
 			status_code=status.HTTP_401_UNAUTHORIZED,
@@ -77,26 +88,79 @@ def login(data: UsuarioLogin, db: Session = Depends(get_db)):
 			)
 
 	senha_com_salt = create_salt(data.senha, user.email)
-	if not verify_password(senha_com_salt, user.senha_hash):
+	valido, novo_hash = await verify_and_update_password(senha_com_salt, user.senha_hash)
+	if not valido:
 		raise HTTPException(
 			status_code=status.HTTP_401_UNAUTHORIZED,
 			detail="Credenciais inválidas"
 			)
 
-	token = create_access_token(user_id=user.id, email=user.email, role=user.tipo_usuario)
+	# Hash com esquema/custo antigos: grava o novo (migração sem reset de senha)
+	if novo_hash:
+		user.senha_hash = novo_hash
+
+	# Access token curto + refresh token da nova sessão
+	tokens = await db.run_sync(criar_sessao, user)
+	await db.commit()
+
 	return success_response(
-		data={"access_token": token},
+		data=tokens,
 		message="Login realizado com sucesso",
 		status_code=status.HTTP_200_OK
 	)
 
+# Rota para renovar o access token
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(data: RefreshTokenRequest, db: Session = Depends(get_db)):
+	"""
+	Troca o refresh token por um novo par access/refresh (o refresh antigo deixa de valer).
+	Reusar um refresh token já trocado revoga a sessão inteira.
+	"""
+	tokens = renovar_sessao(db, data.refresh_token)
+	# Commita também a revogação feita quando o token foi reusado
+	db.commit()
+	if tokens is None:
+		raise HTTPException(
+			status_code=status.HTTP_401_UNAUTHORIZED,
+			detail="Refresh token inválido ou expirado"
+			)
+
+	return success_response(
+		data=tokens,
+		message="Token renovado com sucesso",
+		status_code=status.HTTP_200_OK
+	)
+
+# Rota de logout: revoga a sessão do token atual (access e refresh)
+@router.post("/logout")
+def logout(db: Session = Depends(get_db), usuario = Depends(allowed_roles())):
+	if usuario.get("sid"):
+		revogar_sessao(db, usuario["sid"])
+		db.commit()
+
+	return success_response(
+		data=None,
+		message="Logout realizado com sucesso",
+		status_code=status.HTTP_200_OK
+	)
+
 # Rota para obter informações do usuário autenticado
 @router.get("/me", response_model=UsuarioResponse)
 def get_me(db:Session = Depends(get_db), usuario = Depends(allowed_roles())):
-	"""Rota para obter informações do usuário autenticado"""
-	user = db.query(Usuario).filter(Usuario.id == usuario["id"]).first()
+	"""
+	Rota para obter informações do usuário autenticado.
+	O id vem das claims do token; o perfil vem do cache (ver app.services.profile_service),
+	revalidado pelo `ultima_atualizacao` depois de PROFILE_CACHE_REVALIDATE_SECONDS.
+	"""
+	perfil = buscar_perfil(db, usuario["id"], usuario.get("role"))
+	if perfil is None:
+		raise HTTPException(
+			status_code=status.HTTP_404_NOT_FOUND,
+			detail="Usuário não encontrado"
+			)
+
 	return success_response(
-		data=UsuarioResponse.model_validate(user),
+		data=perfil,
 		message="Dados do usuário retornados com sucesso.",
 		status_code=status.HTTP_200_OK
 	)
@@ -1,11 +1,16 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.core.replicas import get_read_db
 from app.core.security import allowed_roles
 from app.models.category import Categoria
 from app.schemas.category import CategoriaCreate, CategoriaResponse, CategoriaUpdate
+from app.schemas.mapping import de_linhas
 from typing import List
 from app.core.response import success_response
+from app.core.cache import cached_response, response_cache
+from app.core.http_cache import conditional_get
+from app.services.table_version_service import incrementar_versao, CATEGORIAS, CURSOS
 
 
 router = APIRouter(
@@ -35,8 +40,10 @@ def cria_categoria(
 	)
 
 	db.add(categoria_add)
+	incrementar_versao(db, CATEGORIAS)
 	db.commit()
 	db.refresh(categoria_add)
+	response_cache.invalidate("categories")
 
 	return success_response(
 		data=CategoriaResponse.model_validate(categoria_add),
@@ -46,13 +53,15 @@ def cria_categoria(
 
 
 @router.get("/", response_model=List[CategoriaResponse])
+@conditional_get("categories", tabelas=[CATEGORIAS])
+@cached_response("categories")
 def listar_categoria(
-	db: Session = Depends(get_db)
+	db: Session = Depends(get_read_db)
 ):
 	categorias = db.query(Categoria)
 
 	return success_response(
-		data=[CategoriaResponse.model_validate(c) for c in categorias],
+		data=de_linhas(CategoriaResponse, categorias),
 		message="Categorias listadas com sucesso."
 	)
 
@@ -77,8 +86,10 @@ def atualiza_categoria(
 		print(campo, valor)
 		setattr(categoria_db, campo, valor)
 
+	incrementar_versao(db, CATEGORIAS)
 	db.commit()
 	db.refresh(categoria_db)
+	response_cache.invalidate("categories")
 
 	return success_response(
 		data=CategoriaResponse.model_validate(categoria_db),
@@ -100,7 +111,10 @@ def deleta_categoria(
 		)
 
 	db.delete(categoria_db)
+	incrementar_versao(db, CATEGORIAS, CURSOS)
 	db.commit()
+	# A remoção apaga os cursos da categoria em cascata
+	response_cache.invalidate("categories", "courses", "course", "reviews")
 
 	return success_response(
 		data=None,
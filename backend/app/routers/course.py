@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, status, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from sqlalchemy import func
+from sqlalchemy import tuple_
 
 from app.database import get_db
+from app.core.replicas import get_async_read_db
 from app.models.course import Curso
 from app.models.level import Nivel
 from app.models.instructor import Instrutor
-from app.models.evaluation import AvaliacaoCurso
 
 from app.schemas.course import (
     CursoResponse,
@@ -19,6 +20,14 @@ from app.schemas.course import (
 )
 from typing import Literal
 from app.core.response import success_response
+from app.core.cache import cached_response, response_cache
+from app.core.http_cache import conditional_get
+from app.core.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from app.schemas.mapping import de_linha
+from app.services.rating_service import distribuicao_notas
+from app.services.loading_profiles import PERFIL_CATALOGO, PERFIL_DETALHE
+from app.services.statistics_service import estatisticas_cursos
+from app.services.table_version_service import incrementar_versao, CURSOS, NIVEIS, INSTRUTORES
 
 from app.core.security import allowed_roles  # ⬅️ vem do security.py
 
@@ -29,80 +38,149 @@ router = APIRouter(
 )
 
 precoList = Literal["pago", "gratuito"]
+ordenacaoList = Literal["id", "preco_asc", "preco_desc", "avaliacao"]
 
 @router.get("/",response_model=List[CursoResponse])
-def listar_cursos(
+# Tabelas de tudo o que a resposta mostra: curso, nível e instrutor (nome/especialidade)
+@conditional_get("courses", tabelas=[CURSOS, NIVEIS, INSTRUTORES])
+@cached_response("courses")
+async def listar_cursos(
 	id_categoria: int = 0,
 	id_nivel: int = 0,
 	preco: precoList | None = None,
-	db: Session = Depends(get_db)
+	ordenar: ordenacaoList = "id",
+	limite: int = Query(20, ge=1, le=100),
+	cursor: str | None = None,
+	db: AsyncSession = Depends(get_async_read_db)
 ):
-	"""Retorna as informações do curso"""
-
-	resultados = (
-		db.query(
-			Curso,
-			func.coalesce(func.avg(AvaliacaoCurso.nota), 0).label("avaliacao_media"),
-			func.count(AvaliacaoCurso.id).label("quantidade_avaliacoes"),
-		)
-		.outerjoin(AvaliacaoCurso, AvaliacaoCurso.curso_id == Curso.id)  # LEFT JOIN, pra trazer curso sem avaliação também
-		.group_by(Curso.id)
-		.all()
-	)
+	"""
+	Retorna as informações do curso.
+
+	Filtros, ordenação e paginação são aplicados direto no SQL:
+	- id_categoria / id_nivel: 0 significa "sem filtro"
+	- preco: "pago" (preco > 0) ou "gratuito" (preco = 0)
+	- ordenar: id, preco_asc, preco_desc ou avaliacao (maior média primeiro)
+	- paginação keyset: o cursor da próxima página volta no header X-Next-Cursor
+	  (ausente na última página) e deve ser repassado em `cursor`
+	"""
+	# Rota assíncrona: a consulta roda no asyncpg sem ocupar uma thread do threadpool
+	return await db.run_sync(_listar_cursos, id_categoria, id_nivel, preco, ordenar, limite, cursor)
+
+
+def _listar_cursos(
+	db: Session,
+	id_categoria: int,
+	id_nivel: int,
+	preco: precoList | None,
+	ordenar: ordenacaoList,
+	limite: int,
+	cursor: str | None,
+):
+	"""Corpo síncrono do catálogo, executado via AsyncSession.run_sync"""
+	# A média e a quantidade de avaliações já ficam gravadas no próprio curso
+	# (ver app.services.rating_service), então não há agregação aqui.
+	query = db.query(Curso).options(*PERFIL_CATALOGO)
+
+	if id_categoria:
+		query = query.filter(Curso.categoria_id == id_categoria)
+	if id_nivel:
+		query = query.filter(Curso.nivel_id == id_nivel)
+	if preco == "pago":
+		query = query.filter(Curso.preco > 0)
+	elif preco == "gratuito":
+		query = query.filter(Curso.preco == 0)
+
+	# Chave de ordenação (sempre desempatada pelo id, que é único)
+	chave = {
+		"id": None,
+		"preco_asc": Curso.preco,
+		"preco_desc": Curso.preco,
+		"avaliacao": Curso.media_avaliacoes,
+	}[ordenar]
+	decrescente = ordenar in ("preco_desc", "avaliacao")
+	colunas = (Curso.id,) if chave is None else (chave, Curso.id)
+	# preco e media_avaliacoes são Float; o id desempata
+	tipos = (int,) if chave is None else (float, int)
+
+	if cursor:
+		ultimo = tuple_(*colunas)
+		valores = tuple_(*decode_cursor(cursor, len(colunas), tipos))
+		query = query.filter(ultimo < valores if decrescente else ultimo > valores)
+
+	query = query.order_by(*(c.desc() if decrescente else c.asc() for c in colunas))
+
+	# Busca um item a mais só para saber se existe próxima página
+	resultados = query.limit(limite + 1).all()
+	tem_proxima = len(resultados) > limite
+	resultados = resultados[:limite]
+
+	# Linhas do próprio banco: monta o schema sem revalidar (ver app.schemas.mapping)
 	resposta = []
-	for curso, avaliacao_media, qtd_avaliacoes in resultados:
+	for curso in resultados:
 		resposta.append(
-			CursoResponse(
-				id=curso.id,
-				url_image=getattr(curso, "url_image", None),
-				titulo=curso.titulo,
+			de_linha(
+				CursoResponse,
+				curso,
 				id_instrutor=curso.instrutor_id,
 				instrutor=curso.instrutor.usuario.nome,
 				id_nivel=curso.nivel_id,
 				nivel=curso.nivel.descricao,
-				avaliacao=float(avaliacao_media or 0.0),
-				quantidade_avaliacoes=int(qtd_avaliacoes or 0),
+				avaliacao=curso.media_avaliacoes or 0.0,
+				quantidade_avaliacoes=curso.quantidade_avaliacoes or 0,
 				preco=curso.preco or 0.0,
 			)
 		)
 
+	headers = None
+	if tem_proxima:
+		curso = resultados[-1]
+		ultima_chave = {
+			"id": (),
+			"preco_asc": (curso.preco,),
+			"preco_desc": (curso.preco,),
+			"avaliacao": (curso.media_avaliacoes,),
+		}[ordenar]
+		headers = {NEXT_CURSOR_HEADER: encode_cursor(*ultima_chave, curso.id)}
+
 	return success_response(
 		data=resposta,
 		message="Cursos listados com sucesso.",
-		status_code=status.HTTP_200_OK
+		status_code=status.HTTP_200_OK,
+		headers=headers,
 	)
 
 
 @router.get("/{id_curso}", response_model=CursoEspecificoResponse)
-def pegar_curso(
+@conditional_get("course", tabelas=[CURSOS, NIVEIS, INSTRUTORES])
+@cached_response("course", tags=lambda p: [f"course:{p['id_curso']}"])
+async def pegar_curso(
 	id_curso: int,
-	db: Session = Depends(get_db)
+	db: AsyncSession = Depends(get_async_read_db)
 ):
 	"""Pega curso especifico"""
-	resultado = (
-		db.query(
-			Curso,
-			func.coalesce(func.avg(AvaliacaoCurso.nota), 0).label("avaliacao_media"),
-			func.count(AvaliacaoCurso.id).label("quantidade_avaliacoes"),
-		)
-		.outerjoin(AvaliacaoCurso, AvaliacaoCurso.curso_id == Curso.id)  # LEFT JOIN pra funcionar mesmo sem avaliações
+	return await db.run_sync(_pegar_curso, id_curso)
+
+
+def _pegar_curso(db: Session, id_curso: int):
+	"""Corpo síncrono do detalhe do curso, executado via AsyncSession.run_sync"""
+	curso = (
+		db.query(Curso)
+		.options(*PERFIL_DETALHE)
 		.filter(Curso.id == id_curso)
-		.group_by(Curso.id)
 		.first()
 	)
-	if not resultado:
+	if not curso:
 		raise HTTPException(
 			status_code=status.HTTP_404_NOT_FOUND,
 			detail=f"Curso com id {id_curso}, não encontado"
 		)
-	curso, avaliacao_media, qtd_avaliacoes = resultado
 	return success_response(
-		data=CursoEspecificoResponse(
-			id=curso.id,
-			titulo=curso.titulo,
-			descricao=curso.descricao,
-			avaliacao=float(avaliacao_media or 0.0),
-			quantidade_avaliacoes=int(qtd_avaliacoes or 0),
+		data=de_linha(
+			CursoEspecificoResponse,
+			curso,
+			avaliacao=curso.media_avaliacoes or 0.0,
+			quantidade_avaliacoes=curso.quantidade_avaliacoes or 0,
+			distribuicao_notas=distribuicao_notas(curso),
 			quantidade_horas=curso.carga_horaria,
 			id_nivel=curso.nivel_id,
 			nivel=curso.nivel.descricao,
@@ -162,8 +240,10 @@ def criar_curso(
     )
 
     db.add(novo_curso)
+    incrementar_versao(db, CURSOS)
     db.commit()
     db.refresh(novo_curso)
+    response_cache.invalidate("courses")
 
     return CursoControleResponse(
         id=novo_curso.id,
@@ -239,8 +319,10 @@ def atualizar_curso(
         # instrutor sempre continua sendo ele próprio
         curso_db.instrutor_id = user_id
 
+    incrementar_versao(db, CURSOS)
     db.commit()
     db.refresh(curso_db)
+    response_cache.invalidate("courses", f"course:{curso_id}")
 
     return CursoControleResponse(
         id=curso_db.id,
@@ -250,7 +332,7 @@ def atualizar_curso(
         id_nivel=curso_db.nivel_id,
         id_instrutor=curso_db.instrutor_id,
         preco=curso_db.preco,
-        sobre=0.0,  # TODO: recalcular média
+        sobre=curso_db.media_avaliacoes or 0.0,
     )
 
 @router.delete(
@@ -296,7 +378,9 @@ def deletar_curso(
         )
 
     db.delete(curso_db)
+    incrementar_versao(db, CURSOS)
     db.commit()
+    response_cache.invalidate("courses", f"course:{curso_id}", f"reviews:{curso_id}")
     return
 
 @router.get(
@@ -319,69 +403,10 @@ def estatisticas_curso(
     - datas de criação / publicação (publicação ainda não existe → retorna None)
     """
 
-    # Buscar o curso
-    curso = db.query(Curso).filter(Curso.id == curso_id).first()
-    if not curso:
+    # Tudo é agregado no banco (GROUP BY / COUNT FILTER); só os números finais voltam
+    itens = estatisticas_cursos(db, curso_id=curso_id)
+    if not itens:
         raise HTTPException(status_code=404, detail="Curso não encontrado.")
 
-    # Categoria, nível, instrutor
-    categoria = curso.categoria.descricao if curso.categoria else ""
-    nivel = curso.nivel.descricao if curso.nivel else ""
-    instrutor = curso.instrutor.usuario.nome if curso.instrutor else ""
-
-    # Média das avaliações (AvaliacaoCurso)
-    media_notas = (
-        db.query(func.avg(AvaliacaoCurso.nota))
-        .filter(AvaliacaoCurso.curso_id == curso_id)
-        .scalar()
-    )
-    media_notas = float(media_notas) if media_notas else 0.0
-
-    # Quantidade de alunos (usando relacionamento curso.matriculas)
-    matriculas = curso.matriculas or []
-    quantidade_alunos = len(matriculas)
-
-    # Total de aulas do curso (modulos → aulas, via relacionamento)
-    total_aulas = 0
-    for modulo in curso.modulos or []:
-        # cada módulo deve ter relationship "aulas"
-        total_aulas += len(modulo.aulas or [])
-
-    # Percentual médio de conclusão REAL
-    percentual_medio = 0.0
-
-    if quantidade_alunos > 0 and total_aulas > 0:
-        percentuais = []
-
-        for matricula in matriculas:
-            progresso = matricula.progresso_aulas or []
-
-            if not progresso:
-                percentuais.append(0.0)
-                continue
-
-            aulas_concluidas = sum(1 for p in progresso if p.concluido)
-            percentual = (aulas_concluidas / total_aulas) * 100
-            percentuais.append(percentual)
-
-        if percentuais:
-            percentual_medio = sum(percentuais) / len(percentuais)
-
-    # Montar resposta (ARRAY, conforme contrato do front)
-    return [
-        CursoEstatisticaItem(
-            id=curso.id,
-            titulo=curso.titulo,
-            id_categoria=curso.categoria_id,
-            categoria=categoria,
-            id_nivel=curso.nivel_id,
-            nivel=nivel,
-            id_instrutor=curso.instrutor_id,
-            instrutor=instrutor,
-            percentual_conclusao=percentual_medio,
-            media_notas=media_notas,
-            quantidade_alunos=quantidade_alunos,
-            data_criacao=curso.data_criacao,
-            data_publicacao=None,  # ainda não existe no model
-        )
-    ]
+    # Resposta em ARRAY, conforme contrato do front
+    return itens
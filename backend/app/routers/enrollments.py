@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, true, false
+from pydantic import BaseModel
+from app.database import get_db, get_async_db
+from app.core.replicas import get_read_db, get_async_read_db
 from app.core.security import allowed_roles
 from app.models.enrollment import Matricula
 from app.models.progress import ProgressoAulas
@@ -9,10 +12,11 @@ from app.models.course import Curso
 from app.models.user import Usuario
 from app.models.lesson import Aula
 from app.models.module import Modulo
-from app.models.instructor import Instrutor
 from typing import List, Optional
-from datetime import datetime
+from types import SimpleNamespace
 from app.core.response import success_response
+from app.core.pagination import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from app.services.progress_service import salvar_conclusao, percentual_conclusao
 
 router = APIRouter(
     prefix="/enrollments",
@@ -21,15 +25,22 @@ router = APIRouter(
 
 
 # Função auxiliar para checar autorização de acesso à matrícula
-def check_enrollment_access(matricula: Matricula, usuario: dict, db: Session, resource: str = "enrollment") -> bool:
+def check_enrollment_access(
+    matricula: Matricula,
+    usuario: dict,
+    db: Session,
+    resource: str = "enrollment",
+    instrutor_id: Optional[int] = None,
+) -> bool:
     """
     Verifica se o usuário tem permissão para acessar a matrícula.
 
     Args:
-        matricula: Objeto da matrícula
+        matricula: Objeto da matrícula (ou linha de `enrollment_query`)
         usuario: Dict com dados do usuário autenticado (id, role)
         db: Sessão do banco
         resource: Tipo de recurso para mensagem de erro
+        instrutor_id: Instrutor do curso, se já foi carregado (evita a consulta ao Curso)
 
     Returns:
         True se tem acesso, lança HTTPException caso contrário
@@ -50,8 +61,10 @@ def check_enrollment_access(matricula: Matricula, usuario: dict, db: Session, re
 
     # instrutor
     if role == "instrutor":
-        curso = db.query(Curso).filter(Curso.id == matricula.curso_id).first()
-        if not curso or curso.instrutor_id != user_id:
+        if instrutor_id is None:
+            curso = db.query(Curso).filter(Curso.id == matricula.curso_id).first()
+            instrutor_id = curso.instrutor_id if curso else None
+        if instrutor_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Acesso negado a este {resource}"
@@ -64,24 +77,52 @@ def check_enrollment_access(matricula: Matricula, usuario: dict, db: Session, re
     )
 
 
-# Função auxiliar para serializar matricula com dados do aluno, curso e instrutor
-def serialize_enrollment(matricula: Matricula, db: Session) -> dict:
-    """Serializa uma matrícula em um dicionário com dados completos"""
-    aluno = db.query(Usuario).filter(Usuario.id == matricula.aluno_id).first()
-    curso = db.query(Curso).filter(Curso.id == matricula.curso_id).first()
-    instrutor = db.query(Instrutor).filter(Instrutor.id == curso.instrutor_id).first()
-    usuario_instrutor = db.query(Usuario).filter(Usuario.id == instrutor.id).first() if instrutor else None
+# Projeção única com os dados da matrícula, do aluno, do curso e do instrutor
+def enrollment_query(db: Session):
+    """
+    Monta a consulta que traz, em um único SELECT com JOINs, tudo o que
+    `serialize_enrollment` precisa (nome do aluno, título do curso e nome do instrutor).
+    """
+    Aluno = aliased(Usuario)
+    UsuarioInstrutor = aliased(Usuario)
+
+    return (
+        db.query(
+            Matricula.id,
+            Matricula.aluno_id,
+            Aluno.nome.label("aluno_nome"),
+            Aluno.sobrenome.label("aluno_sobrenome"),
+            Matricula.curso_id,
+            Curso.titulo.label("curso_titulo"),
+            Curso.instrutor_id,
+            UsuarioInstrutor.nome.label("instrutor_nome"),
+            UsuarioInstrutor.sobrenome.label("instrutor_sobrenome"),
+            Matricula.status_matricula,
+            Matricula.data_conclusao,
+            Matricula.aulas_concluidas,
+            Matricula.total_aulas,
+        )
+        .outerjoin(Aluno, Aluno.id == Matricula.aluno_id)
+        .outerjoin(Curso, Curso.id == Matricula.curso_id)
+        # Instrutor.id é o próprio id do usuário (1:1), então dá pra ir direto em usuarios
+        .outerjoin(UsuarioInstrutor, UsuarioInstrutor.id == Curso.instrutor_id)
+    )
+
 
+# Função auxiliar para serializar matricula com dados do aluno, curso e instrutor
+def serialize_enrollment(row) -> dict:
+    """Serializa uma linha de `enrollment_query` em um dicionário com dados completos"""
     return {
-        "id": matricula.id,
-        "id_aluno": matricula.aluno_id,
-        "aluno": f"{aluno.nome} {aluno.sobrenome}" if aluno else "",
-        "id_curso": matricula.curso_id,
-        "curso": curso.titulo if curso else "",
-        "id_instrutor": curso.instrutor_id if curso else None,
-        "instrutor": f"{usuario_instrutor.nome} {usuario_instrutor.sobrenome}" if usuario_instrutor else "",
-        "status_matricula": matricula.status_matricula,
-        "data_conclusao": matricula.data_conclusao
+        "id": row.id,
+        "id_aluno": row.aluno_id,
+        "aluno": f"{row.aluno_nome} {row.aluno_sobrenome}" if row.aluno_nome else "",
+        "id_curso": row.curso_id,
+        "curso": row.curso_titulo or "",
+        "id_instrutor": row.instrutor_id,
+        "instrutor": f"{row.instrutor_nome} {row.instrutor_sobrenome}" if row.instrutor_nome else "",
+        "status_matricula": row.status_matricula,
+        "data_conclusao": row.data_conclusao,
+        "progresso_curso": percentual_conclusao(row.aulas_concluidas, row.total_aulas)
     }
 
 
@@ -90,7 +131,9 @@ def list_enrollments(
     id_curso: Optional[int] = None,
     id_aluno: Optional[int] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
     usuario=Depends(allowed_roles("aluno", "instrutor", "admin"))
 ):
     """
@@ -99,168 +142,144 @@ def list_enrollments(
     - Aluno: vê apenas suas próprias matrículas
     - Instrutor: vê matrículas dos alunos em seus cursos
     - Admin: vê todas as matrículas
+
+    Paginação keyset por id: o cursor da próxima página volta no header X-Next-Cursor
+    (ausente na última página) e deve ser repassado em `cursor`.
     """
     role = usuario.get("role")
     user_id = usuario.get("id")
 
-    query = db.query(Matricula)
+    query = enrollment_query(db)
 
     # Filtros por role
     if role == "aluno":
         query = query.filter(Matricula.aluno_id == user_id)
 
     elif role == "instrutor":
-        curso_ids = [
-            c.id for c in db.query(Curso)
-            .filter(Curso.instrutor_id == user_id)
-            .all()
-        ]
-
-        if not curso_ids:
-            return success_response(
-                data=[],
-                message="Nenhuma matrícula encontrada para este instrutor",
-                status_code=200
-            )
-
-        query = query.filter(Matricula.curso_id.in_(curso_ids))
+        # Curso já está no JOIN, não precisa buscar os ids dos cursos antes
+        query = query.filter(Curso.instrutor_id == user_id)
 
     # Filtros opcionais
     if id_curso is not None:
         query = query.filter(Matricula.curso_id == id_curso)
 
-    if id_aluno is not None:
-        if role == "instrutor":
-            curso_ids = [
-                c.id for c in db.query(Curso)
-                .filter(Curso.instrutor_id == user_id)
-                .all()
-            ]
-            query = query.filter(
-                and_(
-                    Matricula.aluno_id == id_aluno,
-                    Matricula.curso_id.in_(curso_ids)
-                )
-            )
-        elif role == "aluno":
-            query = query.filter(Matricula.aluno_id == user_id)
-        else:
-            query = query.filter(Matricula.aluno_id == id_aluno)
+    # Aluno continua restrito às próprias matrículas pelo filtro de role
+    if id_aluno is not None and role != "aluno":
+        query = query.filter(Matricula.aluno_id == id_aluno)
 
     if status is not None:
         query = query.filter(Matricula.status_matricula == status)
 
-    matriculas = query.all()
+    if cursor:
+        (ultimo_id,) = decode_cursor(cursor, 1, (int,))
+        query = query.filter(Matricula.id > ultimo_id)
+
+    # Busca um item a mais só para saber se existe próxima página
+    linhas = query.order_by(Matricula.id).limit(limite + 1).all()
+    tem_proxima = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    data = [serialize_enrollment(linha) for linha in linhas]
 
-    data = [serialize_enrollment(m, db) for m in matriculas]
+    headers = None
+    if tem_proxima:
+        headers = {NEXT_CURSOR_HEADER: encode_cursor(linhas[-1].id)}
 
     return success_response(
         data=data,
         message="Matrículas listadas com sucesso",
-        status_code=200
+        status_code=200,
+        headers=headers,
     )
 
 
 
 @router.get("/{enrollment_id}/progress")
-def get_enrollment_progress(
+async def get_enrollment_progress(
     enrollment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     usuario=Depends(allowed_roles("aluno", "instrutor", "admin"))
 ):
     """
-    Retorna o progresso completo de uma matrícula
+    Retorna o progresso completo de uma matrícula.
+
+    São só duas consultas, independente do tamanho do curso:
+    1. matrícula + aluno + curso + instrutor (`enrollment_query`)
+    2. árvore módulo → aula → progresso em um único LEFT JOIN, já ordenada
     """
-    matricula = db.query(Matricula).filter(Matricula.id == enrollment_id).first()
+    data = await db.run_sync(_progresso_matricula, enrollment_id, usuario)
+
+    return success_response(
+        data=data,
+        message="Progresso da matrícula retornado com sucesso",
+        status_code=200
+    )
+
+
+def _progresso_matricula(db: Session, enrollment_id: int, usuario: dict) -> dict:
+    """Consultas síncronas do progresso, executadas via AsyncSession.run_sync"""
+    matricula = enrollment_query(db).filter(Matricula.id == enrollment_id).first()
     if not matricula:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Matrícula não encontrada"
         )
 
-    # Autorização
-    check_enrollment_access(matricula, usuario, db, "matrícula")
-
-    aluno = db.query(Usuario).filter(Usuario.id == matricula.aluno_id).first()
-    curso = db.query(Curso).filter(Curso.id == matricula.curso_id).first()
-    instrutor = db.query(Instrutor).filter(Instrutor.id == curso.instrutor_id).first()
-    usuario_instrutor = (
-        db.query(Usuario).filter(Usuario.id == instrutor.id).first()
-        if instrutor else None
-    )
-
-    modulos = (
-        db.query(Modulo)
+    # Autorização (o instrutor do curso já veio na projeção)
+    check_enrollment_access(matricula, usuario, db, "matrícula", instrutor_id=matricula.instrutor_id)
+
+    linhas = (
+        db.query(
+            Modulo.id.label("id_modulo"),
+            Modulo.titulo.label("titulo_modulo"),
+            Modulo.ordem.label("ordem_modulo"),
+            Aula.id.label("id_aula"),
+            Aula.titulo.label("titulo_aula"),
+            Aula.ordem_aula,
+            ProgressoAulas.progresso_percentual,
+            ProgressoAulas.concluido,
+            ProgressoAulas.data_conclusao,
+        )
+        .join(Aula, Aula.modulo_id == Modulo.id)
+        .outerjoin(
+            ProgressoAulas,
+            and_(
+                ProgressoAulas.aula_id == Aula.id,
+                ProgressoAulas.matricula_id == enrollment_id
+            )
+        )
         .filter(Modulo.curso_id == matricula.curso_id)
-        .order_by(Modulo.ordem)
+        .order_by(Modulo.ordem, Aula.ordem_aula)
         .all()
     )
 
     aulas_list = []
-    total_aulas = 0
     aulas_concluidas = 0
 
-    for modulo in modulos:
-        aulas = (
-            db.query(Aula)
-            .filter(Aula.modulo_id == modulo.id)
-            .order_by(Aula.ordem_aula)
-            .all()
-        )
-
-        for aula in aulas:
-            total_aulas += 1
-
-            progresso = (
-                db.query(ProgressoAulas)
-                .filter(
-                    and_(
-                        ProgressoAulas.matricula_id == enrollment_id,
-                        ProgressoAulas.aula_id == aula.id
-                    )
-                )
-                .first()
-            )
-
-            if progresso and progresso.concluido:
-                aulas_concluidas += 1
-
-            aulas_list.append({
-                "id_aula": aula.id,
-                "titulo_aula": aula.titulo,
-                "ordem_aula": aula.ordem_aula,
-                "id_modulo": modulo.id,
-                "titulo_modulo": modulo.titulo,
-                "ordem_modulo": modulo.ordem,
-                "progresso_aula": progresso.progresso_percentual if progresso else 0,
-                "concluido": progresso.concluido if progresso else False,
-                "data_conclusao": progresso.data_conclusao if progresso else None
-            })
-
+    for linha in linhas:
+        if linha.concluido:
+            aulas_concluidas += 1
+
+        aulas_list.append({
+            "id_aula": linha.id_aula,
+            "titulo_aula": linha.titulo_aula,
+            "ordem_aula": linha.ordem_aula,
+            "id_modulo": linha.id_modulo,
+            "titulo_modulo": linha.titulo_modulo,
+            "ordem_modulo": linha.ordem_modulo,
+            "progresso_aula": linha.progresso_percentual or 0,
+            "concluido": bool(linha.concluido),
+            "data_conclusao": linha.data_conclusao
+        })
+
+    total_aulas = len(aulas_list)
     progresso_curso = (aulas_concluidas / total_aulas * 100) if total_aulas > 0 else 0
 
-    data = {
-        "id": matricula.id,
-        "id_aluno": matricula.aluno_id,
-        "aluno": f"{aluno.nome} {aluno.sobrenome}" if aluno else "",
-        "id_curso": matricula.curso_id,
-        "curso": curso.titulo if curso else "",
-        "id_instrutor": curso.instrutor_id if curso else None,
-        "instrutor": (
-            f"{usuario_instrutor.nome} {usuario_instrutor.sobrenome}"
-            if usuario_instrutor else ""
-        ),
-        "status_matricula": matricula.status_matricula,
-        "data_conclusao": matricula.data_conclusao,
-        "progresso_curso": round(progresso_curso, 2),
-        "aulas": aulas_list
-    }
-
-    return success_response(
-        data=data,
-        message="Progresso da matrícula retornado com sucesso",
-        status_code=200
-    )
+    # Percentual calculado a partir da própria árvore (fonte da verdade para esta tela)
+    data = serialize_enrollment(matricula)
+    data["progresso_curso"] = round(progresso_curso, 2)
+    data["aulas"] = aulas_list
+    return data
 
 
 
@@ -322,10 +341,19 @@ def create_enrollment(
             detail="Aluno já possui matrícula ativa neste curso"
         )
 
+    total_aulas = (
+        db.query(func.count(Aula.id))
+        .join(Modulo, Modulo.id == Aula.modulo_id)
+        .filter(Modulo.curso_id == id_curso)
+        .scalar()
+    )
+
     nova_matricula = Matricula(
         aluno_id=id_aluno,
         curso_id=id_curso,
-        status_matricula="ativa"
+        status_matricula="ativa",
+        aulas_concluidas=0,
+        total_aulas=total_aulas or 0,
     )
 
     db.add(nova_matricula)
@@ -333,7 +361,9 @@ def create_enrollment(
     db.refresh(nova_matricula)
 
     return success_response(
-        data=serialize_enrollment(nova_matricula, db),
+        data=serialize_enrollment(
+            enrollment_query(db).filter(Matricula.id == nova_matricula.id).one()
+        ),
         message="Matrícula criada com sucesso",
         status_code=status.HTTP_201_CREATED
     )
@@ -366,16 +396,56 @@ def delete_enrollment(
         status_code=status.HTTP_200_OK
     )
 
-@router.patch("/{enrollment_id}/classes/{class_id}/toggle", status_code=status.HTTP_200_OK)
-def toggle_class(
+# Mesma regra de check_enrollment_access, mas como condição SQL (sobre Matricula JOIN Curso)
+def enrollment_access_filter(usuario: dict):
+    """
+    Retorna a condição de acesso à matrícula para ser embutida em uma consulta,
+    evitando o SELECT separado de check_enrollment_access.
+    """
+    role = usuario.get("role")
+    user_id = usuario.get("id")
+
+    if role == "admin":
+        return true()
+    if role == "aluno":
+        return Matricula.aluno_id == user_id
+    if role == "instrutor":
+        return Curso.instrutor_id == user_id
+    return false()
+
+
+class ConclusaoAula(BaseModel):
+    """Body do PUT /enrollments/{id}/classes/{class_id}"""
+    concluido: bool
+
+
+def _salvar_progresso_aula(
+    db: Session,
+    usuario: dict,
     enrollment_id: int,
     class_id: int,
-    db: Session = Depends(get_db),
-    usuario=Depends(allowed_roles("aluno", "instrutor", "admin"))
+    concluido: Optional[bool] = None,
 ):
     """
-    Alterna o status de conclusão de uma aula.
+    Grava o progresso da aula em uma única ida ao banco (ver salvar_conclusao).
+    Se nada voltou, descobre o motivo (404/403) ou, no modo explícito,
+    devolve o estado atual, já que a aula já estava no estado pedido.
+    As rotas `async def` chamam esta função via AsyncSession.run_sync.
     """
+    linha = salvar_conclusao(
+        db,
+        matricula_id=enrollment_id,
+        aula_id=class_id,
+        filtro_acesso=enrollment_access_filter(usuario),
+        concluido=concluido,
+    )
+    db.commit()
+
+    if linha is not None:
+        message = "Aula marcada como concluída" if linha.concluido else "Aula desmarcada como concluída"
+        return linha, message
+
+    # Caminho lento (só em erro ou em repetição idempotente)
     matricula = db.query(Matricula).filter(Matricula.id == enrollment_id).first()
     if not matricula:
         raise HTTPException(
@@ -385,8 +455,20 @@ def toggle_class(
 
     check_enrollment_access(matricula, usuario, db, "matrícula")
 
-    aula = db.query(Aula).filter(Aula.id == class_id).first()
-    if not aula:
+    if matricula.status_matricula == "cancelada":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Matrícula cancelada"
+        )
+
+    # A aula precisa pertencer ao curso da matrícula, senão os contadores ficam errados
+    aula = (
+        db.query(Aula.id)
+        .join(Modulo, Modulo.id == Aula.modulo_id)
+        .filter(Aula.id == class_id, Modulo.curso_id == matricula.curso_id)
+        .first()
+    )
+    if not aula or concluido is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aula não encontrada"
@@ -399,36 +481,74 @@ def toggle_class(
         )
     ).first()
 
-    if not progresso:
-        progresso = ProgressoAulas(
-            matricula_id=enrollment_id,
-            aula_id=class_id,
-            progresso_percentual=100,
-            concluido=True,
-            data_conclusao=datetime.utcnow()
-        )
-        db.add(progresso)
-        message = "Aula marcada como concluída"
-    else:
-        progresso.concluido = not progresso.concluido
-        if progresso.concluido:
-            progresso.progresso_percentual = 100
-            progresso.data_conclusao = datetime.utcnow()
-            message = "Aula marcada como concluída"
-        else:
-            progresso.progresso_percentual = 0
-            progresso.data_conclusao = None
-            message = "Aula desmarcada como concluída"
+    linha = SimpleNamespace(
+        concluido=progresso.concluido if progresso else False,
+        progresso_percentual=progresso.progresso_percentual if progresso else 0,
+        data_conclusao=progresso.data_conclusao if progresso else None,
+        aulas_concluidas=matricula.aulas_concluidas,
+        total_aulas=matricula.total_aulas,
+        status_matricula=matricula.status_matricula,
+    )
+    message = "Aula já estava marcada como concluída" if concluido else "Aula já estava desmarcada como concluída"
+    return linha, message
 
-    db.commit()
+
+def _serialize_progresso_aula(class_id: int, linha) -> dict:
+    return {
+        "id_aula": class_id,
+        "concluido": linha.concluido,
+        "progresso_percentual": linha.progresso_percentual,
+        "data_conclusao": linha.data_conclusao,
+        "aulas_concluidas": linha.aulas_concluidas,
+        "total_aulas": linha.total_aulas,
+        "progresso_curso": percentual_conclusao(linha.aulas_concluidas, linha.total_aulas),
+        "status_matricula": linha.status_matricula,
+    }
+
+
+@router.patch("/{enrollment_id}/classes/{class_id}/toggle", status_code=status.HTTP_200_OK)
+async def toggle_class(
+    enrollment_id: int,
+    class_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(allowed_roles("aluno", "instrutor", "admin"))
+):
+    """
+    Alterna o status de conclusão de uma aula.
+
+    Tudo (checagem de acesso, upsert do progresso e contadores da matrícula) roda em uma
+    única instrução SQL. A matrícula é concluída automaticamente quando todas as aulas
+    do curso estiverem concluídas (ou reaberta, se uma aula for desmarcada).
+    """
+    linha, message = await db.run_sync(_salvar_progresso_aula, usuario, enrollment_id, class_id)
+
+    return success_response(
+        data=_serialize_progresso_aula(class_id, linha),
+        message=message,
+        status_code=status.HTTP_200_OK
+    )
+
+
+@router.put("/{enrollment_id}/classes/{class_id}", status_code=status.HTTP_200_OK)
+async def set_class_completion(
+    enrollment_id: int,
+    class_id: int,
+    payload: ConclusaoAula,
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(allowed_roles("aluno", "instrutor", "admin"))
+):
+    """
+    Define explicitamente se a aula está concluída ({"concluido": true/false}).
+
+    Diferente do toggle, repetir a mesma requisição não muda nada (idempotente),
+    então o front pode reenviar com segurança em caso de timeout.
+    """
+    linha, message = await db.run_sync(
+        _salvar_progresso_aula, usuario, enrollment_id, class_id, payload.concluido
+    )
 
     return success_response(
-        data={
-            "id_aula": class_id,
-            "concluido": progresso.concluido,
-            "progresso_percentual": progresso.progresso_percentual,
-            "data_conclusao": progresso.data_conclusao
-        },
+        data=_serialize_progresso_aula(class_id, linha),
         message=message,
         status_code=status.HTTP_200_OK
     )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, status, HTTPException, Path
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.core.replicas import get_read_db
 from app.models.evaluation import AvaliacaoCurso
 from app.models.user import Usuario
 from app.models.course import Curso
@@ -9,6 +10,9 @@ from app.models.enrollment import Matricula
 from app.schemas.evaluation import AvaliacaoCriar, AvaliacaoResponse
 from app.core.security import allowed_roles
 from app.core.response import success_response
+from app.core.cache import cached_response, response_cache
+from app.services.rating_service import registrar_avaliacao
+from app.services.table_version_service import incrementar_versao, CURSOS
 
 router = APIRouter(
     prefix="/courses",
@@ -31,9 +35,10 @@ class AvaliacaoListaResponse(BaseModel):
 
 # Rota para listar avaliações de um curso
 @router.get("/{curso_id}/reviews", status_code=status.HTTP_200_OK)
+@cached_response("reviews", tags=lambda p: [f"reviews:{p['curso_id']}"])
 def listar_avaliacoes(
     curso_id: int = Path(..., gt=0),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retorna todas as avaliações de um curso.
@@ -122,8 +127,13 @@ def criar_avaliacao(
     )
 
     db.add(nova_avaliacao)
+    # Atualiza soma/quantidade/média/histograma do curso na mesma transação
+    registrar_avaliacao(db, curso_id, avaliacao_data.nota)
+    incrementar_versao(db, CURSOS)
     db.commit()
     db.refresh(nova_avaliacao)
+    # Média/quantidade mudaram: catálogo, detalhe do curso e lista de avaliações
+    response_cache.invalidate("courses", f"course:{curso_id}", f"reviews:{curso_id}")
 
     return success_response(
         data=AvaliacaoResponse.model_validate(nova_avaliacao),
@@ -1,19 +1,86 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-from typing import List
+from app.core.security import allowed_roles
+from typing import List, Optional
+from datetime import date
 
 from app.models.instructor import Instrutor
 from app.models.specialty import Especialidade
 from app.schemas.instructor import InstrutorEspecificoResponse
+from app.schemas.course import CursoEstatisticaItem
 from app.core.response import success_response
+from app.core.cache import cached_response
+from app.services.statistics_service import estatisticas_cursos
 
 router = APIRouter(
 	prefix="/instructors",
 	tags=["instructors"]
 )
 
+def validar_periodo(data_inicio: Optional[date], data_fim: Optional[date]):
+    """Garante que o período de data_matricula informado é válido"""
+    if data_inicio and data_fim and data_inicio > data_fim:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="data_inicio não pode ser maior que data_fim."
+        )
+
+
+# Declarada antes de /{id_instrutor} para "statistics" não ser lido como id
+@router.get("/statistics", response_model=List[CursoEstatisticaItem])
+def estatisticas_todos_cursos(
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    db: Session = Depends(get_db),
+    usuario: dict = Depends(allowed_roles("admin")),
+):
+    """
+    GET /instructors/statistics
+
+    Estatísticas de todos os cursos da plataforma (somente admin), em uma única consulta agregada.
+    data_inicio / data_fim filtram as matrículas por data_matricula.
+    """
+    validar_periodo(data_inicio, data_fim)
+    return estatisticas_cursos(db, data_inicio=data_inicio, data_fim=data_fim)
+
+
+@router.get("/{id_instrutor}/statistics", response_model=List[CursoEstatisticaItem])
+def estatisticas_instrutor(
+    id_instrutor: int,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    db: Session = Depends(get_db),
+    usuario: dict = Depends(allowed_roles("instrutor", "admin")),
+):
+    """
+    GET /instructors/{id}/statistics
+
+    Retorna o mesmo ARRAY de CursoEstatisticaItem de /courses/{id}/statistics,
+    mas para todos os cursos do instrutor, em uma única consulta agregada.
+
+    Regras:
+    - instrutor só pode ver as próprias estatísticas
+    - admin pode ver de qualquer instrutor
+    - data_inicio / data_fim filtram as matrículas por data_matricula
+    """
+    if usuario["role"] == "instrutor" and usuario["id"] != id_instrutor:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para ver as estatísticas deste instrutor.",
+        )
+
+    validar_periodo(data_inicio, data_fim)
+    return estatisticas_cursos(
+        db,
+        instrutor_id=id_instrutor,
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+    )
+
+
 @router.get("/{id_instrutor}", response_model=dict)
+@cached_response("instructor", tags=lambda p: [f"instructor:{p['id_instrutor']}"])
 def pega_instrutor(
     id_instrutor: int,
     db: Session = Depends(get_db)
@@ -43,3 +110,4 @@ def pega_instrutor(
         message="Instrutor encontrado com sucesso",
         status_code=status.HTTP_200_OK
     )
+
@@ -2,10 +2,14 @@ from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.core.replicas import get_read_db
 from app.core.security import allowed_roles
 from app.models.level import Nivel
 from app.schemas.level import NivelCreate, NivelResponse, NivelUpdate
 from app.core.response import success_response
+from app.core.cache import cached_response, response_cache
+from app.core.http_cache import conditional_get
+from app.services.table_version_service import incrementar_versao, NIVEIS, CURSOS
 
 router = APIRouter(
     prefix="/levels",
@@ -32,8 +36,10 @@ def criar_nivel(
     )
 
     db.add(nivel_add)
+    incrementar_versao(db, NIVEIS)
     db.commit()
     db.refresh(nivel_add)
+    response_cache.invalidate("levels")
 
     # Transformar o objeto em dict ou Pydantic model
     nivel_data = {
@@ -49,8 +55,10 @@ def criar_nivel(
 
 
 @router.get("/", response_model=List[NivelResponse])
+@conditional_get("levels", tabelas=[NIVEIS])
+@cached_response("levels")
 def listar_niveis(
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     niveis = db.query(Nivel).all()
 
@@ -83,8 +91,11 @@ def atualiza_nivel(
     for campo, value in update_data.items():
         setattr(nivel_db, campo, value)
 
+    incrementar_versao(db, NIVEIS)
     db.commit()
     db.refresh(nivel_db)
+    # A descrição do nível aparece no catálogo e no detalhe dos cursos
+    response_cache.invalidate("levels", "courses", "course")
 
     nivel_data = {
         "id": nivel_db.id,
@@ -110,7 +121,10 @@ def deleta_nivel( id_nivel: int, db: Session = Depends(get_db), require = Depend
         )
 
     db.delete(nivel_db)
+    incrementar_versao(db, NIVEIS, CURSOS)
     db.commit()
+    # A remoção apaga os cursos do nível em cascata
+    response_cache.invalidate("levels", "courses", "course", "reviews")
 
     return success_response(
         data=None,
@@ -44,6 +44,7 @@ class CursoEspecificoResponse(BaseModel):
     descricao: descricaoType
     avaliacao: mediaAvaliacao
     quantidade_avaliacoes: qtdAvaliacao
+    distribuicao_notas: dict[int, int] = Field(default_factory=dict, description="Quantidade de avaliações por nota (1-5)")
     quantidade_horas: cargaHorariaType
     id_nivel: int
     nivel: InstrutorOrNivel
@@ -0,0 +1,39 @@
+"""
+Montagem de schemas de resposta a partir de linhas do banco (dados confiáveis).
+
+Os valores vindos das nossas próprias colunas já respeitam os tipos e restrições
+(NOT NULL, tamanho, FK), então não há o que validar de novo na saída.
+`model_construct` cria o objeto direto, sem rodar os validadores campo a campo,
+e a serialização continua sendo feita pelo schema (ver app.core.response).
+
+Só para SAÍDA: corpos de requisição continuam passando pela validação normal do FastAPI.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+Schema = TypeVar("Schema", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _campos(schema: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def de_linha(schema: type[Schema], linha: Any, **valores: Any) -> Schema:
+    """
+    Cria o schema lendo os atributos de mesmo nome da linha (objeto ORM ou Row),
+    sem validação. `valores` sobrepõe/complementa os atributos (campos calculados
+    ou com nome diferente da coluna). Campos ausentes ficam com o default do schema.
+    """
+    for campo in _campos(schema):
+        if campo not in valores and hasattr(linha, campo):
+            valores[campo] = getattr(linha, campo)
+    return schema.model_construct(**valores)
+
+
+def de_linhas(schema: type[Schema], linhas: Iterable[Any]) -> list[Schema]:
+    """Versão em lote de `de_linha` para listagens"""
+    return [de_linha(schema, linha) for linha in linhas]
@@ -58,7 +58,13 @@ class UsuarioLogin(BaseModel):
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "bearer"
+    # validade do access token, em segundos
+    expires_in: int
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class UsuarioAdminUpdate(BaseModel):
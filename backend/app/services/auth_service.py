@@ -1,15 +1,47 @@
-from passlib.hash import pbkdf2_sha256
+from passlib.context import CryptContext
 
-def get_password_hash(password: str) -> str:
+from app.core.config import PASSWORD_HASH_SCHEME, PASSWORD_HASH_ROUNDS
+from app.core.hash_pool import password_hash_pool
+
+# Esquema usado desde o início do projeto; continua aceito para os hashes já gravados
+ESQUEMA_LEGADO = "pbkdf2_sha256"
+
+def criar_contexto(esquema: str = PASSWORD_HASH_SCHEME, rounds: int | None = PASSWORD_HASH_ROUNDS) -> CryptContext:
+	"""
+	Contexto do passlib com o esquema/custo configurados.
+	`rounds` está na unidade do esquema; None usa o padrão do passlib para ele.
+	Qualquer hash com outro esquema ou outro custo é considerado desatualizado (needs_update).
+	"""
+	esquemas = [esquema] if esquema == ESQUEMA_LEGADO else [esquema, ESQUEMA_LEGADO]
+	custo = {} if rounds is None else {f"{esquema}__rounds": rounds}
+	return CryptContext(
+		schemes=esquemas,
+		default=esquema,
+		deprecated="auto",
+		**custo,
+	)
+
+pwd_context = criar_contexto()
+
+async def get_password_hash(password: str) -> str:
 	"""
 	Função que recebe uma string(senha) e retorna o hash da string
+	Roda no pool dedicado de hash (503 se estiver saturado)
 	"""
-	return pbkdf2_sha256.hash(password)
+	return await password_hash_pool.run(pwd_context.hash, password)
 
 def create_salt(senha: str , email:str) -> str:
 	"""Função que retorna o salt da senha"""
 	nova_senha = senha + email[:10]
 	return nova_senha
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-	return pbkdf2_sha256.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+	"""Verifica a senha no pool dedicado de hash (503 se estiver saturado)"""
+	return await password_hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+	"""
+	Verifica a senha e, se ela estiver correta mas o hash usar esquema/custo antigos,
+	devolve também o novo hash (senão None), calculado na mesma ida ao pool.
+	"""
+	return await password_hash_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,70 @@
+"""
+Invalidação dos caches em memória (por processo) a partir de eventos do ORM.
+
+Quando uma linha muda, a entrada correspondente sai do cache duas vezes:
+- no flush: leituras a partir daqui não gravam mais o valor antigo
+- depois do commit: leituras feitas entre o flush e o commit (em outras sessões) ainda
+  viam a linha antiga e podem tê-la gravado de volta
+`invalidar_apos_commit` faz as duas coisas; o que falta invalidar fica no `session.info`
+até o commit e é descartado no rollback.
+
+Usado pelo cache de perfis (app.services.profile_service) e, aqui, pelas respostas de
+GET /instructors/{id} no cache de respostas: não há rota de escrita de instrutor, então
+qualquer UPDATE/DELETE pelo ORM do que a resposta mostra invalida a entrada.
+Os eventos são registrados quando o módulo é importado (em app.main).
+"""
+
+from typing import Callable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.models.instructor import Instrutor
+from app.models.specialty import Especialidade
+from app.models.user import Usuario
+
+# Chave, no session.info, de {função de invalidação -> itens pendentes até o commit}
+_CHAVE_PENDENTES = "invalidacoes_pendentes"
+
+
+def invalidar_apos_commit(target, invalidar: Callable, *itens) -> None:
+    """Chama `invalidar(*itens)` agora e de novo depois do commit da sessão de `target`"""
+    invalidar(*itens)
+    sessao = Session.object_session(target)
+    if sessao is not None:
+        sessao.info.setdefault(_CHAVE_PENDENTES, {}).setdefault(invalidar, set()).update(itens)
+
+
+@event.listens_for(Session, "after_commit")
+def _apos_commit(sessao):
+    pendentes = sessao.info.pop(_CHAVE_PENDENTES, None)
+    for invalidar, itens in (pendentes or {}).items():
+        invalidar(*itens)
+
+
+@event.listens_for(Session, "after_rollback")
+def _apos_rollback(sessao):
+    sessao.info.pop(_CHAVE_PENDENTES, None)
+
+
+# GET /instructors/{id}: nome do usuário, instrutor e especialidade
+# (Instrutor.id é o próprio id do usuário, 1:1)
+@event.listens_for(Usuario, "after_update")
+def _usuario_alterado(mapper, connection, target):
+    # Só o nome aparece na resposta (login/troca de senha não invalidam)
+    if inspect(target).attrs.nome.history.has_changes():
+        invalidar_apos_commit(target, response_cache.invalidate, f"instructor:{target.id}")
+
+
+@event.listens_for(Usuario, "after_delete")
+@event.listens_for(Instrutor, "after_update")
+@event.listens_for(Instrutor, "after_delete")
+def _instrutor_alterado(mapper, connection, target):
+    invalidar_apos_commit(target, response_cache.invalidate, f"instructor:{target.id}")
+
+
+@event.listens_for(Especialidade, "after_update")
+@event.listens_for(Especialidade, "after_delete")
+def _especialidade_alterada(mapper, connection, target):
+    invalidar_apos_commit(target, response_cache.invalidate, "instructor")
@@ -0,0 +1,30 @@
+"""
+Perfis de carregamento (eager loading) por formato de resposta.
+
+Cada perfil é uma tupla de opções do SQLAlchemy para usar em `query.options(*PERFIL)`.
+Assim os relacionamentos que a serialização acessa (instrutor.usuario.nome, nivel.descricao, ...)
+vêm no mesmo SELECT via JOIN, em vez de um lazy load por linha (N+1).
+
+Todos os relacionamentos aqui são N:1, então o JOIN não multiplica linhas e o LIMIT continua valendo.
+"""
+
+from sqlalchemy.orm import joinedload
+
+from app.models.course import Curso
+from app.models.instructor import Instrutor
+from app.models.user import Usuario
+
+# Nome do instrutor (instrutor -> usuario), usado em todas as respostas de curso
+_INSTRUTOR_NOME = joinedload(Curso.instrutor).joinedload(Instrutor.usuario).load_only(Usuario.nome)
+
+# GET /courses → CursoResponse
+PERFIL_CATALOGO = (
+    _INSTRUTOR_NOME,
+    joinedload(Curso.nivel),
+)
+
+# GET /courses/{id} → CursoEspecificoResponse
+PERFIL_DETALHE = PERFIL_CATALOGO + (
+    joinedload(Curso.instrutor).joinedload(Instrutor.especialidade_rel),
+)
+
@@ -0,0 +1,167 @@
+"""
+Cache em memória (por processo) do perfil do usuário autenticado (GET /auth/me).
+
+O front chama /auth/me a cada carregamento de página; o perfil quase nunca muda.
+- Chave: id do usuário (vem da claim `sub` do token, já verificada)
+- TTL + número máximo de entradas (LRU)
+- Invalidação automática: qualquer UPDATE/DELETE de um Usuario pelo ORM remove o perfil
+  do cache no flush e de novo depois do commit (ver evento no fim do arquivo)
+- Revalidação: os eventos só valem para este processo e não pegam `query(...).update()`;
+  por isso um perfil em cache só é servido sem consultar o banco por
+  PROFILE_CACHE_REVALIDATE_SECONDS. Depois disso, cada hit confere o `ultima_atualizacao`
+  da linha (uma coluna pela PK, sem montar o perfil) e descarta o perfil se mudou.
+  Um perfil com `tipo_usuario` diferente da role do token também é descartado.
+- Miss: lê o usuário no banco e guarda o resultado
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    PROFILE_CACHE_TTL_SECONDS,
+    PROFILE_CACHE_MAX_ENTRIES,
+    PROFILE_CACHE_REVALIDATE_SECONDS,
+)
+from app.models.user import Usuario
+from app.schemas.mapping import de_linha
+from app.schemas.user import UsuarioResponse
+from app.services.cache_invalidation_service import invalidar_apos_commit
+
+
+class _Entrada:
+    __slots__ = ("perfil", "carimbo", "expira_em", "validar_em")
+
+    def __init__(self, perfil, carimbo, expira_em, validar_em):
+        self.perfil = perfil
+        self.carimbo = carimbo
+        self.expira_em = expira_em
+        self.validar_em = validar_em
+
+
+class ProfileCache:
+    """Cache LRU com TTL de UsuarioResponse por id (+ `ultima_atualizacao` da linha). Thread-safe."""
+
+    def __init__(self, ttl: float, max_entries: int, revalidate: float):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.revalidate = revalidate
+        self._entradas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stale = 0
+        # Incrementada a cada invalidação: uma leitura do banco que começou antes
+        # não pode gravar no cache um perfil possivelmente antigo
+        self.generation = 0
+
+    def get(self, user_id: int) -> _Entrada | None:
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None or entrada.expira_em <= time.monotonic():
+                self._entradas.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(user_id)
+            self.hits += 1
+            return entrada
+
+    def set(self, user_id: int, perfil: UsuarioResponse, carimbo, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            agora = time.monotonic()
+            self._entradas[user_id] = _Entrada(perfil, carimbo, agora + self.ttl, agora + self.revalidate)
+            self._entradas.move_to_end(user_id)
+            while len(self._entradas) > self.max_entries:
+                self._entradas.popitem(last=False)
+
+    def revalidado(self, entrada: _Entrada) -> None:
+        """O carimbo no banco ainda é o da entrada: serve sem consultar por mais `revalidate` segundos"""
+        with self._lock:
+            self.revalidations += 1
+            entrada.validar_em = time.monotonic() + self.revalidate
+
+    def descartar(self, user_id: int, entrada: _Entrada) -> None:
+        """Entrada desatualizada (mudou no banco ou não bate com o token)"""
+        with self._lock:
+            self.stale += 1
+            if self._entradas.get(user_id) is entrada:
+                del self._entradas[user_id]
+
+    def invalidate(self, *user_ids: int) -> None:
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                self._entradas.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entradas),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "revalidate_seconds": self.revalidate,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+                "revalidations": self.revalidations,
+                "stale": self.stale,
+            }
+
+
+profile_cache = ProfileCache(
+    ttl=PROFILE_CACHE_TTL_SECONDS,
+    max_entries=PROFILE_CACHE_MAX_ENTRIES,
+    revalidate=PROFILE_CACHE_REVALIDATE_SECONDS,
+)
+
+
+def _perfil_em_cache(db: Session, user_id: int, role: str | None) -> UsuarioResponse | None:
+    """Perfil do cache se ele ainda vale (role do token e `ultima_atualizacao`), senão None"""
+    entrada = profile_cache.get(user_id)
+    if entrada is None:
+        return None
+    if role is not None and entrada.perfil.tipo_usuario != role:
+        profile_cache.descartar(user_id, entrada)
+        return None
+    if entrada.validar_em > time.monotonic():
+        return entrada.perfil
+
+    carimbo = db.query(Usuario.ultima_atualizacao).filter(Usuario.id == user_id).scalar()
+    if carimbo is None or carimbo != entrada.carimbo:
+        profile_cache.descartar(user_id, entrada)
+        return None
+    profile_cache.revalidado(entrada)
+    return entrada.perfil
+
+
+def buscar_perfil(db: Session, user_id: int, role: str | None = None) -> UsuarioResponse | None:
+    """
+    Perfil do usuário: do cache ou, no miss, do banco. None se o usuário não existir.
+    `role` (claim do token), se passada, tem que bater com o `tipo_usuario` do perfil em cache.
+    """
+    perfil = _perfil_em_cache(db, user_id, role)
+    if perfil is not None:
+        return perfil
+
+    generation = profile_cache.generation
+    usuario = db.get(Usuario, user_id)
+    if usuario is None:
+        return None
+
+    perfil = de_linha(UsuarioResponse, usuario)
+    profile_cache.set(user_id, perfil, usuario.ultima_atualizacao, generation)
+    return perfil
+
+
+# Invalidação no flush e de novo após o commit (ver app.services.cache_invalidation_service)
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _usuario_alterado(mapper, connection, target):
+    invalidar_apos_commit(target, profile_cache.invalidate, target.id)
@@ -0,0 +1,218 @@
+"""
+Manutenção dos contadores de progresso desnormalizados na tabela 'matriculas'
+(aulas_concluidas e total_aulas) e da conclusão automática da matrícula.
+
+- `salvar_conclusao` grava o progresso da aula e atualiza os contadores em uma única instrução
+- `recalcular_progresso` refaz os contadores a partir de 'progresso_aulas' e corrige qualquer divergência
+
+Rodar o recálculo em lote:
+    python -m app.services.progress_service
+"""
+
+from sqlalchemy import and_, case, func, literal, literal_column, not_, null, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.course import Curso
+from app.models.enrollment import Matricula
+from app.models.lesson import Aula
+from app.models.module import Modulo
+from app.models.progress import ProgressoAulas
+
+
+def total_aulas_curso():
+    """Subconsulta (correlacionada com 'matriculas') com o total de aulas do curso da matrícula"""
+    return (
+        select(func.count(Aula.id))
+        .join(Modulo, Modulo.id == Aula.modulo_id)
+        .where(Modulo.curso_id == Matricula.curso_id)
+        .scalar_subquery()
+    )
+
+
+def _valores_progresso(concluidas, total) -> dict:
+    """
+    Valores do UPDATE para os contadores e para o status da matrícula:
+    - todas as aulas concluídas → "concluida" com data_conclusao
+    - matrícula concluída que perdeu uma aula → volta para "ativa"
+    - matrícula cancelada não muda de status
+    """
+    cancelada = Matricula.status_matricula == "cancelada"
+    completou = and_(total > 0, concluidas >= total)
+
+    return {
+        Matricula.aulas_concluidas: concluidas,
+        Matricula.total_aulas: total,
+        Matricula.status_matricula: case(
+            (cancelada, Matricula.status_matricula),
+            (completou, "concluida"),
+            (Matricula.status_matricula == "concluida", "ativa"),
+            else_=Matricula.status_matricula,
+        ),
+        Matricula.data_conclusao: case(
+            (cancelada, Matricula.data_conclusao),
+            (completou, func.coalesce(Matricula.data_conclusao, func.now())),
+            else_=None,
+        ),
+    }
+
+
+def salvar_conclusao(
+    db: Session,
+    *,
+    matricula_id: int,
+    aula_id: int,
+    filtro_acesso,
+    concluido: bool | None = None,
+):
+    """
+    Marca/desmarca uma aula em UMA única instrução SQL (CTEs encadeadas):
+
+    1. `alvo`: matrícula não cancelada + aula do mesmo curso + `filtro_acesso` (permissão do usuário)
+    2. `upsert`: INSERT ... ON CONFLICT (matricula_id, aula_id) DO UPDATE ... RETURNING
+    3. `contadores`: UPDATE atômico dos contadores/status da matrícula (ver `_valores_progresso`)
+
+    - concluido=None alterna o estado atual (toggle)
+    - concluido=True/False grava o estado informado; repetir a chamada não muda nada (idempotente)
+
+    Como o ON CONFLICT trava a linha, toggles concorrentes na mesma aula são serializados
+    pelo banco em vez de disputarem a chave primária composta.
+
+    Retorna a linha final ou None quando nada mudou: matrícula/aula inexistente,
+    matrícula cancelada, acesso negado ou (no modo explícito) a aula já estava no estado pedido.
+    Não faz commit. Exige PostgreSQL.
+    """
+    novo = True if concluido is None else concluido
+
+    alvo = (
+        select(
+            Matricula.id.label("matricula_id"),
+            Aula.id.label("aula_id"),
+            literal(100 if novo else 0).label("progresso_percentual"),
+            literal(novo).label("concluido"),
+            (func.now() if novo else null()).label("data_conclusao"),
+        )
+        .join(Curso, Curso.id == Matricula.curso_id)
+        .join(Modulo, Modulo.curso_id == Matricula.curso_id)
+        .join(Aula, Aula.modulo_id == Modulo.id)
+        .where(
+            Matricula.id == matricula_id,
+            Aula.id == aula_id,
+            Matricula.status_matricula != "cancelada",
+            filtro_acesso,
+        )
+    )
+
+    insert_stmt = pg_insert(ProgressoAulas).from_select(
+        ["matricula_id", "aula_id", "progresso_percentual", "concluido", "data_conclusao"],
+        alvo,
+    )
+    if concluido is None:
+        # Toggle: inverte o valor que está gravado (o da linha travada, não o de um snapshot)
+        upsert = insert_stmt.on_conflict_do_update(
+            index_elements=[ProgressoAulas.matricula_id, ProgressoAulas.aula_id],
+            set_={
+                "concluido": not_(ProgressoAulas.concluido),
+                "progresso_percentual": case((ProgressoAulas.concluido, 0), else_=100),
+                "data_conclusao": case((ProgressoAulas.concluido, null()), else_=func.now()),
+            },
+        )
+    else:
+        # Valor explícito: só atualiza se for diferente do que já está gravado
+        upsert = insert_stmt.on_conflict_do_update(
+            index_elements=[ProgressoAulas.matricula_id, ProgressoAulas.aula_id],
+            set_={
+                "concluido": insert_stmt.excluded.concluido,
+                "progresso_percentual": insert_stmt.excluded.progresso_percentual,
+                "data_conclusao": insert_stmt.excluded.data_conclusao,
+            },
+            where=ProgressoAulas.concluido.is_distinct_from(insert_stmt.excluded.concluido),
+        )
+
+    upsert = upsert.returning(
+        ProgressoAulas.matricula_id,
+        ProgressoAulas.concluido,
+        ProgressoAulas.progresso_percentual,
+        ProgressoAulas.data_conclusao,
+        # xmax = 0 → a linha foi inserida agora (não havia progresso para a aula)
+        literal_column("(xmax = 0)").label("inserido"),
+    ).cte("upsert")
+
+    # Toda linha que volta do upsert mudou de estado (ou foi criada):
+    # inserida conta o próprio valor; atualizada conta +1/-1 conforme o novo valor
+    delta = case(
+        (upsert.c.inserido, case((upsert.c.concluido, 1), else_=0)),
+        (upsert.c.concluido, 1),
+        else_=-1,
+    )
+
+    contadores = (
+        update(Matricula)
+        .where(Matricula.id == upsert.c.matricula_id)
+        .values(_valores_progresso(Matricula.aulas_concluidas + delta, total_aulas_curso()))
+        .returning(
+            Matricula.id.label("matricula_id"),
+            Matricula.aulas_concluidas,
+            Matricula.total_aulas,
+            Matricula.status_matricula,
+        )
+        .cte("contadores")
+    )
+
+    stmt = (
+        select(
+            upsert.c.concluido,
+            upsert.c.progresso_percentual,
+            upsert.c.data_conclusao,
+            contadores.c.aulas_concluidas,
+            contadores.c.total_aulas,
+            contadores.c.status_matricula,
+        )
+        .join(contadores, contadores.c.matricula_id == upsert.c.matricula_id)
+    )
+    return db.execute(stmt).first()
+
+
+def recalcular_progresso(db: Session, matricula_id: int | None = None) -> int:
+    """
+    Recalcula os contadores a partir de 'progresso_aulas' em um único UPDATE.
+    Se `matricula_id` não for informado, recalcula todas as matrículas.
+    Retorna a quantidade de matrículas atualizadas. Não faz commit.
+    """
+    concluidas = (
+        select(func.count())
+        .select_from(ProgressoAulas)
+        .where(
+            ProgressoAulas.matricula_id == Matricula.id,
+            ProgressoAulas.concluido.is_(True),
+        )
+        .scalar_subquery()
+    )
+
+    stmt = (
+        update(Matricula)
+        .values(_valores_progresso(concluidas, total_aulas_curso()))
+        .execution_options(synchronize_session=False)
+    )
+    if matricula_id is not None:
+        stmt = stmt.where(Matricula.id == matricula_id)
+
+    return db.execute(stmt).rowcount
+
+
+def percentual_conclusao(aulas_concluidas: int, total_aulas: int) -> float:
+    """Percentual de conclusão (0-100) a partir dos contadores da matrícula"""
+    return round(aulas_concluidas / total_aulas * 100, 2) if total_aulas else 0.0
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401 - registra todos os models/relacionamentos
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        total = recalcular_progresso(db)
+        db.commit()
+        print(f"Contadores de progresso recalculados para {total} matrícula(s).")
+    finally:
+        db.close()
@@ -0,0 +1,106 @@
+"""
+Manutenção dos agregados de avaliação desnormalizados na tabela 'cursos'
+(soma, quantidade, média e histograma por nota).
+
+- `registrar_avaliacao` é chamado na mesma transação que insere a AvaliacaoCurso
+- `recalcular_avaliacoes` refaz os agregados a partir de 'avaliacao_curso' e corrige qualquer divergência
+
+Rodar o recálculo em lote:
+    python -m app.services.rating_service
+"""
+
+from sqlalchemy import Float, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.course import Curso
+from app.models.evaluation import AvaliacaoCurso
+
+# Colunas do histograma, indexadas pela nota (1 a 5)
+COLUNAS_HISTOGRAMA = {
+    1: Curso.qtd_nota_1,
+    2: Curso.qtd_nota_2,
+    3: Curso.qtd_nota_3,
+    4: Curso.qtd_nota_4,
+    5: Curso.qtd_nota_5,
+}
+
+
+def distribuicao_notas(curso: Curso) -> dict[int, int]:
+    """Retorna o histograma do curso no formato {nota: quantidade}"""
+    return {nota: getattr(curso, coluna.key) or 0 for nota, coluna in COLUNAS_HISTOGRAMA.items()}
+
+
+def registrar_avaliacao(db: Session, curso_id: int, nota: int) -> None:
+    """
+    Soma uma nova nota aos agregados do curso com um UPDATE atômico (sem ler a linha antes).
+    Não faz commit: deve rodar na mesma transação do INSERT da avaliação.
+    """
+    coluna_nota = COLUNAS_HISTOGRAMA[nota]
+    db.execute(
+        update(Curso)
+        .where(Curso.id == curso_id)
+        .values({
+            Curso.soma_avaliacoes: Curso.soma_avaliacoes + nota,
+            Curso.quantidade_avaliacoes: Curso.quantidade_avaliacoes + 1,
+            # No UPDATE os valores da direita ainda são os antigos
+            Curso.media_avaliacoes: (Curso.soma_avaliacoes + nota).cast(Float) / (Curso.quantidade_avaliacoes + 1),
+            coluna_nota: coluna_nota + 1,
+        })
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recalcular_avaliacoes(db: Session, curso_id: int | None = None) -> int:
+    """
+    Recalcula os agregados a partir da tabela 'avaliacao_curso' em um único UPDATE.
+    Se `curso_id` não for informado, recalcula todos os cursos.
+    Retorna a quantidade de cursos atualizados. Não faz commit.
+    """
+    soma = (
+        select(func.coalesce(func.sum(AvaliacaoCurso.nota), 0))
+        .where(AvaliacaoCurso.curso_id == Curso.id)
+        .scalar_subquery()
+    )
+    quantidade = (
+        select(func.count(AvaliacaoCurso.id))
+        .where(AvaliacaoCurso.curso_id == Curso.id)
+        .scalar_subquery()
+    )
+    media = (
+        select(func.coalesce(func.avg(AvaliacaoCurso.nota), 0).cast(Float))
+        .where(AvaliacaoCurso.curso_id == Curso.id)
+        .scalar_subquery()
+    )
+
+    valores = {
+        Curso.soma_avaliacoes: soma,
+        Curso.quantidade_avaliacoes: quantidade,
+        Curso.media_avaliacoes: media,
+    }
+    for nota, coluna in COLUNAS_HISTOGRAMA.items():
+        valores[coluna] = (
+            select(func.count(case((AvaliacaoCurso.nota == nota, 1))))
+            .where(AvaliacaoCurso.curso_id == Curso.id)
+            .scalar_subquery()
+        )
+
+    stmt = update(Curso).values(valores).execution_options(synchronize_session=False)
+    if curso_id is not None:
+        stmt = stmt.where(Curso.id == curso_id)
+
+    return db.execute(stmt).rowcount
+
+
+if __name__ == "__main__":
+    import app.models  # noqa: F401 - registra todos os models/relacionamentos
+    from app.database import SessionLocal
+    from app.services.table_version_service import incrementar_versao, CURSOS
+
+    db = SessionLocal()
+    try:
+        total = recalcular_avaliacoes(db)
+        incrementar_versao(db, CURSOS)
+        db.commit()
+        print(f"Agregados de avaliação recalculados para {total} curso(s).")
+    finally:
+        db.close()
@@ -0,0 +1,165 @@
+"""
+Sessões de login (tabela 'sessoes_usuarios'): refresh tokens e revogação.
+
+- `criar_sessao`: no login, cria a sessão e devolve access token (curto) + refresh token
+- `renovar_sessao`: troca um refresh token válido por um novo par (rotação); reuso de um
+  refresh token antigo revoga a sessão inteira (indício de token vazado)
+- `revogar_sessao`: logout; marca a sessão no banco, coloca o `sid` na denylist local e
+  tira do cache de tokens os access tokens da sessão
+- `sincronizar_denylist`: leitura incremental das sessões revogadas em outros workers/nós,
+  rodada em segundo plano por `iniciar_sincronizacao_denylist` (nunca na requisição)
+
+O refresh token tem o formato "<id da sessão>.<segredo>"; só o SHA-256 do segredo fica no banco.
+Nenhuma função aqui faz commit.
+"""
+
+import hashlib
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    DENYLIST_SYNC_SECONDS,
+)
+from app.core.denylist import revoked_sessions
+from app.core.security import create_access_token
+from app.core.token_cache import token_cache
+from app.models.session import SessaoUsuario
+from app.models.user import Usuario
+
+logger = logging.getLogger(__name__)
+
+# Por quanto tempo uma sessão revogada precisa ficar na denylist: depois disso
+# todo access token emitido para ela já expirou
+_DURACAO_ACESSO = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+# Releitura de alguns segundos antes do último marcador (commits concorrentes
+# podem aparecer com revogada_em um pouco menor que o da última leitura)
+_SOBREPOSICAO = timedelta(seconds=30)
+
+
+def _hash_segredo(segredo: str) -> str:
+    return hashlib.sha256(segredo.encode()).hexdigest()
+
+
+def _emitir_tokens(db: Session, sessao: SessaoUsuario, usuario: Usuario) -> dict:
+    """Gera um novo segredo de refresh para a sessão e um access token ligado a ela"""
+    segredo = secrets.token_urlsafe(32)
+    sessao.refresh_hash = _hash_segredo(segredo)
+    sessao.expira_em = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.flush()
+
+    return {
+        "access_token": create_access_token(
+            user_id=usuario.id, email=usuario.email, role=usuario.tipo_usuario, sid=str(sessao.id)
+        ),
+        "refresh_token": f"{sessao.id}.{segredo}",
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def criar_sessao(db: Session, usuario: Usuario) -> dict:
+    """Cria a sessão do login e devolve access token + refresh token"""
+    sessao = SessaoUsuario(usuario_id=usuario.id, refresh_hash="", expira_em=datetime.now(timezone.utc))
+    db.add(sessao)
+    db.flush()
+    return _emitir_tokens(db, sessao, usuario)
+
+
+def renovar_sessao(db: Session, refresh_token: str) -> dict | None:
+    """
+    Troca o refresh token por um novo par. Retorna None se ele for inválido, expirado
+    ou de sessão revogada. Se for um refresh token já trocado (reuso), revoga a sessão.
+    """
+    sid, _, segredo = refresh_token.partition(".")
+    try:
+        sid = UUID(sid)
+    except ValueError:
+        return None
+
+    # Trava a linha: duas renovações simultâneas com o mesmo token não geram dois pares
+    sessao = (
+        db.query(SessaoUsuario)
+        .filter(SessaoUsuario.id == sid)
+        .with_for_update()
+        .first()
+    )
+    if sessao is None or sessao.revogada_em is not None:
+        return None
+    if sessao.expira_em <= datetime.now(timezone.utc):
+        return None
+    if not secrets.compare_digest(sessao.refresh_hash, _hash_segredo(segredo)):
+        revogar_sessao(db, str(sid))
+        return None
+
+    usuario = db.get(Usuario, sessao.usuario_id)
+    return _emitir_tokens(db, sessao, usuario)
+
+
+def revogar_sessao(db: Session, sid: str) -> None:
+    """Revoga a sessão (banco + denylist e cache de tokens locais deste processo)"""
+    usuario_id = db.execute(
+        update(SessaoUsuario)
+        .where(SessaoUsuario.id == UUID(sid), SessaoUsuario.revogada_em.is_(None))
+        .values(revogada_em=func.now())
+        .returning(SessaoUsuario.usuario_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    revoked_sessions.add(sid, time.time() + _DURACAO_ACESSO.total_seconds())
+    if usuario_id is not None:
+        token_cache.invalidate_user(usuario_id, sid)
+
+
+def sincronizar_denylist(db: Session, desde: datetime | None = None) -> datetime | None:
+    """
+    Copia para a denylist as sessões revogadas depois de `desde` (todas as ainda
+    relevantes se `desde` for None) e descarta as entradas vencidas.
+    Retorna o novo marcador para a próxima chamada.
+    """
+    limite = datetime.now(timezone.utc) - _DURACAO_ACESSO
+    if desde is not None:
+        limite = max(limite, desde - _SOBREPOSICAO)
+
+    linhas = db.execute(
+        select(SessaoUsuario.id, SessaoUsuario.usuario_id, SessaoUsuario.revogada_em)
+        .where(SessaoUsuario.revogada_em > limite)
+    ).all()
+
+    for sid, usuario_id, revogada_em in linhas:
+        revoked_sessions.add(str(sid), (revogada_em + _DURACAO_ACESSO).timestamp())
+        # Sessão revogada por outro worker/nó: os tokens dela saem também do cache deste
+        token_cache.invalidate_user(usuario_id, str(sid))
+        if desde is None or revogada_em > desde:
+            desde = revogada_em
+
+    revoked_sessions.purge_expired()
+    return desde
+
+
+def iniciar_sincronizacao_denylist(session_factory, intervalo: float = DENYLIST_SYNC_SECONDS) -> threading.Thread:
+    """Sobe uma thread daemon que chama `sincronizar_denylist` a cada `intervalo` segundos"""
+
+    def loop():
+        desde = None
+        while True:
+            db = session_factory()
+            try:
+                desde = sincronizar_denylist(db, desde)
+            except Exception:
+                logger.exception("Falha ao sincronizar a denylist de sessões")
+            finally:
+                db.close()
+            time.sleep(intervalo)
+
+    thread = threading.Thread(target=loop, name="denylist-sync", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,136 @@
+"""
+Estatísticas de cursos calculadas no banco (GROUP BY sobre os contadores desnormalizados).
+
+Em vez de carregar matrículas, progresso, módulos e aulas como objetos ORM,
+o banco devolve só os números finais por curso:
+- quantidade de alunos (matrículas)
+- percentual médio de conclusão (matriculas.aulas_concluidas / total de aulas do curso)
+- média das avaliações (agregado já mantido em cursos.media_avaliacoes)
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.category import Categoria
+from app.models.course import Curso
+from app.models.enrollment import Matricula
+from app.models.lesson import Aula
+from app.models.level import Nivel
+from app.models.module import Modulo
+from app.models.user import Usuario
+from app.schemas.course import CursoEstatisticaItem
+
+
+def estatisticas_cursos(
+    db: Session,
+    *,
+    curso_id: int | None = None,
+    instrutor_id: int | None = None,
+    data_inicio: date | None = None,
+    data_fim: date | None = None,
+) -> list[CursoEstatisticaItem]:
+    """
+    Retorna um CursoEstatisticaItem por curso, com tudo agregado em uma única consulta.
+
+    Filtros opcionais:
+    - curso_id: só o curso informado (lista vazia se não existir)
+    - instrutor_id: todos os cursos do instrutor
+    - data_inicio / data_fim: só considera matrículas com data_matricula no intervalo (inclusivo)
+    """
+    # Filtros aplicados sobre os cursos
+    filtros_curso = []
+    if curso_id is not None:
+        filtros_curso.append(Curso.id == curso_id)
+    if instrutor_id is not None:
+        filtros_curso.append(Curso.instrutor_id == instrutor_id)
+
+    # Filtros aplicados sobre as matrículas (cursos do filtro + período)
+    filtros_matricula = []
+    if filtros_curso:
+        cursos_ids = db.query(Curso.id).filter(*filtros_curso)
+        filtros_matricula.append(Matricula.curso_id.in_(cursos_ids))
+    if data_inicio is not None:
+        filtros_matricula.append(Matricula.data_matricula >= data_inicio)
+    if data_fim is not None:
+        filtros_matricula.append(Matricula.data_matricula < data_fim + timedelta(days=1))
+
+    # Total de aulas por curso (modulos → aulas)
+    total_aulas = (
+        db.query(
+            Modulo.curso_id.label("curso_id"),
+            func.count(Aula.id).label("total_aulas"),
+        )
+        .join(Aula, Aula.modulo_id == Modulo.id)
+        .group_by(Modulo.curso_id)
+    )
+    if filtros_curso:
+        total_aulas = total_aulas.filter(Modulo.curso_id.in_(cursos_ids))
+
+    total_aulas = total_aulas.subquery()
+
+    # Alunos e média de aulas concluídas por curso
+    matriculas = (
+        db.query(
+            Matricula.curso_id.label("curso_id"),
+            func.count(Matricula.id).label("quantidade_alunos"),
+            # Contador mantido na própria matrícula (ver app.services.progress_service)
+            func.avg(Matricula.aulas_concluidas).label("media_concluidas"),
+        )
+        .filter(*filtros_matricula)
+        .group_by(Matricula.curso_id)
+        .subquery()
+    )
+
+    query = (
+        db.query(
+            Curso.id,
+            Curso.titulo,
+            Curso.categoria_id,
+            Categoria.descricao.label("categoria"),
+            Curso.nivel_id,
+            Nivel.descricao.label("nivel"),
+            Curso.instrutor_id,
+            Usuario.nome.label("instrutor"),
+            Curso.media_avaliacoes,
+            Curso.data_criacao,
+            func.coalesce(matriculas.c.quantidade_alunos, 0).label("quantidade_alunos"),
+            matriculas.c.media_concluidas,
+            func.coalesce(total_aulas.c.total_aulas, 0).label("total_aulas"),
+        )
+        .outerjoin(Categoria, Categoria.id == Curso.categoria_id)
+        .outerjoin(Nivel, Nivel.id == Curso.nivel_id)
+        # Instrutor.id é o próprio id do usuário (1:1)
+        .outerjoin(Usuario, Usuario.id == Curso.instrutor_id)
+        .outerjoin(matriculas, matriculas.c.curso_id == Curso.id)
+        .outerjoin(total_aulas, total_aulas.c.curso_id == Curso.id)
+        .filter(*filtros_curso)
+    )
+
+    itens = []
+    for linha in query.order_by(Curso.id).all():
+        percentual = 0.0
+        if linha.quantidade_alunos > 0 and linha.total_aulas > 0:
+            percentual = float(linha.media_concluidas or 0) / linha.total_aulas * 100
+
+        itens.append(
+            # Valores agregados pelo próprio banco: sem revalidação campo a campo
+            CursoEstatisticaItem.model_construct(
+                id=linha.id,
+                titulo=linha.titulo,
+                id_categoria=linha.categoria_id,
+                categoria=linha.categoria or "",
+                id_nivel=linha.nivel_id,
+                nivel=linha.nivel or "",
+                id_instrutor=linha.instrutor_id,
+                instrutor=linha.instrutor or "",
+                percentual_conclusao=percentual,
+                media_notas=linha.media_avaliacoes or 0.0,
+                quantidade_alunos=linha.quantidade_alunos,
+                data_criacao=linha.data_criacao,
+                data_publicacao=None,  # ainda não existe no model
+            )
+        )
+
+    return itens
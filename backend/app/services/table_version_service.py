@@ -0,0 +1,65 @@
+"""
+Contadores de versão por tabela (tabela 'versoes_tabelas').
+
+Toda rota que altera cursos, categorias ou níveis chama `incrementar_versao` antes do commit,
+na mesma transação. As rotas públicas usam `buscar_versoes` para montar ETag/Last-Modified
+com uma única leitura por chave primária (ver app.core.http_cache).
+
+"instrutores" cobre os dados do instrutor que as respostas de curso mostram (nome do usuário,
+especialidade). Não há rota de escrita para eles, então a versão é incrementada por eventos
+do ORM, no flush de qualquer alteração (ver fim do arquivo).
+"""
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.instructor import Instrutor
+from app.models.specialty import Especialidade
+from app.models.table_version import VersaoTabela
+from app.models.user import Usuario
+
+# Tabelas versionadas
+CURSOS = "cursos"
+CATEGORIAS = "categorias"
+NIVEIS = "niveis"
+INSTRUTORES = "instrutores"
+
+
+def _incremento(tabela: str):
+    stmt = pg_insert(VersaoTabela).values(tabela=tabela, versao=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[VersaoTabela.tabela],
+        set_={
+            "versao": VersaoTabela.versao + 1,
+            "atualizado_em": func.now(),
+        },
+    )
+
+
+def incrementar_versao(db: Session, *tabelas: str) -> None:
+    """Incrementa a versão das tabelas (cria a linha se ainda não existir). Não faz commit."""
+    for tabela in tabelas:
+        db.execute(_incremento(tabela))
+
+
+def buscar_versoes(db: Session, tabelas) -> list[VersaoTabela]:
+    """Retorna as versões atuais das tabelas (tabela sem linha ainda é tratada como versão 0)"""
+    return db.query(VersaoTabela).filter(VersaoTabela.tabela.in_(tabelas)).all()
+
+
+# Dados de instrutor exibidos nas respostas de curso: a versão sobe na mesma transação da escrita
+@event.listens_for(Usuario, "after_update")
+def _usuario_alterado(mapper, connection, target):
+    # Só o nome aparece nas respostas de curso (login/troca de senha não mudam o ETag)
+    if inspect(target).attrs.nome.history.has_changes():
+        connection.execute(_incremento(INSTRUTORES))
+
+
+@event.listens_for(Usuario, "after_delete")
+@event.listens_for(Instrutor, "after_update")
+@event.listens_for(Instrutor, "after_delete")
+@event.listens_for(Especialidade, "after_update")
+@event.listens_for(Especialidade, "after_delete")
+def _instrutor_alterado(mapper, connection, target):
+    connection.execute(_incremento(INSTRUTORES))
@@ -0,0 +1,135 @@
+"""
+Benchmark de saturação: rota sync (`def` + Session) x rota async (`async def` + AsyncSession).
+
+As rotas `def` rodam no threadpool do anyio, limitado a 40 threads: com o banco
+demorando L segundos por consulta, cada worker atende no máximo ~40/L requisições/s,
+não importa o tamanho do pool de conexões. As rotas `async def` (get_async_db) só
+esperam o asyncpg no event loop, então o limite passa a ser o pool de conexões.
+
+Cada requisição faz `SELECT pg_sleep(latência)` para simular a ida e volta até o Supabase.
+Os dois engines usam o mesmo tamanho de pool (maior que a concorrência), para que a
+única diferença seja o threadpool. As requisições vão direto para a aplicação ASGI.
+
+Precisa de um Postgres acessível por DATABASE_URL (e ASYNC_DATABASE_URL, se usada).
+
+Rodar (dentro de backend/):
+    python -m benchmarks.async_db
+    python -m benchmarks.async_db --latencia 0.02 --concorrencia 10 40 100 200 --rodadas 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.db_pool import connect_args_pooler
+from app.database import engine, ASYNC_DATABASE_URL, ASYNC_CONNECT_ARGS
+
+
+def montar_app(latencia: float, pool: int):
+    sync_engine = create_engine(engine.url, pool_size=pool, max_overflow=0)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL, connect_args=connect_args_pooler(ASYNC_CONNECT_ARGS, assincrono=True),
+        pool_size=pool, max_overflow=0,
+    )
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionBench = async_sessionmaker(bind=async_engine, class_=AsyncSession)
+    consulta = text("SELECT pg_sleep(:latencia)")
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionBench() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def rota_sync(db: Session = Depends(get_sync_db)):
+        db.execute(consulta, {"latencia": latencia})
+        return PlainTextResponse("ok")
+
+    @app.get("/async")
+    async def rota_async(db: AsyncSession = Depends(get_async_db)):
+        await db.execute(consulta, {"latencia": latencia})
+        return PlainTextResponse("ok")
+
+    return app, sync_engine, async_engine
+
+
+async def requisicao(app, path: str) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+    corpo_enviado = False
+
+    async def receive():
+        nonlocal corpo_enviado
+        if not corpo_enviado:
+            corpo_enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message["status"]
+
+    inicio = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - inicio
+
+
+async def medir(app, path: str, concorrencia: int, rodadas: int) -> tuple[float, float]:
+    """Retorna (requisições/s, latência p50 em ms) com `concorrencia` requisições simultâneas"""
+    # Aquecimento: abre as conexões do pool
+    await asyncio.gather(*(requisicao(app, path) for _ in range(concorrencia)))
+
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(rodadas):
+        latencias += await asyncio.gather(*(requisicao(app, path) for _ in range(concorrencia)))
+    total = time.perf_counter() - inicio
+    return len(latencias) / total, statistics.median(latencias) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia", type=float, default=0.05, help="segundos de pg_sleep por consulta")
+    parser.add_argument("--concorrencia", nargs="+", type=int, default=[10, 40, 100, 200])
+    parser.add_argument("--rodadas", type=int, default=3)
+    args = parser.parse_args()
+
+    pool = max(args.concorrencia)
+    app, sync_engine, async_engine = montar_app(args.latencia, pool)
+
+    print(f"Latência simulada {args.latencia * 1000:.0f} ms, pool de {pool} conexões nos dois engines")
+    print(f"  {'concorrência':>12} | {'sync req/s':>10} {'p50 ms':>8} | {'async req/s':>11} {'p50 ms':>8} | ganho")
+    try:
+        for concorrencia in args.concorrencia:
+            sync_rps, sync_p50 = await medir(app, "/sync", concorrencia, args.rodadas)
+            async_rps, async_p50 = await medir(app, "/async", concorrencia, args.rodadas)
+            print(
+                f"  {concorrencia:>12} | {sync_rps:>10.0f} {sync_p50:>8.0f} | "
+                f"{async_rps:>11.0f} {async_p50:>8.0f} | {async_rps / sync_rps:.2f}x"
+            )
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
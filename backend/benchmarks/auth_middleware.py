@@ -0,0 +1,119 @@
+"""
+Benchmark do middleware de autenticação JWT.
+
+Compara o middleware antigo (@app.middleware("http"), BaseHTTPMiddleware, reproduzido
+abaixo só para referência) com o JWTAuthMiddleware (ASGI puro) em uma rota trivial.
+As requisições são enviadas direto para a aplicação ASGI, sem servidor nem rede,
+então o número medido é o custo do próprio middleware + roteamento do FastAPI.
+
+Rodar (dentro de backend/):
+    python -m benchmarks.auth_middleware
+    python -m benchmarks.auth_middleware --requisicoes 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.middleware import JWTAuthMiddleware, PublicRoutes
+from app.core.security import create_access_token, verify_token
+
+
+def registrar_middleware_antigo(app):
+    """Cópia da versão anterior de register_jwt_middleware (BaseHTTPMiddleware)"""
+    rotas = PublicRoutes()
+
+    @app.middleware("http")
+    async def jwt_middleware(request: Request, call_next):
+        try:
+            if rotas.is_public(request.method, request.url.path):
+                return await call_next(request)
+
+            auth_header = request.headers.get("Authorization")
+            if not auth_header or not auth_header.startswith("Bearer "):
+                raise HTTPException(status_code=401, detail="Token não fornecido.")
+
+            request.state.user = verify_token(auth_header.split(" ")[1])
+            return await call_next(request)
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+
+
+def montar_app(asgi_puro: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def publica():
+        return PlainTextResponse("ok")
+
+    @app.get("/ping")
+    async def protegida(request: Request):
+        return PlainTextResponse(str(request.state.user["id"]))
+
+    if asgi_puro:
+        app.add_middleware(JWTAuthMiddleware)
+    else:
+        registrar_middleware_antigo(app)
+    return app
+
+
+async def medir(app, path: str, headers: list, requisicoes: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": headers,
+        "client": ("127.0.0.1", 1234), "server": ("testserver", 80),
+    }
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    async def requisicao():
+        corpo_enviado = False
+
+        async def receive():
+            nonlocal corpo_enviado
+            if not corpo_enviado:
+                corpo_enviado = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Como um servidor real: só avisa desconexão quando o cliente sai
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    # Aquecimento (monta a pilha de middlewares e o roteamento)
+    await requisicao()
+    assert status[-1] == 200, status[-1]
+
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        await requisicao()
+    return requisicoes / (time.perf_counter() - inicio)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    args = parser.parse_args()
+
+    token = create_access_token(1, "bench@edutech.com", "aluno")
+    cenarios = {
+        "pública   GET /": ("/", []),
+        "protegida GET /ping": ("/ping", [(b"authorization", f"Bearer {token}".encode())]),
+    }
+
+    print(f"{args.requisicoes} requisições por cenário (requisições/s)")
+    for nome, (path, headers) in cenarios.items():
+        antigo = await medir(montar_app(asgi_puro=False), path, headers, args.requisicoes)
+        novo = await medir(montar_app(asgi_puro=True), path, headers, args.requisicoes)
+        print(f"  {nome:<20} BaseHTTPMiddleware {antigo:9.0f} | ASGI puro {novo:9.0f} | ganho {novo / antigo:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
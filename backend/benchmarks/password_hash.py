@@ -0,0 +1,57 @@
+"""
+Benchmark do custo do hash de senha: hashes por segundo por núcleo.
+
+Mede, para cada combinação de esquema e custo (rounds), o tempo de um hash em uma
+única thread (= um núcleo) e a vazão por núcleo. Serve para escolher
+PASSWORD_HASH_SCHEME / PASSWORD_HASH_ROUNDS (app/core/config.py) para o hardware:
+mais rounds = mais seguro, porém login/cadastro mais lentos e menos logins/s por núcleo.
+Os rounds estão na unidade de cada esquema (pbkdf2: iterações; bcrypt: log2, ex.: --rounds 10 12 14).
+
+Rodar (dentro de backend/):
+    python -m benchmarks.password_hash
+    python -m benchmarks.password_hash --esquemas pbkdf2_sha256 pbkdf2_sha512 --rounds 29000 100000 300000
+"""
+
+import argparse
+import os
+import time
+
+from app.core.config import PASSWORD_HASH_SCHEME, PASSWORD_HASH_ROUNDS
+from app.services.auth_service import criar_contexto
+
+
+def medir(esquema: str, rounds: int, duracao: float) -> float:
+    """Retorna hashes/s em uma única thread"""
+    contexto = criar_contexto(esquema, rounds)
+    contexto.hash("aquecimento")
+
+    hashes = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < duracao:
+        contexto.hash("senha-de-teste@edutech.com")
+        hashes += 1
+    return hashes / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--esquemas", nargs="+", default=[PASSWORD_HASH_SCHEME])
+    parser.add_argument("--rounds", nargs="+", type=int, default=[29000, 100000, 300000, 600000])
+    parser.add_argument("--duracao", type=float, default=2.0, help="segundos de medição por combinação")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    rounds_atual = PASSWORD_HASH_ROUNDS or "padrão do esquema"
+    print(f"Configuração atual: {PASSWORD_HASH_SCHEME} / {rounds_atual} rounds — {nucleos} núcleo(s)")
+    print(f"  {'esquema':<15} {'rounds':>9} {'ms/hash':>9} {'hashes/s/núcleo':>16} {'hashes/s (todos)':>17}")
+    for esquema in args.esquemas:
+        for rounds in args.rounds:
+            por_segundo = medir(esquema, rounds, args.duracao)
+            print(
+                f"  {esquema:<15} {rounds:>9} {1000 / por_segundo:>9.1f} "
+                f"{por_segundo:>16.1f} {por_segundo * nucleos:>17.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
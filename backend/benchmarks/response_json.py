@@ -0,0 +1,80 @@
+"""
+Micro-benchmark da serialização do envelope {data, message}.
+
+Compara o caminho antigo (SuccessResponse + jsonable_encoder + JSONResponse)
+com `success_response` (pydantic-core, uma passada) em uma lista de cursos.
+Não acessa o banco: os cursos são montados em memória.
+
+Rodar (dentro de backend/):
+    python -m benchmarks.response_json
+    python -m benchmarks.response_json --cursos 5000 --repeticoes 50
+"""
+
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.response import success_response
+from app.schemas.course import CursoResponse
+from app.schemas.success import SuccessResponse
+
+
+def montar_cursos(quantidade: int) -> list[CursoResponse]:
+    return [
+        CursoResponse(
+            id=i,
+            titulo=f"Curso {i}",
+            id_nivel=1 + i % 3,
+            nivel="Intermediário",
+            id_instrutor=1 + i % 20,
+            instrutor=f"Instrutor {i % 20}",
+            preco=float(i % 7) * 10,
+            avaliacao=(i % 50) / 10,
+            quantidade_avaliacoes=i % 300,
+        )
+        for i in range(1, quantidade + 1)
+    ]
+
+
+def caminho_antigo(data, message: str) -> bytes:
+    payload = SuccessResponse(data=data, message=message)
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def caminho_novo(data, message: str) -> bytes:
+    return success_response(data=data, message=message).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cursos", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    cursos = montar_cursos(args.cursos)
+    mensagem = "Cursos listados com sucesso."
+
+    # Confere que o contrato {data, message} é o mesmo nos dois caminhos
+    import json
+    assert json.loads(caminho_antigo(cursos, mensagem)) == json.loads(caminho_novo(cursos, mensagem))
+
+    # datetime e UUID (certificados) também precisam ser serializados
+    certificado = {"codigo": uuid.uuid4(), "data_emissao": datetime.now(timezone.utc)}
+    print("certificado:", caminho_novo(certificado, "ok").decode())
+
+    print(f"{args.cursos} cursos, {args.repeticoes} repetições (melhor de 5)")
+    resultados = {}
+    for nome, funcao in (("jsonable_encoder", caminho_antigo), ("pydantic-core", caminho_novo)):
+        tempo = min(timeit.repeat(lambda: funcao(cursos, mensagem), number=args.repeticoes, repeat=5))
+        resultados[nome] = tempo / args.repeticoes * 1000
+        print(f"  {nome:<17} {resultados[nome]:8.2f} ms/resposta")
+
+    print(f"  ganho: {resultados['jsonable_encoder'] / resultados['pydantic-core']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
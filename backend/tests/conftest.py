@@ -0,0 +1,28 @@
+"""
+Configuração comum dos testes.
+
+Os módulos do app leem a configuração do ambiente ao serem importados (app.database exige
+DATABASE_URL). Os engines só conectam no primeiro uso, então os testes de unidade rodam sem
+banco; os que precisam de um Postgres de verdade usam TEST_DATABASE_URL e são pulados sem ela.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", os.getenv("TEST_DATABASE_URL") or "postgresql://postgres@localhost:5432/postgres")
+os.environ.setdefault("JWT_SECRET_KEY", "segredo-dos-testes")
+
+
+class RelogioFalso:
+    """Substitui o módulo `time` de um módulo do app: `time()`/`monotonic()` só andam com `avancar`"""
+
+    def __init__(self, inicio: float = 1_000_000.0):
+        self.agora = inicio
+
+    def time(self) -> float:
+        return self.agora
+
+    def monotonic(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float) -> None:
+        self.agora += segundos
@@ -0,0 +1,213 @@
+"""
+Substituto local (mínimo) do PgBouncer/Supavisor em modo transaction, para os testes.
+
+Fala o protocolo do Postgres com os clientes e reparte poucos backends reais entre eles:
+cada backend fica preso a um cliente só enquanto houver uma transação/mensagens em
+andamento e volta para o pool no ReadyForQuery ocioso ('Z' + 'I'), como no PgBouncer.
+Com isso ele reproduz as duas pegadinhas do modo transaction:
+- parâmetros de startup de sessão (ex.: `options`) são recusados
+- prepared statements nomeados ficam no backend onde foram criados: a transação seguinte
+  pode cair em outro backend (não existe) ou outro cliente pode criar o mesmo nome (já existe)
+
+Limitações: só autenticação trust no servidor, sem SSL (responde 'N' ao SSLRequest), sem cancelamento.
+"""
+
+import asyncio
+import struct
+
+_SSL_REQUEST = 80877103
+_CANCEL_REQUEST = 80877102
+_PARAMETROS_ACEITOS = {"user", "database", "application_name", "client_encoding"}
+
+
+async def _ler_mensagem(reader: asyncio.StreamReader) -> tuple[bytes, bytes]:
+    cabecalho = await reader.readexactly(5)
+    tipo, tamanho = cabecalho[:1], struct.unpack("!i", cabecalho[1:])[0]
+    return tipo, cabecalho + await reader.readexactly(tamanho - 4)
+
+
+def _mensagem(tipo: bytes, corpo: bytes) -> bytes:
+    return tipo + struct.pack("!i", len(corpo) + 4) + corpo
+
+
+def _erro_fatal(mensagem: str) -> bytes:
+    corpo = b"SFATAL\x00C08P01\x00M" + mensagem.encode() + b"\x00\x00"
+    return _mensagem(b"E", corpo)
+
+
+class _Backend:
+    def __init__(self, reader, writer, parametros: list[bytes]):
+        self.reader = reader
+        self.writer = writer
+        self.parametros = parametros
+
+
+class TransactionPoolerStandIn:
+    """Proxy em modo transaction: `max_backends` conexões reais compartilhadas por todos os clientes"""
+
+    def __init__(self, host: str, port: int | None, user: str, database: str, max_backends: int = 2):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.database = database
+        self.max_backends = max_backends
+        self._livres: asyncio.Queue = asyncio.Queue()
+        self._abertos = 0
+        self._condicao = None
+        self._server = None
+        self.clientes = 0
+        self.backends_abertos = 0
+        self.backends_em_uso = 0
+        self.max_backends_em_uso = 0
+
+    async def start(self) -> int:
+        """Sobe o proxy em 127.0.0.1 numa porta livre e devolve a porta"""
+        self._condicao = asyncio.Condition()
+        self._server = await asyncio.start_server(self._atender, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self._server.close()
+        while not self._livres.empty():
+            self._livres.get_nowait().writer.close()
+
+    # Backends reais
+
+    async def _conectar_backend(self) -> _Backend:
+        if self.host.startswith("/"):
+            reader, writer = await asyncio.open_unix_connection(f"{self.host}/.s.PGSQL.{self.port or 5432}")
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port or 5432)
+        corpo = struct.pack("!i", 196608) + b"user\x00" + self.user.encode() + b"\x00"
+        corpo += b"database\x00" + self.database.encode() + b"\x00\x00"
+        writer.write(struct.pack("!i", len(corpo) + 4) + corpo)
+
+        parametros = []
+        while True:
+            tipo, mensagem = await _ler_mensagem(reader)
+            if tipo == b"R" and struct.unpack("!i", mensagem[5:9])[0] != 0:
+                raise RuntimeError("O stand-in só suporta autenticação trust no servidor")
+            if tipo == b"E":
+                raise RuntimeError(mensagem[5:].decode(errors="replace"))
+            if tipo == b"S":
+                parametros.append(mensagem)
+            if tipo == b"Z":
+                self.backends_abertos += 1
+                return _Backend(reader, writer, parametros)
+
+    async def _pegar_backend(self) -> _Backend:
+        async with self._condicao:
+            while self._livres.empty() and self._abertos >= self.max_backends:
+                await self._condicao.wait()
+            if self._livres.empty():
+                self._abertos += 1
+                backend = None
+            else:
+                backend = self._livres.get_nowait()
+        if backend is None:
+            try:
+                backend = await self._conectar_backend()
+            except Exception:
+                await self._descartar_backend(None)
+                raise
+        self.backends_em_uso += 1
+        self.max_backends_em_uso = max(self.max_backends_em_uso, self.backends_em_uso)
+        return backend
+
+    async def _devolver_backend(self, backend: _Backend) -> None:
+        self.backends_em_uso -= 1
+        async with self._condicao:
+            self._livres.put_nowait(backend)
+            self._condicao.notify()
+
+    async def _descartar_backend(self, backend: _Backend | None) -> None:
+        if backend is not None:
+            self.backends_em_uso -= 1
+            backend.writer.close()
+        async with self._condicao:
+            self._abertos -= 1
+            self._condicao.notify()
+
+    # Clientes
+
+    async def _startup(self, reader, writer) -> bool:
+        while True:
+            tamanho = struct.unpack("!i", await reader.readexactly(4))[0]
+            corpo = await reader.readexactly(tamanho - 4)
+            codigo = struct.unpack("!i", corpo[:4])[0]
+            if codigo == _SSL_REQUEST:
+                writer.write(b"N")
+                continue
+            if codigo == _CANCEL_REQUEST:
+                return False
+            break
+
+        campos = corpo[4:].split(b"\x00")
+        parametros = dict(zip(campos[0::2], campos[1::2]))
+        for nome in parametros:
+            if nome and nome.decode() not in _PARAMETROS_ACEITOS:
+                writer.write(_erro_fatal(f"unsupported startup parameter: {nome.decode()}"))
+                return False
+
+        # Copia os ParameterStatus de um backend real (versão, encoding, DateStyle...)
+        backend = await self._pegar_backend()
+        parametros_status = backend.parametros
+        await self._devolver_backend(backend)
+
+        writer.write(_mensagem(b"R", struct.pack("!i", 0)))
+        for mensagem in parametros_status:
+            writer.write(mensagem)
+        writer.write(_mensagem(b"K", struct.pack("!ii", 1, 1)))
+        writer.write(_mensagem(b"Z", b"I"))
+        await writer.drain()
+        return True
+
+    async def _atender(self, reader, writer):
+        self.clientes += 1
+        backend = None
+        pendentes = 0      # Sync/Query enviados ainda sem ReadyForQuery
+        sem_sync = False   # mensagens do protocolo estendido ainda sem Sync
+        repasse = None
+
+        async def repassar(atual: _Backend):
+            nonlocal backend, pendentes
+            while True:
+                tipo, mensagem = await _ler_mensagem(atual.reader)
+                writer.write(mensagem)
+                if tipo == b"Z":
+                    pendentes -= 1
+                    # Ocioso e sem nada em andamento: o backend volta para o pool
+                    if pendentes == 0 and not sem_sync and mensagem[5:6] == b"I":
+                        backend = None
+                        await writer.drain()
+                        await self._devolver_backend(atual)
+                        return
+
+        try:
+            if not await self._startup(reader, writer):
+                await writer.drain()
+                return
+            while True:
+                tipo, mensagem = await _ler_mensagem(reader)
+                if tipo == b"X":
+                    break
+                if backend is None:
+                    if repasse is not None:
+                        await repasse
+                    backend = await self._pegar_backend()
+                    repasse = asyncio.create_task(repassar(backend))
+                if tipo in (b"S", b"Q"):
+                    pendentes += 1
+                    sem_sync = False
+                else:
+                    sem_sync = True
+                backend.writer.write(mensagem)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if repasse is not None and not repasse.done():
+                repasse.cancel()
+            # Cliente saiu no meio de uma transação: o backend não pode ser reaproveitado
+            if backend is not None:
+                await self._descartar_backend(backend)
+            writer.close()
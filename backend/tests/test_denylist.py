@@ -0,0 +1,132 @@
+"""
+Denylist de sessões revogadas (app.core.denylist) e revogação por reuso de refresh token.
+
+O teste de renovar_sessao precisa de um Postgres em TEST_DATABASE_URL (como em
+tests/test_transaction_pooler.py).
+"""
+
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.core.denylist as denylist
+import app.models  # noqa: F401 (relacionamentos dos modelos)
+from app.core.denylist import BloomFilter, Denylist, revoked_sessions
+from app.models.session import SessaoUsuario
+from app.models.user import Usuario
+from app.services.session_service import criar_sessao, renovar_sessao
+from conftest import RelogioFalso
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(denylist, "time", relogio)
+    return relogio
+
+
+def test_bloom_sem_falso_negativo_e_com_poucos_falsos_positivos():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"sessao-{i}")
+
+    assert all(f"sessao-{i}" in bloom for i in range(1000))
+    falsos = sum(f"outra-{i}" in bloom for i in range(10_000))
+    assert falsos < 300  # ~1% esperado
+
+
+def test_contains_respeita_a_expiracao(relogio):
+    lista = Denylist(capacity=10, error_rate=0.01)
+    lista.add("s1", relogio.time() + 60)
+    assert "s1" in lista
+    assert "s2" not in lista
+
+    relogio.avancar(60)
+    assert "s1" not in lista
+
+
+def test_add_estende_mas_nao_encurta(relogio):
+    lista = Denylist(capacity=10, error_rate=0.01)
+    lista.add("s1", relogio.time() + 60)
+    lista.add("s1", relogio.time() + 10)
+    relogio.avancar(30)
+    assert "s1" in lista
+
+    # Já vencida: nem entra
+    lista.add("s2", relogio.time())
+    assert lista.stats()["entries"] == 1
+
+
+def test_reconstroi_maior_ao_passar_da_capacidade(relogio):
+    lista = Denylist(capacity=4, error_rate=0.01)
+    bits = lista.stats()["bloom_bits"]
+    for i in range(5):
+        lista.add(f"s{i}", relogio.time() + 60)
+
+    assert lista.capacity == 8
+    assert lista.stats()["bloom_bits"] > bits
+    assert all(f"s{i}" in lista for i in range(5))
+
+
+def test_purge_expired(relogio):
+    lista = Denylist(capacity=10, error_rate=0.01)
+    lista.add("curta", relogio.time() + 10)
+    lista.add("longa", relogio.time() + 100)
+
+    assert lista.purge_expired() == 0
+    relogio.avancar(10)
+    assert lista.purge_expired() == 1
+    assert lista.stats()["entries"] == 1
+    assert "longa" in lista
+    # O filtro foi reconstruído sem a vencida
+    assert "curta" not in lista._bloom
+
+
+def test_bloom_positives(relogio):
+    lista = Denylist(capacity=10, error_rate=0.01)
+    lista.add("s1", relogio.time() + 60)
+    "s1" in lista
+    "s1" in lista
+    assert lista.stats()["bloom_positives"] == 2
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+def test_reuso_de_refresh_token_revoga_a_sessao():
+    engine = create_engine(TEST_DATABASE_URL)
+    Usuario.__table__.create(engine, checkfirst=True)
+    SessaoUsuario.__table__.create(engine, checkfirst=True)
+    conexao = engine.connect()
+    transacao = conexao.begin()
+    try:
+        # Tudo na mesma transação, desfeita no fim
+        db = Session(bind=conexao, join_transaction_mode="create_savepoint")
+        usuario = Usuario(
+            id=987654, nome="Reuso", sobrenome="Teste", data_nascimento=date(2000, 1, 1),
+            email="reuso.refresh@teste.com", senha_hash="x", tipo_usuario="aluno",
+        )
+        db.add(usuario)
+        db.flush()
+
+        primeiro = criar_sessao(db, usuario)
+        segundo = renovar_sessao(db, primeiro["refresh_token"])
+        assert segundo is not None
+        sid = primeiro["refresh_token"].split(".")[0]
+        assert sid not in revoked_sessions
+
+        # Refresh token já trocado usado de novo: a sessão inteira cai
+        assert renovar_sessao(db, primeiro["refresh_token"]) is None
+        assert sid in revoked_sessions
+        db.expire_all()
+        assert db.query(SessaoUsuario).filter(SessaoUsuario.usuario_id == usuario.id).one().revogada_em is not None
+        # Nem o refresh token novo vale mais
+        assert renovar_sessao(db, segundo["refresh_token"]) is None
+        db.close()
+    finally:
+        transacao.rollback()
+        conexao.close()
+        engine.dispose()
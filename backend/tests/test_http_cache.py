@@ -0,0 +1,175 @@
+"""
+GET condicional (app.core.http_cache): ETag, Last-Modified, 304 e integração com o cache de respostas.
+
+Os testes de incrementar_versao precisam de um Postgres em TEST_DATABASE_URL (como em
+tests/test_transaction_pooler.py); os demais usam versões em memória.
+"""
+
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.core.cache as cache
+import app.core.http_cache as http_cache
+from app.core.cache import ResponseCache, cached_response
+from app.core.http_cache import conditional_get
+from app.core.response import success_response
+from app.models.table_version import VersaoTabela
+from app.services.table_version_service import CURSOS, NIVEIS, buscar_versoes, incrementar_versao
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+ATUALIZADO_EM = datetime(2024, 5, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def _app(sessao_factory, chamadas: list) -> TestClient:
+    """Rota de catálogo como as de app.routers.course: @conditional_get acima de @cached_response"""
+    app = FastAPI()
+
+    def get_db():
+        db = sessao_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @app.get("/courses/{curso_id}")
+    @conditional_get("course", tabelas=[CURSOS, NIVEIS])
+    @cached_response("course")
+    def pegar_curso(curso_id: int, db: Session = Depends(get_db)):
+        chamadas.append(curso_id)
+        return success_response(data={"id": curso_id}, message="Curso encontrado com sucesso")
+
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch):
+    novo = ResponseCache(ttl=60, max_entries=100, max_bytes=100_000)
+    monkeypatch.setattr(cache, "response_cache", novo)
+    return novo
+
+
+@pytest.fixture
+def versoes(monkeypatch):
+    """Versões em memória no lugar da tabela versoes_tabelas"""
+    atuais = {CURSOS: VersaoTabela(tabela=CURSOS, versao=1, atualizado_em=ATUALIZADO_EM)}
+
+    def buscar(db, tabelas):
+        return [atuais[tabela] for tabela in tabelas if tabela in atuais]
+
+    monkeypatch.setattr(http_cache, "buscar_versoes", buscar)
+    return atuais
+
+
+@pytest.fixture
+def chamadas():
+    return []
+
+
+@pytest.fixture
+def client(versoes, chamadas):
+    return _app(Session, chamadas)
+
+
+def test_etag_e_last_modified(client):
+    resposta = client.get("/courses/1")
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"].startswith('"')
+    assert resposta.headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    assert "Cache-Control" in resposta.headers
+
+    # ETag depende dos parâmetros da rota
+    assert client.get("/courses/2").headers["ETag"] != resposta.headers["ETag"]
+
+
+def test_if_none_match_responde_304_sem_executar_a_rota(client, chamadas):
+    etag = client.get("/courses/1").headers["ETag"]
+    resposta = client.get("/courses/1", headers={"If-None-Match": f'"outro", {etag}'})
+    assert resposta.status_code == 304
+    assert resposta.headers["ETag"] == etag
+    assert resposta.content == b""
+    assert chamadas == [1]
+
+    assert client.get("/courses/1", headers={"If-None-Match": "*"}).status_code == 304
+    assert client.get("/courses/1", headers={"If-None-Match": '"outro"'}).status_code == 200
+
+
+def test_if_modified_since(client):
+    assert client.get("/courses/1", headers={"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"}).status_code == 304
+    assert client.get("/courses/1", headers={"If-Modified-Since": "Wed, 01 May 2024 11:59:59 GMT"}).status_code == 200
+    assert client.get("/courses/1", headers={"If-Modified-Since": "ontem"}).status_code == 200
+
+
+def test_if_none_match_tem_prioridade_sobre_if_modified_since(client):
+    # Data atual, mas ETag diferente: vale o If-None-Match (200)
+    resposta = client.get(
+        "/courses/1",
+        headers={"If-None-Match": '"outro"', "If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"},
+    )
+    assert resposta.status_code == 200
+
+    # ETag atual com data antiga: 304
+    etag = resposta.headers["ETag"]
+    resposta = client.get(
+        "/courses/1",
+        headers={"If-None-Match": etag, "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"},
+    )
+    assert resposta.status_code == 304
+
+
+def test_nova_versao_muda_o_etag_e_nao_serve_o_corpo_antigo(client, versoes, chamadas):
+    resposta = client.get("/courses/1")
+    etag = resposta.headers["ETag"]
+    assert client.get("/courses/1").status_code == 200
+    assert chamadas == [1]  # segundo GET veio do cache de respostas
+
+    # Escrita em outro worker: a versão muda, o cache deste worker não foi invalidado
+    versoes[CURSOS] = VersaoTabela(tabela=CURSOS, versao=2, atualizado_em=datetime(2024, 5, 2, tzinfo=timezone.utc))
+    resposta = client.get("/courses/1", headers={"If-None-Match": etag})
+    assert resposta.status_code == 200
+    assert resposta.headers["ETag"] != etag
+    assert chamadas == [1, 1]
+
+
+def test_tabela_sem_versao_conta_como_zero(versoes, chamadas):
+    versoes.clear()
+    client = _app(Session, chamadas)
+    resposta = client.get("/courses/1")
+    assert resposta.status_code == 200
+    assert "Last-Modified" not in resposta.headers
+    assert client.get("/courses/1", headers={"If-None-Match": resposta.headers["ETag"]}).status_code == 304
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+def test_incrementar_versao_muda_o_etag():
+    engine = create_engine(TEST_DATABASE_URL)
+    VersaoTabela.__table__.create(engine, checkfirst=True)
+    conexao = engine.connect()
+    transacao = conexao.begin()
+    try:
+        # Tudo na mesma transação, desfeita no fim
+        client = _app(lambda: Session(bind=conexao, join_transaction_mode="create_savepoint"), [])
+        etag = client.get("/courses/1").headers["ETag"]
+        assert client.get("/courses/1", headers={"If-None-Match": etag}).status_code == 304
+
+        with Session(bind=conexao, join_transaction_mode="create_savepoint") as db:
+            antes = {v.tabela: v.versao for v in buscar_versoes(db, [CURSOS])}
+            incrementar_versao(db, CURSOS)
+            db.commit()
+            depois = {v.tabela: v.versao for v in buscar_versoes(db, [CURSOS])}
+        assert depois[CURSOS] == antes.get(CURSOS, 0) + 1
+
+        resposta = client.get("/courses/1", headers={"If-None-Match": etag})
+        assert resposta.status_code == 200
+        assert resposta.headers["ETag"] != etag
+    finally:
+        transacao.rollback()
+        conexao.close()
+        engine.dispose()
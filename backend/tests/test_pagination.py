@@ -0,0 +1,80 @@
+"""Cursor opaco da paginação keyset (app.core.pagination)"""
+
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import decode_cursor, encode_cursor
+
+
+def _token(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _assert_400(token: str, size: int, tipos=None):
+    with pytest.raises(HTTPException) as erro:
+        decode_cursor(token, size, tipos)
+    assert erro.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "valores, tipos",
+    [
+        ((42,), (int,)),
+        ((19.9, 7), (float, int)),
+        ((0, 2 ** 31 - 1), (float, int)),
+        ((-(2 ** 31),), (int,)),
+    ],
+)
+def test_ida_e_volta(valores, tipos):
+    token = encode_cursor(*valores)
+    assert "=" not in token
+    assert decode_cursor(token, len(valores), tipos) == list(valores)
+
+
+def test_float_inteiro_volta_como_float():
+    # json grava 20.0 como 20.0, mas um cliente pode mandar 20
+    assert decode_cursor(_token("[20,1]"), 2, (float, int)) == [20.0, 1]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "não é base64",
+        _token("não é json"),
+        _token('{"id": 1}'),
+        _token("[1,2]"),  # tamanho errado
+        _token("[]"),
+    ],
+)
+def test_token_malformado_ou_com_tamanho_errado(token):
+    _assert_400(token, 1, (int,))
+
+
+@pytest.mark.parametrize(
+    "raw, tipos",
+    [
+        ('["1"]', (int,)),
+        ("[1.5]", (int,)),
+        ("[true]", (int,)),
+        ("[null]", (int,)),
+        ('["barato",1]', (float, int)),
+        ("[2147483648]", (int,)),  # fora do int4
+        ("[-2147483649]", (int,)),
+        ("[1e400,1]", (float, int)),  # vira inf
+        ("[NaN,1]", (float, int)),
+        ("[Infinity,1]", (float, int)),
+        ("[" + "9" * 400 + ",1]", (float, int)),
+    ],
+)
+def test_valor_adulterado(raw, tipos):
+    _assert_400(_token(raw), len(tipos), tipos)
+
+
+def test_adulterar_o_token_gerado():
+    token = encode_cursor(10.0, 3)
+    raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    raw[1] = 10 ** 12
+    _assert_400(_token(json.dumps(raw)), 2, (float, int))
@@ -0,0 +1,149 @@
+"""
+Progresso das aulas em uma única instrução (app.services.progress_service.salvar_conclusao).
+
+Precisa de um Postgres em TEST_DATABASE_URL (como em tests/test_transaction_pooler.py):
+as tabelas e os dados são criados numa transação desfeita no fim de cada teste.
+"""
+
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, false, true
+from sqlalchemy.orm import Session
+
+import app.models as m
+from app.database import Base
+from app.services.progress_service import salvar_conclusao
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+
+# Ids altos para não colidir com dados que já estejam no banco de teste
+BASE_ID = 990_000
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(TEST_DATABASE_URL)
+    conexao = engine.connect()
+    transacao = conexao.begin()
+    Base.metadata.create_all(conexao)
+    sessao = Session(bind=conexao, join_transaction_mode="create_savepoint")
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+        transacao.rollback()
+        conexao.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def curso(db):
+    """Curso com duas aulas, uma terceira aula em outro curso e duas matrículas (ativa e cancelada)"""
+    i = BASE_ID
+    db.add_all([
+        m.Nivel(id=i, descricao=f"Nivel {i}"),
+        m.Categoria(id=i, nome=f"Categoria {i}", descricao="d"),
+        m.Especialidade(id=i, nome=f"Especialidade {i}"),
+    ])
+    for usuario_id, tipo in ((i, "instrutor"), (i + 1, "aluno")):
+        db.add(m.Usuario(
+            id=usuario_id, nome="Teste", sobrenome="Progresso", data_nascimento=date(2000, 1, 1),
+            email=f"progresso{usuario_id}@teste.com", senha_hash="x", tipo_usuario=tipo,
+        ))
+    db.flush()
+    db.add(m.Instrutor(id=i, especialidade=i, biografia="b"))
+    db.flush()
+    for curso_id in (i, i + 1):
+        db.add(m.Curso(
+            id=curso_id, titulo="Curso", descricao="d", preco=0, carga_horaria=1,
+            nivel_id=i, categoria_id=i, instrutor_id=i,
+        ))
+    db.flush()
+    db.add_all([m.Modulo(id=i, titulo="M", ordem=1, curso_id=i), m.Modulo(id=i + 1, titulo="M", ordem=1, curso_id=i + 1)])
+    db.flush()
+    db.add_all([
+        m.Aula(id=i, titulo="A1", ordem_aula=1, duracao_minutos=5, tipo="video", modulo_id=i),
+        m.Aula(id=i + 1, titulo="A2", ordem_aula=2, duracao_minutos=5, tipo="video", modulo_id=i),
+        m.Aula(id=i + 2, titulo="Outro curso", ordem_aula=1, duracao_minutos=5, tipo="video", modulo_id=i + 1),
+        m.Matricula(id=i, aluno_id=i + 1, curso_id=i, status_matricula="ativa"),
+        m.Matricula(id=i + 1, aluno_id=i + 1, curso_id=i, status_matricula="cancelada"),
+    ])
+    db.flush()
+    return SimpleNamespace(matricula=i, cancelada=i + 1, aula1=i, aula2=i + 1, aula_outro_curso=i + 2)
+
+
+def _salvar(db, matricula_id, aula_id, concluido=None, filtro_acesso=None):
+    return salvar_conclusao(
+        db,
+        matricula_id=matricula_id,
+        aula_id=aula_id,
+        filtro_acesso=true() if filtro_acesso is None else filtro_acesso,
+        concluido=concluido,
+    )
+
+
+def test_toggle_marca_e_desmarca(db, curso):
+    linha = _salvar(db, curso.matricula, curso.aula1)
+    assert linha.concluido is True
+    assert linha.progresso_percentual == 100
+    assert linha.data_conclusao is not None
+    assert (linha.aulas_concluidas, linha.total_aulas, linha.status_matricula) == (1, 2, "ativa")
+
+    linha = _salvar(db, curso.matricula, curso.aula1)
+    assert linha.concluido is False
+    assert linha.progresso_percentual == 0
+    assert linha.data_conclusao is None
+    assert linha.aulas_concluidas == 0
+
+
+def test_todas_as_aulas_concluem_a_matricula_e_desmarcar_reabre(db, curso):
+    _salvar(db, curso.matricula, curso.aula1)
+    linha = _salvar(db, curso.matricula, curso.aula2)
+    assert (linha.aulas_concluidas, linha.status_matricula) == (2, "concluida")
+    assert db.get(m.Matricula, curso.matricula).data_conclusao is not None
+
+    linha = _salvar(db, curso.matricula, curso.aula2)
+    assert (linha.aulas_concluidas, linha.status_matricula) == (1, "ativa")
+    db.expire_all()
+    assert db.get(m.Matricula, curso.matricula).data_conclusao is None
+
+
+def test_valor_explicito_repetido_nao_muda_nada(db, curso):
+    linha = _salvar(db, curso.matricula, curso.aula1, concluido=True)
+    assert (linha.concluido, linha.aulas_concluidas) == (True, 1)
+
+    # Mesmo valor: nenhuma linha volta e o contador não anda (delta 0)
+    assert _salvar(db, curso.matricula, curso.aula1, concluido=True) is None
+    db.expire_all()
+    assert db.get(m.Matricula, curso.matricula).aulas_concluidas == 1
+
+    linha = _salvar(db, curso.matricula, curso.aula1, concluido=False)
+    assert (linha.concluido, linha.aulas_concluidas) == (False, 0)
+
+
+def test_desmarcar_aula_sem_progresso_cria_a_linha_sem_mudar_o_contador(db, curso):
+    linha = _salvar(db, curso.matricula, curso.aula1, concluido=False)
+    assert (linha.concluido, linha.aulas_concluidas) == (False, 0)
+    assert _salvar(db, curso.matricula, curso.aula1, concluido=False) is None
+
+
+def test_acesso_negado(db, curso):
+    assert _salvar(db, curso.matricula, curso.aula1, filtro_acesso=false()) is None
+    assert db.query(m.ProgressoAulas).filter(m.ProgressoAulas.matricula_id == curso.matricula).count() == 0
+
+
+def test_matricula_cancelada_nao_grava_progresso(db, curso):
+    assert _salvar(db, curso.cancelada, curso.aula1) is None
+    assert _salvar(db, curso.cancelada, curso.aula1, concluido=True) is None
+    assert db.query(m.ProgressoAulas).filter(m.ProgressoAulas.matricula_id == curso.cancelada).count() == 0
+    db.expire_all()
+    assert db.get(m.Matricula, curso.cancelada).status_matricula == "cancelada"
+
+
+def test_aula_de_outro_curso(db, curso):
+    assert _salvar(db, curso.matricula, curso.aula_outro_curso) is None
@@ -0,0 +1,106 @@
+"""Limite de tentativas de login (app.core.rate_limit) com relógio falso"""
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import app.core.rate_limit as rate_limit
+from app.core.rate_limit import LoginRateLimiter, MemoryRateLimitBackend, RateLimitBackend, limitar_login
+from conftest import RelogioFalso
+
+JANELA = 60.0
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    # Início alinhado com a janela: decorrido = 0
+    relogio = RelogioFalso(inicio=JANELA * 10_000)
+    monkeypatch.setattr(rate_limit, "time", relogio)
+    return relogio
+
+
+def test_backend_e_abstrato():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_limite_na_janela_atual(relogio):
+    backend = MemoryRateLimitBackend(max_keys=10)
+    assert [backend.hit("k", 5, JANELA) for _ in range(5)] == [0] * 5
+    relogio.avancar(10)
+    assert backend.hit("k", 5, JANELA) == pytest.approx(50)
+
+
+def test_janela_deslizante_pondera_a_anterior(relogio):
+    backend = MemoryRateLimitBackend(max_keys=10)
+    for _ in range(5):
+        backend.hit("k", 5, JANELA)
+
+    # Metade da janela anterior ainda visível: 5 * 0.5 = 2.5, cabem mais 3 (2.5 + 3 > 5 não)
+    relogio.avancar(JANELA + 30)
+    assert [backend.hit("k", 5, JANELA) for _ in range(3)] == [0, 0, 0]
+    # Libera quando 5 * (1 - t/60) + 3 < 5, ou seja, t > 36
+    assert backend.hit("k", 5, JANELA) == pytest.approx(6)
+
+    relogio.avancar(6.5)
+    assert backend.hit("k", 5, JANELA) == 0
+
+
+def test_espera_positiva_no_inicio_da_janela(relogio):
+    backend = MemoryRateLimitBackend(max_keys=10)
+    for _ in range(5):
+        backend.hit("k", 5, JANELA)
+    relogio.avancar(JANELA)
+    espera = backend.hit("k", 5, JANELA)
+    assert 0 < espera < 1
+
+
+def test_janela_anterior_esquecida_depois_de_duas_janelas(relogio):
+    backend = MemoryRateLimitBackend(max_keys=10)
+    for _ in range(5):
+        backend.hit("k", 5, JANELA)
+    relogio.avancar(2 * JANELA)
+    assert backend.hit("k", 5, JANELA) == 0
+
+
+def test_lru_limita_as_chaves(relogio):
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for chave in ("a", "b", "c"):
+        assert backend.hit(chave, 1, JANELA) == 0
+
+    # "a" saiu (a usada há mais tempo) e recomeça do zero; "b" e "c" continuam no limite
+    assert backend.hit("a", 1, JANELA) == 0
+    assert backend.hit("c", 1, JANELA) > 0
+    assert len(backend._janelas) == 2
+
+
+def test_reset(relogio):
+    backend = MemoryRateLimitBackend(max_keys=10)
+    backend.hit("k", 1, JANELA)
+    backend.reset("k")
+    assert backend.hit("k", 1, JANELA) == 0
+
+
+def test_rota_responde_429_com_retry_after(relogio, monkeypatch):
+    limiter = LoginRateLimiter(MemoryRateLimitBackend(max_keys=10), per_ip=100, per_email=2, window=JANELA)
+    monkeypatch.setattr(rate_limit, "login_rate_limiter", limiter)
+
+    app = FastAPI()
+
+    @app.post("/login", dependencies=[Depends(limitar_login)])
+    def login():
+        return {"ok": True}
+
+    client = TestClient(app)
+    corpo = {"email": "Aluno@Exemplo.com", "senha": "x"}
+    assert client.post("/login", json=corpo).status_code == 200
+    # Mesmo e-mail com outra caixa/espaços conta na mesma chave
+    assert client.post("/login", json={**corpo, "email": "aluno@exemplo.com"}).status_code == 200
+
+    relogio.avancar(20.5)
+    resposta = client.post("/login", json=corpo)
+    assert resposta.status_code == 429
+    assert resposta.headers["Retry-After"] == "40"
+    assert limiter.rejected == 1
+
+    assert client.post("/login", json={**corpo, "email": "outro@exemplo.com"}).status_code == 200
@@ -0,0 +1,158 @@
+"""Cache de respostas (app.core.cache): chave, tags, limites, geração e leituras de réplica"""
+
+import asyncio
+
+import pytest
+from fastapi import Response
+from sqlalchemy.orm import Session
+
+import app.core.cache as cache
+from app.core.cache import ResponseCache, cached_response, versoes_requisicao
+from app.core.config import READ_YOUR_WRITES_SECONDS
+from conftest import RelogioFalso
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(cache, "time", relogio)
+    return relogio
+
+
+@pytest.fixture
+def response_cache(monkeypatch, relogio):
+    novo = ResponseCache(ttl=60, max_entries=100, max_bytes=1000)
+    monkeypatch.setattr(cache, "response_cache", novo)
+    return novo
+
+
+def _rota(namespace="course", tags=lambda p: [f"course:{p['curso_id']}"], tamanho=10, durante=None):
+    """Rota decorada que conta as execuções (miss) e devolve um corpo de `tamanho` bytes"""
+    chamadas = []
+
+    @cached_response(namespace, tags=tags)
+    def rota(curso_id: int, db: Session):
+        chamadas.append(curso_id)
+        if durante is not None:
+            durante()
+        return Response(content=str(curso_id).encode().ljust(tamanho, b"."), media_type="application/json")
+
+    return rota, chamadas
+
+
+def test_chave_separa_por_parametros_e_ignora_a_sessao(response_cache):
+    rota, chamadas = _rota()
+    assert rota(curso_id=1, db=Session()).body.startswith(b"1")
+    assert rota(curso_id=2, db=Session()).body.startswith(b"2")
+    assert rota(curso_id=1, db=Session()).body.startswith(b"1")
+    assert chamadas == [1, 2]
+    assert response_cache.stats()["hits"] == 1
+
+
+def test_chave_separa_por_versoes_das_tabelas(response_cache):
+    rota, chamadas = _rota()
+    for versoes in ((("cursos", 1),), (("cursos", 2),), (("cursos", 1),)):
+        token = versoes_requisicao.set(versoes)
+        try:
+            rota(curso_id=1, db=Session())
+        finally:
+            versoes_requisicao.reset(token)
+    assert chamadas == [1, 1]
+
+
+def test_invalidacao_por_tag(response_cache):
+    rota, chamadas = _rota()
+    rota(curso_id=1, db=Session())
+    rota(curso_id=2, db=Session())
+
+    assert response_cache.invalidate("course:1") == 1
+    rota(curso_id=1, db=Session())
+    rota(curso_id=2, db=Session())
+    assert chamadas == [1, 2, 1]
+
+    # A tag do namespace está em todas as entradas
+    assert response_cache.invalidate("course") == 2
+    assert response_cache.stats()["entries"] == 0
+
+
+def test_ttl(response_cache, relogio):
+    rota, chamadas = _rota()
+    rota(curso_id=1, db=Session())
+    relogio.avancar(60)
+    rota(curso_id=1, db=Session())
+    assert chamadas == [1, 1]
+
+
+def test_limite_de_bytes_remove_as_menos_usadas(monkeypatch, relogio):
+    response_cache = ResponseCache(ttl=60, max_entries=100, max_bytes=100)
+    monkeypatch.setattr(cache, "response_cache", response_cache)
+    rota, chamadas = _rota(tamanho=40)
+    rota(curso_id=1, db=Session())
+    rota(curso_id=2, db=Session())
+    rota(curso_id=1, db=Session())  # curso 2 passa a ser o usado há mais tempo
+    rota(curso_id=3, db=Session())
+
+    assert response_cache.stats()["evictions"] == 1
+    rota(curso_id=1, db=Session())
+    rota(curso_id=2, db=Session())
+    assert chamadas == [1, 2, 3, 2]
+
+    # Corpo maior que o limite inteiro não entra
+    grande, chamadas_grande = _rota(namespace="grande", tamanho=101)
+    grande(curso_id=1, db=Session())
+    grande(curso_id=1, db=Session())
+    assert chamadas_grande == [1, 1]
+
+
+def test_invalidacao_durante_a_leitura_nao_grava(response_cache):
+    rota, chamadas = _rota(durante=lambda: cache.response_cache.invalidate("course:1"))
+    rota(curso_id=1, db=Session())
+    assert response_cache.stats()["entries"] == 0
+
+
+def test_resposta_de_erro_nao_e_guardada(response_cache):
+    chamadas = []
+
+    @cached_response("course")
+    def rota(curso_id: int, db: Session):
+        chamadas.append(curso_id)
+        return Response(status_code=404)
+
+    rota(curso_id=1, db=Session())
+    rota(curso_id=1, db=Session())
+    assert chamadas == [1, 1]
+
+
+def test_replica_nao_preenche_logo_depois_de_uma_invalidacao(response_cache, relogio):
+    rota, chamadas = _rota()
+    replica = Session()
+    replica.info["replica"] = "replica_a"
+
+    response_cache.invalidate("course:1")
+    rota(curso_id=1, db=replica)
+    rota(curso_id=1, db=replica)
+    assert chamadas == [1, 1]
+    assert response_cache.stats()["replica_skips"] == 2
+
+    # O primário pode preencher mesmo dentro da janela
+    rota(curso_id=2, db=Session())
+    rota(curso_id=2, db=Session())
+    assert chamadas == [1, 1, 2]
+
+    relogio.avancar(READ_YOUR_WRITES_SECONDS)
+    rota(curso_id=1, db=replica)
+    rota(curso_id=1, db=replica)
+    assert chamadas == [1, 1, 2, 1]
+
+
+def test_rota_async(response_cache):
+    chamadas = []
+
+    @cached_response("course")
+    async def rota(curso_id: int, db: Session):
+        chamadas.append(curso_id)
+        return Response(content=b"{}")
+
+    asyncio.run(rota(curso_id=1, db=Session()))
+    asyncio.run(rota(curso_id=1, db=Session()))
+    assert chamadas == [1]
@@ -0,0 +1,86 @@
+"""Cache de tokens verificados (app.core.token_cache): expiração, LRU e remoção na revogação"""
+
+import pytest
+from fastapi import HTTPException
+
+import app.core.token_cache as token_cache_module
+from app.core.denylist import revoked_sessions
+from app.core.security import create_access_token, verify_token
+from app.core.token_cache import TokenCache, token_cache
+from conftest import RelogioFalso
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(token_cache_module, "time", relogio)
+    return relogio
+
+
+def _claims(relogio, user_id=1, sid="s1", validade=60):
+    return {"id": user_id, "role": "aluno", "sid": sid, "exp": relogio.time() + validade}
+
+
+def test_entrada_expira_no_exp(relogio):
+    cache = TokenCache(max_entries=10)
+    cache.set("t1", _claims(relogio, validade=60))
+    assert cache.get("t1")["id"] == 1
+
+    relogio.avancar(60)
+    assert cache.get("t1") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_token_ja_expirado_nao_entra(relogio):
+    cache = TokenCache(max_entries=10)
+    cache.set("t1", _claims(relogio, validade=0))
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_ao_estourar_max_entries(relogio):
+    cache = TokenCache(max_entries=2)
+    cache.set("t1", _claims(relogio))
+    cache.set("t2", _claims(relogio))
+    cache.get("t1")  # t2 passa a ser o usado há mais tempo
+    cache.set("t3", _claims(relogio))
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+    assert cache.get("t3") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_user_so_da_sessao_revogada(relogio):
+    cache = TokenCache(max_entries=10)
+    cache.set("a1", _claims(relogio, user_id=1, sid="s1"))
+    cache.set("a2", _claims(relogio, user_id=1, sid="s1"))
+    cache.set("b", _claims(relogio, user_id=1, sid="s2"))
+    cache.set("c", _claims(relogio, user_id=2, sid="s3"))
+
+    assert cache.invalidate_user(1, "s1") == 2
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b") is not None and cache.get("c") is not None
+
+    assert cache.invalidate_user(1) == 1
+    assert cache.get("b") is None
+    assert cache.stats()["invalidations"] == 3
+
+
+def test_invalidate_token(relogio):
+    cache = TokenCache(max_entries=10)
+    cache.set("t1", _claims(relogio))
+    assert cache.invalidate("t1") is True
+    assert cache.invalidate("t1") is False
+    assert cache.get("t1") is None
+
+
+def test_verify_token_descarta_token_de_sessao_revogada():
+    token = create_access_token(user_id=42, email="a@b.com", role="aluno", sid="sessao-revogada")
+    assert verify_token(token)["id"] == 42
+    assert token_cache.get(token) is not None
+
+    revoked_sessions.add("sessao-revogada", float("inf"))
+    with pytest.raises(HTTPException) as erro:
+        verify_token(token)
+    assert erro.value.status_code == 401
+    assert token_cache.get(token) is None
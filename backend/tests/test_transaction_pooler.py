@@ -0,0 +1,128 @@
+"""
+Modo transaction do pooler (DB_POOLER_MODE=transaction) contra um PgBouncer de mentira
+(tests/pgbouncer_standin.py) que reparte 2 backends reais entre todos os clientes.
+
+Precisa de um Postgres com autenticação trust em TEST_DATABASE_URL, por exemplo:
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres python -m pytest tests/test_transaction_pooler.py
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.db_pool import connect_args_pooler
+from pgbouncer_standin import TransactionPoolerStandIn
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+
+MAX_BACKENDS = 2
+CLIENTES = 20
+
+
+@pytest.fixture
+def pooler():
+    """Sobe o stand-in numa thread com event loop próprio e devolve (stand-in, porta)"""
+    url = make_url(TEST_DATABASE_URL)
+    standin = TransactionPoolerStandIn(
+        host=url.query.get("host") or url.host or "localhost",
+        port=url.port,
+        user=url.username or "postgres",
+        database=url.database or "postgres",
+        max_backends=MAX_BACKENDS,
+    )
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    porta = asyncio.run_coroutine_threadsafe(standin.start(), loop).result(timeout=10)
+    yield standin, porta
+    asyncio.run_coroutine_threadsafe(standin.close(), loop).result(timeout=10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=10)
+
+
+def _url(porta: int, driver: str) -> str:
+    url = make_url(TEST_DATABASE_URL)
+    return f"postgresql+{driver}://{url.username or 'postgres'}@127.0.0.1:{porta}/{url.database or 'postgres'}"
+
+
+async def _carga_async(engine):
+    """CLIENTES sessões simultâneas, cada uma com consultas avulsas e uma transação com várias"""
+
+    async def cliente(n: int):
+        async with engine.connect() as conexao:
+            for i in range(3):
+                assert (await conexao.execute(text("SELECT CAST(:n AS int) + :i"), {"n": n, "i": i})).scalar() == n + i
+                await conexao.commit()
+            async with conexao.begin():
+                pid = (await conexao.execute(text("SELECT pg_backend_pid()"))).scalar()
+                await conexao.execute(text("SELECT pg_sleep(0.01)"))
+                # Dentro da transação o backend é sempre o mesmo
+                assert (await conexao.execute(text("SELECT pg_backend_pid()"))).scalar() == pid
+
+    try:
+        await asyncio.gather(*(cliente(n) for n in range(CLIENTES)))
+    finally:
+        await engine.dispose()
+
+
+def test_async_transaction_mode_compartilha_poucos_backends(pooler):
+    standin, porta = pooler
+    engine = create_async_engine(
+        _url(porta, "asyncpg"),
+        poolclass=NullPool,
+        connect_args=connect_args_pooler({"ssl": "disable"}, assincrono=True, modo="transaction"),
+    )
+
+    asyncio.run(_carga_async(engine))
+
+    assert standin.clientes >= CLIENTES
+    assert standin.max_backends_em_uso <= MAX_BACKENDS
+    assert standin.backends_abertos <= MAX_BACKENDS
+
+
+def test_async_session_mode_quebra_no_pooler(pooler):
+    """Controle: com prepared statements no servidor (modo session) o mesmo teste falha"""
+    _, porta = pooler
+    engine = create_async_engine(
+        _url(porta, "asyncpg"),
+        poolclass=NullPool,
+        connect_args=connect_args_pooler({"ssl": "disable"}, assincrono=True, modo="session"),
+    )
+
+    with pytest.raises(exc.DBAPIError, match="prepared statement"):
+        asyncio.run(_carga_async(engine))
+
+
+def test_sync_transaction_mode_sem_parametros_de_sessao(pooler):
+    standin, porta = pooler
+    connect_args = {"sslmode": "disable", "options": "-c statement_timeout=0"}
+
+    # Modo session: o `options` vai no startup e o pooler recusa a conexão
+    engine = create_engine(_url(porta, "psycopg2"), poolclass=NullPool, connect_args=connect_args)
+    with pytest.raises(exc.OperationalError, match="unsupported startup parameter"):
+        with engine.connect():
+            pass
+
+    engine = create_engine(
+        _url(porta, "psycopg2"),
+        pool_size=5,
+        connect_args=connect_args_pooler(connect_args, modo="transaction"),
+    )
+    conexoes = [engine.connect() for _ in range(5)]
+    for n, conexao in enumerate(conexoes):
+        assert conexao.execute(text("SELECT CAST(:n AS int)"), {"n": n}).scalar() == n
+        conexao.commit()
+    for conexao in conexoes:
+        conexao.close()
+    engine.dispose()
+
+    # 5 conexões de cliente abertas ao mesmo tempo, no máximo 2 backends reais
+    assert standin.max_backends_em_uso <= MAX_BACKENDS